@@ -1,8 +1,38 @@
 #Gestión de imágenes y gráficos
+# Los sprites ya procesados (redimensionados y con su máscara) se guardan en
+# una caché .npz cuya clave es el hash de las imágenes de origen y de los
+# parámetros de procesamiento; si nada cambió, el arranque solo lee ese archivo.
+import glob
+import hashlib
+import os
+
 import cv2
 import numpy as np
 import math
 
+from utils import Sprite
+
+# Imagen de origen y tamaño final de cada asset
+ASSET_FILES = {
+    'hoop_left': ('assets/hoop_left.jpg', (220, 170)),
+    'hoop_right': ('assets/hoop_right.jpg', (220, 170)),
+    'ball': ('assets/ball.jpg', (55, 55)),
+}
+
+# Parámetros de remove_background_advanced (forman parte de la clave de la caché)
+BACKGROUND_REMOVAL = {
+    'white': ((0, 0, 200), (180, 30, 255)),
+    'gray': ((0, 0, 180), (180, 50, 220)),
+    'kernel': (5, 5),
+    'close_iterations': 2,
+    'open_iterations': 1,
+    'blur': (3, 3),
+}
+
+# Subir si cambia el procesamiento de otra forma (p. ej. create_professional_assets)
+ASSET_CACHE_VERSION = 1
+ASSET_CACHE_DIR = os.path.join('assets', '.cache')
+
 class AssetsManager:
     def __init__(self):
         self.colors = {
@@ -22,37 +52,42 @@ class AssetsManager:
     def remove_background_advanced(self, img):
         hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
         
-        lower_white = np.array([0, 0, 200])
-        upper_white = np.array([180, 30, 255])
+        params = BACKGROUND_REMOVAL
+        lower_white, upper_white = (np.array(v) for v in params['white'])
         mask_white = cv2.inRange(hsv, lower_white, upper_white)
         
-        lower_gray = np.array([0, 0, 180])
-        upper_gray = np.array([180, 50, 220])
+        lower_gray, upper_gray = (np.array(v) for v in params['gray'])
         mask_gray = cv2.inRange(hsv, lower_gray, upper_gray)
         
         background_mask = cv2.bitwise_or(mask_white, mask_gray)
         
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        background_mask = cv2.morphologyEx(background_mask, cv2.MORPH_CLOSE, kernel, iterations=2)
-        background_mask = cv2.morphologyEx(background_mask, cv2.MORPH_OPEN, kernel, iterations=1)
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, params['kernel'])
+        background_mask = cv2.morphologyEx(background_mask, cv2.MORPH_CLOSE, kernel, iterations=params['close_iterations'])
+        background_mask = cv2.morphologyEx(background_mask, cv2.MORPH_OPEN, kernel, iterations=params['open_iterations'])
         
         object_mask = cv2.bitwise_not(background_mask)
-        object_mask = cv2.GaussianBlur(object_mask, (3, 3), 0)
+        object_mask = cv2.GaussianBlur(object_mask, params['blur'], 0)
         
         return object_mask
 
     def load_assets(self):
+        cache_path = self.cache_path()
+        assets = self.load_cached_assets(cache_path)
+        if assets is not None:
+            print("Assets cargados desde cache")
+            return self.build_sprites(assets)
+        
         assets = {}
         
         try:
-            hoop_left_orig = cv2.imread('assets/hoop_left.jpg')
-            hoop_right_orig = cv2.imread('assets/hoop_right.jpg')
-            ball_orig = cv2.imread('assets/ball.jpg')
+            hoop_left_orig = cv2.imread(ASSET_FILES['hoop_left'][0])
+            hoop_right_orig = cv2.imread(ASSET_FILES['hoop_right'][0])
+            ball_orig = cv2.imread(ASSET_FILES['ball'][0])
             
             if hoop_left_orig is not None and hoop_right_orig is not None and ball_orig is not None:
-                assets['hoop_left'] = cv2.resize(hoop_left_orig, (220, 170))
-                assets['hoop_right'] = cv2.resize(hoop_right_orig, (220, 170))
-                assets['ball'] = cv2.resize(ball_orig, (55, 55))
+                assets['hoop_left'] = cv2.resize(hoop_left_orig, ASSET_FILES['hoop_left'][1])
+                assets['hoop_right'] = cv2.resize(hoop_right_orig, ASSET_FILES['hoop_right'][1])
+                assets['ball'] = cv2.resize(ball_orig, ASSET_FILES['ball'][1])
                 
                 assets['hoop_left_mask'] = self.remove_background_advanced(assets['hoop_left'])
                 assets['hoop_right_mask'] = self.remove_background_advanced(assets['hoop_right'])
@@ -65,7 +100,71 @@ class AssetsManager:
         except Exception as e:
             print(f"Creando assets profesionales: {e}")
             assets = self.create_professional_assets()
-            
+        
+        self.save_cached_assets(cache_path, assets)
+        self.build_sprites(assets)
+        return assets
+
+    def cache_key(self):
+        """Hash del contenido de las imágenes de origen y de los parámetros de procesamiento"""
+        digest = hashlib.sha1()
+        digest.update(repr((ASSET_CACHE_VERSION, sorted(ASSET_FILES.items()),
+                            sorted(BACKGROUND_REMOVAL.items()), sorted(self.colors.items()))).encode())
+        for name, (path, _) in sorted(ASSET_FILES.items()):
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                # Sin imagen se usan los assets procedurales: también cambia la clave
+                digest.update(f"missing:{name}".encode())
+        return digest.hexdigest()[:16]
+
+    def cache_path(self):
+        """Archivo de caché para el estado actual de los assets (None si está desactivada)"""
+        if os.environ.get('ARCADE_ASSET_CACHE', '1') == '0':
+            return None
+        return os.path.join(ASSET_CACHE_DIR, f"sprites-{self.cache_key()}.npz")
+
+    def load_cached_assets(self, path):
+        """Imágenes y máscaras ya procesadas, o None si no hay caché válida"""
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                assets = {name: data[name] for name in data.files}
+        except (OSError, ValueError) as e:
+            print(f"Cache de assets invalida, se regenera: {e}")
+            return None
+        for name in ASSET_FILES:
+            if name not in assets or f'{name}_mask' not in assets:
+                return None
+        return assets
+
+    def save_cached_assets(self, path, assets):
+        """Guardar imágenes y máscaras (sin comprimir, para que cargar sea solo leer)"""
+        if path is None:
+            return
+        arrays = {}
+        for name in ASSET_FILES:
+            arrays[name] = assets[name]
+            arrays[f'{name}_mask'] = assets[f'{name}_mask']
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Escribir aparte y renombrar: un arranque interrumpido no deja un .npz a medias
+            tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+            # Las cachés de versiones anteriores ya no sirven
+            for old in glob.glob(os.path.join(os.path.dirname(path), 'sprites-*.npz')):
+                if old != path:
+                    os.remove(old)
+        except OSError as e:
+            print(f"No se pudo guardar la cache de assets: {e}")
+
+    def build_sprites(self, assets):
+        """Precalcular alfa y color premultiplicado de cada asset (una sola vez)"""
+        for name in ('hoop_left', 'hoop_right', 'ball'):
+            assets[f'{name}_sprite'] = Sprite(assets[name], assets[f'{name}_mask'])
         return assets
 
     def create_professional_assets(self):
@@ -0,0 +1,323 @@
+# camera.py
+# Captura de cámara en un hilo de fondo.
+# El hilo lee continuamente de cv2.VideoCapture y deja solo el frame más reciente
+# en un "slot" único, con número de secuencia y contadores de frames descartados,
+# para que el bucle de juego nunca se quede esperando al USB de la webcam.
+# Además permite reemplazar la webcam por un video grabado o una carpeta de
+# imágenes (variable de entorno ARCADE_FRAME_SOURCE) para pruebas sin cámara.
+import abc
+import os
+import threading
+import time
+
+import cv2
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class CameraStream:
+    def __init__(self, index=0, width=None, height=None):
+        """
+        index: índice de la cámara para cv2.VideoCapture.
+        width/height: resolución solicitada (opcional).
+        """
+        self.cap = cv2.VideoCapture(index)
+        if width is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+        # Slot del último frame
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._seq = 0
+        self._read_seq = 0
+        self._failed = False
+
+        # Estadísticas
+        self.frames_captured = 0
+        self.frames_dropped = 0
+
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Arrancar el hilo de captura"""
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="CameraStream", daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture_loop(self):
+        while self._running:
+            success, frame = self.cap.read()
+            now = time.time()
+
+            with self._cond:
+                if not success:
+                    self._failed = True
+                    self._cond.notify_all()
+                    break
+
+                # Si el frame anterior nunca se leyó, se cuenta como descartado
+                if self._seq > self._read_seq:
+                    self.frames_dropped += 1
+
+                self._frame = frame
+                self._timestamp = now
+                self._seq += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+        self._running = False
+
+    def read_latest(self, timeout=1.0):
+        """
+        Devuelve (success, frame, seq, timestamp) con el frame más reciente.
+        Solo espera si todavía no hay un frame nuevo desde la última lectura;
+        si se agota el timeout se repite el último frame disponible.
+        """
+        with self._cond:
+            if self._seq == self._read_seq and not self._failed:
+                self._cond.wait_for(lambda: self._seq > self._read_seq or self._failed, timeout)
+
+            if self._frame is None or (self._failed and self._seq == self._read_seq):
+                return False, None, self._seq, self._timestamp
+
+            self._read_seq = self._seq
+            return True, self._frame, self._seq, self._timestamp
+
+    def read(self):
+        """Interfaz compatible con cv2.VideoCapture.read()"""
+        success, frame, _, _ = self.read_latest()
+        return success, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def get_stats(self):
+        """Contadores de captura para diagnóstico"""
+        with self._cond:
+            return {
+                'captured': self.frames_captured,
+                'dropped': self.frames_dropped,
+                'last_seq': self._seq
+            }
+
+    def release(self):
+        """Detener el hilo y liberar la cámara"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.cap.release()
+
+
+class FileFrameSource(abc.ABC):
+    def __init__(self, width=None, height=None, fps=30.0, realtime=True):
+        """
+        Base para fuentes grabadas (video o imágenes).
+        realtime=True respeta los FPS de la grabación; False entrega frames
+        tan rápido como se pidan (para medir el rendimiento del bucle).
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self._seq = 0
+        self._start_time = None
+
+    def start(self):
+        return self
+
+    @abc.abstractmethod
+    def _next_frame(self):
+        """Leer el siguiente frame crudo: (success, frame)"""
+
+    def _skip_frame(self):
+        """Saltar un frame sin decodificarlo si es posible"""
+        return self._next_frame()[0]
+
+    def read_latest(self, timeout=1.0):
+        """Misma interfaz que CameraStream.read_latest()"""
+        if self._start_time is None:
+            self._start_time = time.time()
+
+        if self.realtime:
+            # Esperar al instante en que este frame se habría capturado
+            due = self._start_time + self._seq / self.fps
+            delay = due - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+            # Si el bucle va atrasado se descartan frames, como con una cámara real
+            behind = int((time.time() - self._start_time) * self.fps) - self._seq
+            for _ in range(behind):
+                if not self._skip_frame():
+                    break
+                self._seq += 1
+                self.frames_dropped += 1
+
+        success, frame = self._next_frame()
+        if not success:
+            return False, None, self._seq, time.time()
+
+        if self.width is not None and self.height is not None and \
+           (frame.shape[1] != self.width or frame.shape[0] != self.height):
+            frame = cv2.resize(frame, (self.width, self.height))
+
+        self._seq += 1
+        self.frames_captured += 1
+        return True, frame, self._seq, time.time()
+
+    def read(self):
+        success, frame, _, _ = self.read_latest()
+        return success, frame
+
+    def isOpened(self):
+        return True
+
+    def set(self, prop, value):
+        # Las grabaciones ya tienen su resolución; se reescala en read_latest()
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0
+
+    def get_stats(self):
+        return {
+            'captured': self.frames_captured,
+            'dropped': self.frames_dropped,
+            'last_seq': self._seq
+        }
+
+    def release(self):
+        pass
+
+
+class VideoFileSource(FileFrameSource):
+    def __init__(self, path, width=None, height=None, realtime=True, loop=False):
+        """path: archivo de video (MP4, MJPEG, AVI...)"""
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"No se pudo abrir el video: {path}")
+        super().__init__(width, height, self.cap.get(cv2.CAP_PROP_FPS), realtime)
+        self.loop = loop
+
+    def _next_frame(self):
+        success, frame = self.cap.read()
+        if not success and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, frame = self.cap.read()
+        return success, frame
+
+    def _skip_frame(self):
+        # grab() avanza sin decodificar el frame
+        if self.cap.grab():
+            return True
+        return self.loop and self._next_frame()[0]
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageSequenceSource(FileFrameSource):
+    def __init__(self, folder, width=None, height=None, fps=30.0, realtime=True, loop=False):
+        """folder: carpeta con imágenes JPG/PNG, reproducidas en orden alfabético"""
+        # La extensión se compara sin mayúsculas (.JPG, .PNG de algunas cámaras)
+        self.paths = sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+        if not self.paths:
+            raise FileNotFoundError(f"No hay imagenes en: {folder}")
+        super().__init__(width, height, fps, realtime)
+        self.loop = loop
+        self._index = 0
+
+    def _next_frame(self):
+        if self._index >= len(self.paths):
+            if not self.loop:
+                return False, None
+            self._index = 0
+        frame = cv2.imread(self.paths[self._index])
+        self._index += 1
+        return frame is not None, frame
+
+    def _skip_frame(self):
+        if self._index >= len(self.paths):
+            if not self.loop:
+                return False
+            self._index = 0
+        self._index += 1
+        return True
+
+
+def open_frame_source(source, width=None, height=None, realtime=True, loop=False):
+    """
+    Abrir una fuente de frames según su tipo:
+    - int o dígitos: índice de cámara (captura en segundo plano)
+    - carpeta: secuencia de imágenes
+    - otro texto: archivo de video
+    """
+    if isinstance(source, int) or str(source).isdigit():
+        return CameraStream(int(source), width, height).start()
+    if os.path.isdir(source):
+        return ImageSequenceSource(source, width, height, realtime=realtime, loop=loop)
+    return VideoFileSource(source, width, height, realtime=realtime, loop=loop)
+
+
+def frame_source_from_env(width=None, height=None):
+    """
+    Fuente grabada indicada por ARCADE_FRAME_SOURCE (None si no está definida);
+    ARCADE_FRAME_PACING=fast la reproduce sin esperar (por defecto realtime)
+    y ARCADE_FRAME_LOOP=1 la repite al terminar.
+    """
+    source = os.environ.get('ARCADE_FRAME_SOURCE')
+    if not source:
+        return None
+
+    realtime = os.environ.get('ARCADE_FRAME_PACING', 'realtime').lower() != 'fast'
+    loop = os.environ.get('ARCADE_FRAME_LOOP', '0') == '1'
+    print(f"Usando fuente de frames: {source} ({'realtime' if realtime else 'fast'})")
+    return open_frame_source(source, width, height, realtime=realtime, loop=loop)
+
+
+def open_camera(index=0, width=None, height=None):
+    """
+    Abrir la cámara con captura en segundo plano ya iniciada.
+    Si ARCADE_CAMERA_SERVICE nombra un servicio de cámara activo (ver
+    camera_service.py) se leen sus frames sin volver a abrir el dispositivo.
+    Si ARCADE_FRAME_SOURCE está definida se usa esa grabación en su lugar.
+    """
+    service = os.environ.get('ARCADE_CAMERA_SERVICE')
+    if service and service != '0':
+        from camera_service import SharedCameraReader  # camera_service importa este módulo
+        try:
+            return SharedCameraReader(service, width, height)
+        except FileNotFoundError:
+            print(f"Servicio de camara '{service}' no encontrado, abriendo la camara directamente")
+
+    source = frame_source_from_env(width, height)
+    if source is not None:
+        return source
+    return CameraStream(index, width, height).start()
@@ -0,0 +1,409 @@
+# camera_service.py
+# Servicio de cámara compartido entre procesos.
+# Un solo proceso (el menú, o "python camera_service.py") abre la webcam una
+# vez y publica cada frame en un buffer circular de memoria compartida; los
+# juegos, el menú o un grabador se conectan como lectores sin copiar el frame.
+# Así cambiar de juego no vuelve a abrir ni renegociar el dispositivo (1-3 s
+# en V4L2). Cada slot lleva número de secuencia y timestamp: un lector que se
+# atrasa sabe cuántos frames se perdió.
+#
+# Memoria compartida:
+#   encabezado int64[HEADER_FIELDS] | seq int64[slots] | timestamp float64[slots] | frames uint8[slots, H, W, C]
+# El escritor marca el slot con seq = -1 mientras lo llena y publica LATEST al final.
+import os
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+from camera import frame_source_from_env
+
+DEFAULT_NAME = 'arcade_camera'
+MAGIC = 0x41524341  # "ARCA"
+
+# Índices del encabezado
+HEADER_FIELDS = 16
+H_MAGIC, H_WIDTH, H_HEIGHT, H_CHANNELS, H_SLOTS, H_LATEST, H_OWNER_PID, H_RUNNING, H_FPS_MILLI = range(9)
+
+
+def _layout(slots, height, width, channels):
+    """Offsets de cada sección dentro del bloque compartido; frames alineados a 64 bytes"""
+    seq_offset = HEADER_FIELDS * 8
+    time_offset = seq_offset + slots * 8
+    frames_offset = (time_offset + slots * 8 + 63) // 64 * 64
+    total = frames_offset + slots * height * width * channels
+    return seq_offset, time_offset, frames_offset, total
+
+
+def _map_arrays(buf, slots, height, width, channels):
+    seq_offset, time_offset, frames_offset, _ = _layout(slots, height, width, channels)
+    header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buf, offset=0)
+    slot_seq = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=seq_offset)
+    slot_time = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=time_offset)
+    frames = np.ndarray((slots, height, width, channels), dtype=np.uint8, buffer=buf, offset=frames_offset)
+    return header, slot_seq, slot_time, frames
+
+
+def _close_shm(shm):
+    try:
+        shm.close()
+    except BufferError:
+        # Todavía hay vistas de frames en uso; se libera cuando se recolecten
+        pass
+
+
+def _pid_alive(pid):
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Existe pero es de otro usuario
+        return True
+    return True
+
+
+def unlink_stale(name=DEFAULT_NAME):
+    """
+    Borrar el buffer que dejó un servicio que ya no publica (detenido, o cuyo
+    proceso murió sin llamar a stop()). Devuelve True si el nombre quedó libre.
+    """
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return True
+    header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+    owner_pid = int(header[H_OWNER_PID])
+    if header[H_MAGIC] == MAGIC:
+        stale = not header[H_RUNNING] or not _pid_alive(owner_pid)
+    else:
+        # A medio inicializar: solo es basura si el dueño ya no existe
+        stale = owner_pid != 0 and not _pid_alive(owner_pid)
+    del header
+    _close_shm(shm)
+    if stale:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    else:
+        # Solo se miró el encabezado; el bloque sigue siendo del dueño
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return stale
+
+
+class CameraService:
+    def __init__(self, index=0, width=None, height=None, name=DEFAULT_NAME, slots=4):
+        """
+        index: índice de la cámara (o ARCADE_FRAME_SOURCE si está definida).
+        width/height: resolución solicitada al dispositivo.
+        name: nombre del bloque de memoria compartida que abren los lectores.
+        slots: tamaño del buffer circular; un frame leído sin copiar sigue
+        siendo válido mientras el escritor no haya dado toda la vuelta.
+        """
+        self.index = index
+        self.width = width
+        self.height = height
+        self.name = name
+        self.slots = slots
+
+        self.frames_captured = 0
+        self._source = None
+        self._shm = None
+        self._header = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Abrir la cámara, crear el buffer con el tamaño real del frame y publicar"""
+        if self._running:
+            return self
+        source = frame_source_from_env(self.width, self.height)
+        if source is None:
+            source = cv2.VideoCapture(self.index)
+            if self.width is not None:
+                source.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            if self.height is not None:
+                source.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self._source = source
+        self._decode_in_place = isinstance(source, cv2.VideoCapture)
+
+        # El primer frame define el tamaño real (la cámara puede ignorar el pedido)
+        success, frame = source.read()
+        if not success:
+            source.release()
+            raise RuntimeError(f"No se pudo leer la camara {self.index}")
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        self._decode_in_place = self._decode_in_place and channels == 3
+
+        total = _layout(self.slots, height, width, channels)[3]
+        try:
+            self._shm = shared_memory.SharedMemory(name=self.name, create=True, size=total)
+        except FileExistsError:
+            source.release()
+            self._source = None
+            raise
+        self._header, self._slot_seq, self._slot_time, self._frames = \
+            _map_arrays(self._shm.buf, self.slots, height, width, channels)
+        self._slot_seq[:] = 0
+        self._header[:] = 0
+        self._header[H_WIDTH] = width
+        self._header[H_HEIGHT] = height
+        self._header[H_CHANNELS] = channels
+        self._header[H_SLOTS] = self.slots
+        self._header[H_OWNER_PID] = os.getpid()
+        self._header[H_FPS_MILLI] = int((source.get(cv2.CAP_PROP_FPS) or 30.0) * 1000)
+        self._header[H_RUNNING] = 1
+        self._header[H_MAGIC] = MAGIC
+
+        self._publish(frame, time.time())
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="CameraService", daemon=True)
+        self._thread.start()
+        return self
+
+    def _publish(self, frame, timestamp, in_place=False):
+        seq = int(self._header[H_LATEST]) + 1
+        slot = seq % self.slots
+        if not in_place:
+            self._slot_seq[slot] = -1
+            np.copyto(self._frames[slot], frame.reshape(self._frames[slot].shape))
+        self._slot_time[slot] = timestamp
+        self._slot_seq[slot] = seq
+        self._header[H_LATEST] = seq
+        self.frames_captured += 1
+
+    def _capture_loop(self):
+        while self._running:
+            # Decodificar directo en el próximo slot cuando el tamaño coincide
+            slot = (int(self._header[H_LATEST]) + 1) % self.slots
+            target = self._frames[slot]
+            self._slot_seq[slot] = -1
+            if self._decode_in_place:
+                success, frame = self._source.read(target)
+            else:
+                success, frame = self._source.read()
+            if not success or not self._running:
+                break
+            in_place = frame is not None and frame.__array_interface__['data'][0] == \
+                target.__array_interface__['data'][0]
+            self._publish(frame, time.time(), in_place=in_place)
+        self._running = False
+        if self._header is not None:
+            self._header[H_RUNNING] = 0
+
+    def get_stats(self):
+        return {
+            'captured': self.frames_captured,
+            'dropped': 0,
+            'last_seq': int(self._header[H_LATEST]) if self._shm is not None else 0
+        }
+
+    def stop(self):
+        """Dejar de publicar, liberar la cámara y borrar el buffer compartido"""
+        self._running = False
+        if self._header is not None:
+            self._header[H_RUNNING] = 0
+        # Liberar la fuente primero desbloquea un read() en curso del hilo
+        if self._source is not None:
+            self._source.release()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            if self._thread.is_alive():
+                # Sigue dentro de read(): no se le quitan los arrays ni el buffer;
+                # el hilo es daemon y el bloque se borra al salir del proceso
+                return
+            self._thread = None
+        self._source = None
+        if self._shm is not None:
+            self._header = self._slot_seq = self._slot_time = self._frames = None
+            shm = self._shm
+            self._shm = None
+            _close_shm(shm)
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                # Otro proceso ya lo borró al encontrarlo detenido
+                pass
+
+
+class SharedCameraReader:
+    def __init__(self, name=DEFAULT_NAME, width=None, height=None, copy=False):
+        """
+        Lector del buffer de un CameraService, con la interfaz de CameraStream.
+        width/height: si difieren del frame compartido se reescala (con copia).
+        copy: devolver copias en vez de vistas de solo lectura a la memoria compartida.
+        """
+        self._shm = shared_memory.SharedMemory(name=name)
+        header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self._shm.buf)
+        if header[H_MAGIC] != MAGIC:
+            _close_shm(self._shm)
+            raise FileNotFoundError(f"El servicio de camara '{name}' no esta listo")
+        if not header[H_RUNNING]:
+            # Buffer de un servicio detenido: open_camera() vuelve a la cámara propia
+            del header
+            _close_shm(self._shm)
+            raise FileNotFoundError(f"El servicio de camara '{name}' esta detenido")
+        owner_pid = int(header[H_OWNER_PID])
+        if owner_pid != os.getpid():
+            # En Python < 3.13 el proceso que se conecta también "registra" el bloque
+            # y lo borraría al salir; solo el dueño del servicio lo elimina
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+
+        self.name = name
+        self.slots = int(header[H_SLOTS])
+        self.frame_width = int(header[H_WIDTH])
+        self.frame_height = int(header[H_HEIGHT])
+        self.fps = header[H_FPS_MILLI] / 1000.0
+        self._header, self._slot_seq, self._slot_time, self._frames = _map_arrays(
+            self._shm.buf, self.slots, self.frame_height, self.frame_width, int(header[H_CHANNELS]))
+        self._frames.flags.writeable = False
+
+        self.width = width
+        self.height = height
+        self.copy = copy
+
+        # Se empieza desde el frame actual (los anteriores no cuentan como perdidos)
+        self._read_seq = max(0, int(self._header[H_LATEST]) - 1)
+        self._last = (None, 0.0)
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_overwritten = 0
+
+    def start(self):
+        return self
+
+    def read_latest(self, timeout=1.0):
+        """
+        Misma interfaz que CameraStream.read_latest(): (success, frame, seq, timestamp).
+        El frame es una vista de solo lectura al slot del buffer circular; sigue
+        siendo válido hasta que el servicio publique 'slots - 1' frames más.
+        """
+        if self._header is None:
+            return False, None, self._read_seq, 0.0
+        deadline = time.time() + timeout
+        while int(self._header[H_LATEST]) == self._read_seq:
+            if not self._header[H_RUNNING]:
+                # El servicio dejó de publicar (cámara caída o fin de la grabación):
+                # fallar como CameraStream para que el juego termine
+                return False, None, self._read_seq, self._last[1]
+            if time.time() >= deadline:
+                # Sin frames nuevos: se repite el último, como CameraStream
+                frame, timestamp = self._last
+                return frame is not None, frame, self._read_seq, timestamp
+            time.sleep(0.001)
+
+        for _ in range(self.slots):
+            seq = int(self._header[H_LATEST])
+            slot = seq % self.slots
+            timestamp = float(self._slot_time[slot])
+            frame = self._frames[slot]
+            # Si el escritor volvió a tomar el slot entre medio, se pasa al más reciente
+            if int(self._slot_seq[slot]) == seq:
+                break
+            self.frames_overwritten += 1
+        else:
+            frame, timestamp = self._last
+            return frame is not None, frame, self._read_seq, timestamp
+
+        if seq > self._read_seq + 1:
+            self.frames_dropped += seq - self._read_seq - 1
+        self._read_seq = seq
+        self.frames_captured += 1
+
+        if self.width is not None and self.height is not None and \
+           (self.width != self.frame_width or self.height != self.frame_height):
+            frame = cv2.resize(frame, (self.width, self.height))
+        elif self.copy:
+            frame = frame.copy()
+        self._last = (frame, timestamp)
+        return True, frame, seq, timestamp
+
+    def read(self):
+        success, frame, _, _ = self.read_latest()
+        return success, frame
+
+    def isOpened(self):
+        return self._header is not None and bool(self._header[H_RUNNING])
+
+    def set(self, prop, value):
+        # El dispositivo es del servicio; solo cambia el tamaño que recibe este lector
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width or self.frame_width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height or self.frame_height
+        return 0
+
+    def get_stats(self):
+        return {
+            'captured': self.frames_captured,
+            'dropped': self.frames_dropped,
+            'last_seq': self._read_seq
+        }
+
+    def release(self):
+        """Desconectarse del buffer (el servicio sigue publicando)"""
+        if self._shm is None:
+            return
+        self._header = self._slot_seq = self._slot_time = self._frames = None
+        self._last = (None, 0.0)
+        shm = self._shm
+        self._shm = None
+        _close_shm(shm)
+
+
+def start_camera_service(index=0, width=None, height=None):
+    """
+    Iniciar el servicio para este proceso y sus juegos, según ARCADE_CAMERA_SERVICE:
+    sin definir usa el nombre por defecto, '0' lo desactiva. Publica el nombre en
+    el entorno para que open_camera() se conecte. Devuelve el servicio o None.
+    """
+    name = os.environ.get('ARCADE_CAMERA_SERVICE', DEFAULT_NAME)
+    if name == '0':
+        return None
+    try:
+        try:
+            service = CameraService(index, width, height, name=name).start()
+        except FileExistsError:
+            if not unlink_stale(name):
+                raise
+            # El buffer era de un servicio muerto o detenido: crear uno nuevo
+            print(f"Reemplazando servicio de camara detenido: {name}")
+            service = CameraService(index, width, height, name=name).start()
+    except FileExistsError:
+        # Otro proceso ya es dueño de la cámara: solo conectarse a su buffer
+        print(f"Usando servicio de camara existente: {name}")
+        service = None
+    except RuntimeError as e:
+        print(f"Servicio de camara no disponible: {e}")
+        return None
+    os.environ['ARCADE_CAMERA_SERVICE'] = name
+    return service
+
+
+if __name__ == "__main__":
+    # Servicio independiente: los juegos se conectan con ARCADE_CAMERA_SERVICE=<nombre>
+    service = CameraService(0, 1280, 720, name=os.environ.get('ARCADE_CAMERA_SERVICE', DEFAULT_NAME)).start()
+    print(f"Servicio de camara '{service.name}' publicando (Ctrl+C para terminar)")
+    try:
+        while True:
+            time.sleep(5)
+            print(service.get_stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
@@ -0,0 +1,94 @@
+# collision.py
+# Colisiones entre la espada y los objetos que caen.
+# En lugar de probar solo la posición actual de la mano, se prueba el segmento
+# recorrido desde la muestra anterior: así un corte rápido no "salta" la fruta
+# cuando el juego corre a pocos FPS. Una grilla uniforme limita las pruebas a
+# los objetos cercanos al segmento.
+import math
+
+
+def segment_hits_box(x0, y0, x1, y1, left, top, right, bottom):
+    """Intersección segmento-rectángulo (recorte de Liang-Barsky)"""
+    t_enter, t_exit = 0.0, 1.0
+    dx, dy = x1 - x0, y1 - y0
+    for p, q in ((-dx, x0 - left), (dx, right - x0), (-dy, y0 - top), (dy, bottom - y0)):
+        if p == 0:
+            if q < 0:
+                return False  # Paralelo y fuera de la franja
+            continue
+        t = q / p
+        if p < 0:
+            if t > t_exit:
+                return False
+            t_enter = max(t_enter, t)
+        else:
+            if t < t_enter:
+                return False
+            t_exit = min(t_exit, t)
+    return True
+
+
+class UniformGrid:
+    def __init__(self, cell_size=80):
+        """cell_size: lado de cada celda en píxeles"""
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def rebuild(self, rects, margin=0):
+        """Indexar rects (x, y, w, h) por celda, agrandados 'margin' píxeles"""
+        cs = self.cell_size
+        cells = {}
+        for index, (x, y, w, h) in enumerate(rects):
+            for cx in range(int((x - margin) // cs), int((x + w + margin) // cs) + 1):
+                for cy in range(int((y - margin) // cs), int((y + h + margin) // cs) + 1):
+                    cells.setdefault((cx, cy), []).append(index)
+        self.cells = cells
+
+    def query(self, left, top, right, bottom):
+        """Índices de los rects que comparten celda con el área dada"""
+        cs = self.cell_size
+        found = set()
+        for cx in range(int(left // cs), int(right // cs) + 1):
+            for cy in range(int(top // cs), int(bottom // cs) + 1):
+                found.update(self.cells.get((cx, cy), ()))
+        return found
+
+
+class SweptCollider:
+    def __init__(self, hit_radius=25, cell_size=80, max_sweep=250):
+        """
+        hit_radius: medio lado del hitbox de la espada (50x50 alrededor de la palma).
+        max_sweep: distancia máxima entre dos muestras para barrer el segmento;
+        si es mayor (mano perdida y reencontrada) solo se prueba la posición actual.
+        """
+        self.hit_radius = hit_radius
+        self.max_sweep = max_sweep
+        self.grid = UniformGrid(cell_size)
+        self.rects = []
+
+    def prepare(self, rects):
+        """Reconstruir la grilla con los objetos del frame"""
+        self.rects = [tuple(rect) for rect in rects]
+        self.grid.rebuild(self.rects, self.hit_radius)
+
+    def sweep_segment(self, positions):
+        """Segmento entre las dos últimas posiciones de la espada"""
+        x1, y1 = positions[-1]
+        if len(positions) < 2:
+            return x1, y1, x1, y1
+        x0, y0 = positions[-2]
+        if math.hypot(x1 - x0, y1 - y0) > self.max_sweep:
+            return x1, y1, x1, y1
+        return x0, y0, x1, y1
+
+    def hits(self, segment):
+        """Índices (en el orden de prepare) de los objetos que toca el segmento"""
+        x0, y0, x1, y1 = segment
+        r = self.hit_radius
+        candidates = self.grid.query(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        hit = set()
+        for index in candidates:
+            x, y, w, h = self.rects[index]
+            if segment_hits_box(x0, y0, x1, y1, x - r, y - r, x + w + r, y + h + r):
+                hit.add(index)
+        return hit
@@ -1,21 +1,297 @@
 # detector.py
 # Este archivo se encarga de inicializar el detector de manos usando cvzone,
 # que por dentro utiliza MediaPipe (modelo de manos ya embebido).
+# También incluye un modo "pipeline": la inferencia corre en un hilo aparte y el
+# juego dibuja cada frame con los landmarks más recientes disponibles.
+import threading
+import time
 
+import cv2
+import mediapipe as mp
 from cvzone.HandTrackingModule import HandDetector
 
+from utils import InferenceScaler
+
+HAND_CONNECTIONS = mp.solutions.hands.HAND_CONNECTIONS
+
+
+def map_hand_to_frame(hand, scale_x, scale_y, offset_x=0, offset_y=0):
+    """Llevar lmList, bbox y center de una imagen reducida/recortada al frame completo"""
+    hand['lmList'] = [[int(lm[0] / scale_x) + offset_x, int(lm[1] / scale_y) + offset_y, int(lm[2] / scale_x)]
+                      for lm in hand['lmList']]
+    x, y, w, h = hand['bbox']
+    hand['bbox'] = (int(x / scale_x) + offset_x, int(y / scale_y) + offset_y,
+                    int(w / scale_x), int(h / scale_y))
+    cx, cy = hand['center']
+    hand['center'] = (int(cx / scale_x) + offset_x, int(cy / scale_y) + offset_y)
+    return hand
+
+
+class HandResult:
+    def __init__(self, hands, frame_id, timestamp):
+        """
+        hands: lista de manos de cvzone (lmList, bbox, center, type).
+        frame_id: secuencia del frame del que salieron los landmarks.
+        timestamp: momento de captura de ese frame.
+        """
+        self.hands = hands
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+
+    def age(self, now=None):
+        """Segundos transcurridos desde la captura del frame"""
+        if now is None:
+            now = time.time()
+        return now - self.timestamp
+
+
 class HandTracker:
-    def __init__(self, maxHands=1, detectionCon=0.8):
+    def __init__(self, maxHands=1, detectionCon=0.8, inference_size=None):
         """
         maxHands: número máximo de manos a detectar por cámara.
         detectionCon: confianza mínima para considerar detección.
+        inference_size: resolución (ancho, alto) a la que se ejecuta el modelo;
+        los landmarks se devuelven en coordenadas del frame original.
         """
         self.detector = HandDetector(maxHands=maxHands, detectionCon=detectionCon)
+        self.scaler = InferenceScaler(inference_size)
 
     def findHands(self, img):
         """
         Detecta las manos en un frame de OpenCV.
         Devuelve: imagen anotada, lista de manos detectadas.
         """
-        hands, img = self.detector.findHands(img)  # detecta manos y dibuja landmarks
+        if self.scaler.inference_size is None:
+            hands, img = self.detector.findHands(img)  # detecta manos y dibuja landmarks
+            return img, hands
+
+        hands = self.detect(img)
+        self.draw_hands(img, hands)
         return img, hands
+
+    def detect(self, img):
+        """Detecta las manos sin dibujar sobre el frame"""
+        small = self.scaler.prepare(img)
+        hands = self.detector.findHands(small, draw=False)
+        if small is not img:
+            for hand in hands:
+                map_hand_to_frame(hand, self.scaler.scale_x, self.scaler.scale_y)
+        return hands
+
+    def draw_hands(self, img, hands, color=(255, 0, 255)):
+        """Dibuja landmarks ya calculados (equivalente al dibujo de cvzone)"""
+        for hand in hands:
+            lmList = hand['lmList']
+            for start, end in HAND_CONNECTIONS:
+                cv2.line(img, tuple(lmList[start][:2]), tuple(lmList[end][:2]), (255, 255, 255), 2)
+            for lm in lmList:
+                cv2.circle(img, tuple(lm[:2]), 4, color, -1)
+
+            # Caja y etiqueta "Left"/"Right" como en cvzone findHands(draw=True)
+            x, y, w, h = hand['bbox']
+            cv2.rectangle(img, (x - 20, y - 20), (x + w + 20, y + h + 20), color, 2)
+            if 'type' in hand:
+                cv2.putText(img, hand['type'], (x - 30, y - 30), cv2.FONT_HERSHEY_PLAIN, 2, color, 2)
+        return img
+
+
+class RoiHandTracker:
+    def __init__(self, maxHands=1, detectionCon=0.8, inference_size=None, regions=None,
+                 roi_padding=0.6, roi_size=256, full_search_interval=30):
+        """
+        Seguimiento por región de interés: tras encontrar una mano, el modelo
+        solo procesa un recorte cuadrado alrededor de lmList[9] del frame anterior.
+        regions: lista de (x_inicio, x_fin) por jugador en pantalla dividida;
+        cada mitad tiene su propio detector y solo busca dentro de su zona.
+        roi_padding: margen alrededor del bbox de la mano (fracción de su tamaño).
+        roi_size: lado máximo al que se reduce el recorte antes de inferir.
+        full_search_interval: cada cuántos frames se vuelve a buscar en todo el frame.
+        """
+        self.inference_size = inference_size
+        self.regions = regions
+        self.roi_padding = roi_padding
+        self.roi_size = roi_size
+        self.full_search_interval = full_search_interval
+
+        if regions:
+            self.full_tracker = None
+            slots = len(regions)
+        else:
+            self.full_tracker = HandTracker(maxHands, detectionCon, inference_size)
+            slots = maxHands
+        # Un detector por slot para que MediaPipe no mezcle el tracking entre manos
+        self.slot_trackers = [HandTracker(1, detectionCon) for _ in range(slots)]
+        self.rois = [None] * slots
+        self.frames_since_search = [full_search_interval] * slots
+
+        self.full_searches = 0
+        self.roi_searches = 0
+
+    def reset(self):
+        """Olvidar las ROIs (al reutilizar el tracker en otra partida)"""
+        self.rois = [None] * len(self.rois)
+        self.frames_since_search = [self.full_search_interval] * len(self.rois)
+
+    def findHands(self, img):
+        """Misma interfaz que HandTracker.findHands()"""
+        hands = self.detect(img)
+        self.draw_hands(img, hands)
+        return img, hands
+
+    def draw_hands(self, img, hands, color=(255, 0, 255)):
+        return self.slot_trackers[0].draw_hands(img, hands, color)
+
+    def detect(self, img):
+        """Detecta las manos usando ROI cuando hay seguimiento activo"""
+        if self.regions:
+            return self._detect_regions(img)
+        return self._detect_global(img)
+
+    def _detect_global(self, img):
+        H, W = img.shape[:2]
+        locked = [i for i, roi in enumerate(self.rois) if roi is not None]
+        if not locked or self.frames_since_search[0] >= self.full_search_interval:
+            hands = self.full_tracker.detect(img)
+            self.full_searches += 1
+            self.frames_since_search = [0] * len(self.rois)
+            self.rois = [None] * len(self.rois)
+            for i, hand in enumerate(hands[:len(self.rois)]):
+                self.rois[i] = self._roi_from_hand(hand, 0, W, H)
+            return hands
+
+        hands = []
+        for i in locked:
+            hand = self._detect_in_roi(self.slot_trackers[i], img, self.rois[i])
+            if hand is None or self._is_duplicate(hand, hands):
+                # Mano perdida: en el siguiente frame se busca en todo el frame
+                self.rois[i] = None
+                self.frames_since_search = [self.full_search_interval] * len(self.rois)
+                continue
+            hands.append(hand)
+            self.rois[i] = self._roi_from_hand(hand, 0, W, H)
+        self.frames_since_search = [n + 1 for n in self.frames_since_search]
+        return hands
+
+    def _detect_regions(self, img):
+        H, W = img.shape[:2]
+        hands = []
+        for i, (x_start, x_end) in enumerate(self.regions):
+            tracker = self.slot_trackers[i]
+            if self.rois[i] is None or self.frames_since_search[i] >= self.full_search_interval:
+                # Buscar en toda la mitad del jugador, reducida como el frame completo
+                hand = self._detect_in_box(tracker, img, (x_start, 0, x_end - x_start, H), self._full_scale(W, H))
+                self.full_searches += 1
+                self.frames_since_search[i] = 0
+            else:
+                hand = self._detect_in_roi(tracker, img, self.rois[i])
+                self.frames_since_search[i] += 1
+
+            if hand is None:
+                self.rois[i] = None
+                continue
+            hands.append(hand)
+            self.rois[i] = self._roi_from_hand(hand, x_start, x_end, H)
+        return hands
+
+    def _full_scale(self, W, H):
+        if self.inference_size is None:
+            return 1.0
+        return min(1.0, self.inference_size[0] / W, self.inference_size[1] / H)
+
+    def _roi_from_hand(self, hand, x_start, x_end, H):
+        """Recorte cuadrado centrado en lmList[9], dentro de la zona del jugador"""
+        _, _, bw, bh = hand['bbox']
+        cx, cy = hand['lmList'][9][:2]
+        side = int(max(bw, bh) * (1 + 2 * self.roi_padding))
+        side = max(120, min(side, x_end - x_start, H))
+        x = min(max(cx - side // 2, x_start), x_end - side)
+        y = min(max(cy - side // 2, 0), H - side)
+        return (x, y, side, side)
+
+    def _detect_in_roi(self, tracker, img, roi):
+        self.roi_searches += 1
+        side = roi[2]
+        return self._detect_in_box(tracker, img, roi, min(1.0, self.roi_size / side))
+
+    def _detect_in_box(self, tracker, img, box, scale):
+        x, y, w, h = box
+        crop = img[y:y+h, x:x+w]
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, int(w * scale)), max(1, int(h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        hands = tracker.detector.findHands(crop, draw=False)
+        if not hands:
+            return None
+        return map_hand_to_frame(hands[0], scale, scale, x, y)
+
+    def _is_duplicate(self, hand, hands, min_distance=40):
+        """Dos ROI pueden terminar siguiendo la misma mano"""
+        cx, cy = hand['center']
+        for other in hands:
+            ox, oy = other['center']
+            if abs(cx - ox) < min_distance and abs(cy - oy) < min_distance:
+                return True
+        return False
+
+
+class PipelinedHandTracker:
+    def __init__(self, hand_tracker):
+        """
+        hand_tracker: HandTracker (o RoiHandTracker) que se ejecutará en el hilo de inferencia.
+        Doble buffer: mientras se dibuja el frame N con el resultado publicado,
+        el hilo procesa el frame N+1.
+        """
+        self.hand_tracker = hand_tracker
+
+        self._cond = threading.Condition()
+        self._pending = None            # (img, frame_id, timestamp) esperando inferencia
+        self._result = HandResult([], 0, 0.0)
+
+        self.frames_submitted = 0
+        self.frames_skipped = 0
+
+        self._running = True
+        self._thread = threading.Thread(target=self._inference_loop, name="HandInference", daemon=True)
+        self._thread.start()
+
+    def submit(self, img, frame_id, timestamp):
+        """
+        Encolar un frame para inferencia sin bloquear.
+        El frame no debe modificarse después (pasar una copia si se va a dibujar encima).
+        """
+        with self._cond:
+            if self._pending is not None:
+                self.frames_skipped += 1
+            self._pending = (img, frame_id, timestamp)
+            self.frames_submitted += 1
+            self._cond.notify()
+
+    def latest(self):
+        """Último resultado completo (puede corresponder a un frame anterior)"""
+        with self._cond:
+            return self._result
+
+    def _inference_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or not self._running)
+                if not self._running:
+                    return
+                img, frame_id, timestamp = self._pending
+                self._pending = None
+
+            try:
+                hands = self.hand_tracker.detect(img)
+            except Exception as e:
+                print(f"Error en inferencia: {e}")
+                hands = []
+
+            with self._cond:
+                self._result = HandResult(hands, frame_id, timestamp)
+
+    def stop(self):
+        """Detener el hilo de inferencia"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
@@ -4,97 +4,177 @@
 # Física realista con gravedad para ambos tipos de efectos
 # Gestión de memoria eliminando partículas cuando expiran
 # Funciones de limpieza para reiniciar efectos
+# Las partículas se guardan como arrays de NumPy (estructura de arrays) para
+# actualizar miles de ellas por frame sin bucles de Python.
 import cv2
 import numpy as np
 
+
+class ParticleBuffer:
+    def __init__(self, capacity=256, extra_fields=()):
+        """
+        Arrays preasignados de posición, velocidad, vida, tamaño y color.
+        Solo las primeras 'count' posiciones están vivas; la capacidad se
+        duplica si una ráfaga no entra.
+        """
+        self.count = 0
+        self.capacity = 0
+        self.extra_fields = tuple(extra_fields)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old_count = self.count
+        fields = ('x', 'y', 'vx', 'vy', 'life', 'max_life', 'size') + self.extra_fields
+        for name in fields:
+            new = np.zeros(capacity, dtype=np.float32)
+            if old_count:
+                new[:old_count] = getattr(self, name)[:old_count]
+            setattr(self, name, new)
+
+        color = np.zeros(capacity, dtype=np.int32)  # índice en la paleta
+        if old_count:
+            color[:old_count] = self.color[:old_count]
+        self.color = color
+        self.capacity = capacity
+
+    def spawn(self, n):
+        """Reservar n partículas nuevas y devolver su slice"""
+        if self.count + n > self.capacity:
+            capacity = self.capacity
+            while self.count + n > capacity:
+                capacity *= 2
+            self._allocate(capacity)
+        start = self.count
+        self.count += n
+        return slice(start, self.count)
+
+    def compact(self, alive):
+        """Eliminar partículas muertas con una máscara (sin list.remove)"""
+        n = int(np.count_nonzero(alive))
+        if n == self.count:
+            return
+        for name in ('x', 'y', 'vx', 'vy', 'life', 'max_life', 'size', 'color') + self.extra_fields:
+            arr = getattr(self, name)
+            arr[:n] = arr[:self.count][alive]
+        self.count = n
+
+    def clear(self):
+        self.count = 0
+
+
 class EffectsManager:
     def __init__(self, colors):
         self.colors = colors
-        self.particle_systems = []
-        self.confetti_particles = []
+        self.particle_systems = ParticleBuffer(512)
+        self.confetti_particles = ParticleBuffer(256, extra_fields=('rotation', 'rotation_speed'))
+
+        # Paletas: cada partícula guarda un índice de color
+        self.particle_palette = []
+        self.confetti_palette = [self.colors['accent'], self.colors['success'], self.colors['neon_blue'],
+                                 self.colors['neon_green'], self.colors['purple']]
+
+    def _palette_index(self, color):
+        color = tuple(int(c) for c in color)
+        if color not in self.particle_palette:
+            self.particle_palette.append(color)
+        return self.particle_palette.index(color)
 
     def create_particle_explosion(self, x, y, color, count=20):
         """Crear explosión de partículas en una posición específica"""
-        for _ in range(count):
-            particle = {
-                'x': x + np.random.randint(-15, 15),
-                'y': y + np.random.randint(-15, 15),
-                'vx': np.random.uniform(-10, 10),
-                'vy': np.random.uniform(-15, -5),
-                'life': 80,
-                'max_life': 80,
-                'color': color,
-                'size': np.random.randint(4, 10)
-            }
-            self.particle_systems.append(particle)
+        p = self.particle_systems
+        s = p.spawn(count)
+        p.x[s] = x + np.random.randint(-15, 15, count)
+        p.y[s] = y + np.random.randint(-15, 15, count)
+        p.vx[s] = np.random.uniform(-10, 10, count)
+        p.vy[s] = np.random.uniform(-15, -5, count)
+        p.life[s] = 80
+        p.max_life[s] = 80
+        p.color[s] = self._palette_index(color)
+        p.size[s] = np.random.randint(4, 10, count)
 
     def create_confetti(self, count=50):
         """Crear confetti para celebraciones"""
         width = 1280
-        colors = [self.colors['accent'], self.colors['success'], self.colors['neon_blue'],
-                 self.colors['neon_green'], self.colors['purple']]
-
-        for _ in range(count):
-            particle = {
-                'x': np.random.randint(0, width),
-                'y': np.random.randint(-50, 0),
-                'vx': np.random.uniform(-3, 3),
-                'vy': np.random.uniform(2, 8),
-                'life': np.random.randint(180, 300),
-                'max_life': 300,
-                'color': colors[np.random.randint(0, len(colors))],
-                'size': np.random.randint(4, 12),
-                'rotation': np.random.uniform(0, 360),
-                'rotation_speed': np.random.uniform(-10, 10)
-            }
-            self.confetti_particles.append(particle)
+        c = self.confetti_particles
+        s = c.spawn(count)
+        c.x[s] = np.random.randint(0, width, count)
+        c.y[s] = np.random.randint(-50, 0, count)
+        c.vx[s] = np.random.uniform(-3, 3, count)
+        c.vy[s] = np.random.uniform(2, 8, count)
+        c.life[s] = np.random.randint(180, 300, count)
+        c.max_life[s] = 300
+        c.color[s] = np.random.randint(0, len(self.confetti_palette), count)
+        c.size[s] = np.random.randint(4, 12, count)
+        c.rotation[s] = np.random.uniform(0, 360, count)
+        c.rotation_speed[s] = np.random.uniform(-10, 10, count)
 
     def update_particles(self):
         """Actualizar física de las partículas de explosión"""
-        for particle in self.particle_systems[:]:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['vy'] += 0.4  # Gravedad
-            particle['life'] -= 1
+        p = self.particle_systems
+        n = p.count
+        if n == 0:
+            return
+        p.x[:n] += p.vx[:n]
+        p.y[:n] += p.vy[:n]
+        p.vy[:n] += 0.4  # Gravedad
+        p.life[:n] -= 1
 
-            if particle['life'] <= 0:
-                self.particle_systems.remove(particle)
+        p.compact(p.life[:n] > 0)
 
     def update_confetti(self):
         """Actualizar física del confetti"""
-        for particle in self.confetti_particles[:]:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['vy'] += 0.2  # Gravedad más suave
-            particle['rotation'] += particle['rotation_speed']
-            particle['life'] -= 1
+        c = self.confetti_particles
+        n = c.count
+        if n == 0:
+            return
+        c.x[:n] += c.vx[:n]
+        c.y[:n] += c.vy[:n]
+        c.vy[:n] += 0.2  # Gravedad más suave
+        c.rotation[:n] += c.rotation_speed[:n]
+        c.life[:n] -= 1
 
-            if particle['life'] <= 0 or particle['y'] > 720:
-                self.confetti_particles.remove(particle)
+        c.compact((c.life[:n] > 0) & (c.y[:n] <= 720))
 
     def draw_particles(self, img):
         """Dibujar partículas de explosión"""
-        for particle in self.particle_systems:
-            alpha = particle['life'] / particle['max_life']
-            size = int(particle['size'] * alpha)
-            if size > 0:
-                cv2.circle(img, (int(particle['x']), int(particle['y'])),
-                          size, particle['color'], -1)
+        p = self.particle_systems
+        n = p.count
+        if n == 0:
+            return
+        sizes = (p.size[:n] * (p.life[:n] / p.max_life[:n])).astype(np.int32)
+        visible = sizes > 0
+        xs = p.x[:n][visible].astype(np.int32).tolist()
+        ys = p.y[:n][visible].astype(np.int32).tolist()
+        colors = p.color[:n][visible].tolist()
+        palette = self.particle_palette
+        for x, y, size, color in zip(xs, ys, sizes[visible].tolist(), colors):
+            cv2.circle(img, (x, y), size, palette[color], -1)
 
     def draw_confetti(self, img):
-        """Dibujar confetti"""
-        for particle in self.confetti_particles:
-            alpha = particle['life'] / particle['max_life']
-            size = int(particle['size'] * alpha)
-            if size > 0:
-                x, y = int(particle['x']), int(particle['y'])
-                pts = np.array([
-                    [x-size//2, y-size//4],
-                    [x+size//2, y-size//4],
-                    [x+size//2, y+size//4],
-                    [x-size//2, y+size//4]
-                ], np.int32)
-                cv2.fillPoly(img, [pts], particle['color'])
+        """Dibujar confetti: un rectángulo relleno por partícula"""
+        c = self.confetti_particles
+        n = c.count
+        if n == 0:
+            return
+        sizes = (c.size[:n] * (c.life[:n] / c.max_life[:n])).astype(np.int32)
+        visible = sizes > 0
+        if not visible.any():
+            return
+
+        size = sizes[visible]
+        x = c.x[:n][visible].astype(np.int32)
+        y = c.y[:n][visible].astype(np.int32)
+        half_w, quarter_h = size // 2, size // 4
+
+        # Rectángulos alineados a los ejes: cada uno por separado para que los
+        # que se superponen no se anulen (fillPoly con varios polígonos usa par-impar)
+        x0 = (x - half_w).tolist()
+        y0 = (y - quarter_h).tolist()
+        x1 = (x + half_w).tolist()
+        y1 = (y + quarter_h).tolist()
+        palette = self.confetti_palette
+        for left, top, right, bottom, color in zip(x0, y0, x1, y1, c.color[:n][visible].tolist()):
+            cv2.rectangle(img, (left, top), (right, bottom), palette[color], -1)
 
     def clear_particles(self):
         """Limpiar todas las partículas de explosión"""
@@ -107,4 +187,4 @@ class EffectsManager:
     def clear_all_effects(self):
         """Limpiar todos los efectos"""
         self.clear_particles()
-        self.clear_confetti()
\ No newline at end of file
+        self.clear_confetti()
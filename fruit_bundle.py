@@ -0,0 +1,204 @@
+# fruit_bundle.py
+# Paquete precalculado con las imágenes de Fruit Ninja: cada fruta escalada y
+# su glow (o la fruta sintética si falta el PNG) en un solo archivo, para no
+# repetir el escalado y las cinco capas de brillo en cada arranque.
+#
+# Formato: MAGIC | uint32 largo del encabezado | encabezado JSON | píxeles RGBA
+# El encabezado guarda nombre, color y posición de cada imagen, más la clave
+# (hash de los PNG y de los parámetros) para saber si el paquete quedó viejo.
+# Los píxeles se abren con np.memmap y se convierten a Surface de una pasada.
+#
+# Generarlo por adelantado: python fruit_bundle.py
+# Si falta o está desactualizado, el juego lo genera y lo guarda al arrancar.
+import hashlib
+import json
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+BUNDLE_PATH = os.path.join('frutas', 'fruits.bundle')
+BUNDLE_MAGIC = b'FNBUNDL1'
+# Subir si cambia cómo se generan las imágenes (escala, glow, frutas sintéticas)
+BUNDLE_VERSION = 1
+FRUIT_SIZE = (40, 40)
+
+# (nombre, imagen, color neón)
+FRUIT_SOURCES = [
+    ("cereza", "frutas/cereza.png", (255, 20, 147)),     # NEON_PINK
+    ("manzana", "frutas/manzana.png", (57, 255, 20)),    # NEON_GREEN
+    ("sandia", "frutas/sandia.png", (255, 105, 180)),    # HOT_PINK
+    ("mora", "frutas/mora.png", (138, 43, 226)),         # NEON_PURPLE
+    ("naranja", "frutas/naranja.png", (255, 165, 0))     # NEON_ORANGE
+]
+
+def load_fruit_images() -> List[Dict]:
+    """Generar imagen y glow de cada fruta desde los PNG (sin usar el paquete)"""
+    loaded_fruits = []
+    for name, path, neon_color in FRUIT_SOURCES:
+        try:
+            image = _with_alpha(pygame.image.load(path))
+            # 🥝 CAMBIO CLAVE: Escalar la imagen a un tamaño razonable
+            image = pygame.transform.scale(image, FRUIT_SIZE)
+            # Aplicar efecto de brillo
+            glow_image = create_glow_effect(image, neon_color)
+            loaded_fruits.append({
+                "name": name, 
+                "image": image,
+                "glow_image": glow_image,
+                "color": neon_color
+            })
+        except (pygame.error, OSError):
+            # Crear frutas sintéticas si no existen las imágenes
+            synthetic_image = create_synthetic_fruit(name, neon_color)
+            glow_image = create_glow_effect(synthetic_image, neon_color)
+            loaded_fruits.append({
+                "name": name,
+                "image": synthetic_image,
+                "glow_image": glow_image,
+                "color": neon_color
+            })
+    return loaded_fruits
+
+def create_synthetic_fruit(name: str, color: Tuple[int, int, int]) -> pygame.Surface:
+    """Crea una fruta sintética si no existe la imagen"""
+    # 🥝 CAMBIO CLAVE: Reducir el tamaño de la superficie base a 20x20
+    surf = pygame.Surface((20, 20), pygame.SRCALPHA)
+    center = (10, 10) # <-- Ajustar el centro
+    
+    # Gradiente circular más pequeño
+    for r in range(9, 0, -1): # <-- Ajustar el radio máximo
+        alpha = int(255 * (r / 15))
+        temp_color = (*color, alpha)
+        pygame.draw.circle(surf, temp_color, center, r)
+    
+    # Brillo central más pequeño
+    pygame.draw.circle(surf, (255, 255, 255, 180), (8, 8), 3) # <-- Ajustar posición y radio
+    
+    # 🥝 CAMBIO CLAVE: Escalar la imagen sintética a 40x40 para que coincida con las cargadas
+    final_surf = pygame.transform.scale(surf, (40, 40))
+    return final_surf
+
+def create_glow_effect(image: pygame.Surface, glow_color: Tuple[int, int, int]) -> pygame.Surface:
+    """Crea un efecto de brillo alrededor de la imagen"""
+    size = image.get_size()
+    glow_surf = pygame.Surface((size[0] + 20, size[1] + 20), pygame.SRCALPHA)
+    
+    # Múltiples capas de brillo
+    for i in range(5):
+        temp_surf = pygame.Surface((size[0] + i*4, size[1] + i*4), pygame.SRCALPHA)
+        # Usar la imagen de entrada que ya está escalada
+        scaled_img = pygame.transform.scale(image, (size[0] + i*4, size[1] + i*4))
+        temp_surf.blit(scaled_img, (0, 0))
+        
+        # Aplicar color de brillo
+        temp_surf.fill((*glow_color, 50 - i*8), special_flags=pygame.BLEND_RGBA_MULT)
+        glow_surf.blit(temp_surf, (10 - i*2, 10 - i*2))
+    
+    # Imagen original encima
+    glow_surf.blit(image, (10, 10))
+    return glow_surf
+
+def _with_alpha(surface: pygame.Surface) -> pygame.Surface:
+    """convert_alpha() si ya hay ventana (blits rápidos); sin ventana (python fruit_bundle.py) queda igual"""
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return surface.convert_alpha()
+    return surface
+
+def bundle_key() -> str:
+    """Hash de los PNG de origen y de los parámetros con que se procesan"""
+    digest = hashlib.sha1(repr((BUNDLE_VERSION, FRUIT_SIZE, FRUIT_SOURCES)).encode())
+    for name, path, _ in FRUIT_SOURCES:
+        try:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(f"missing:{name}".encode())
+    return digest.hexdigest()
+
+def save_bundle(fruits: List[Dict], path: str = BUNDLE_PATH, key: Optional[str] = None):
+    """Escribir las frutas (imagen y glow en RGBA) en un solo archivo"""
+    entries = []
+    pixels = []
+    offset = 0
+    for fruit in fruits:
+        entry = {"name": fruit["name"], "color": list(fruit["color"])}
+        for field in ("image", "glow_image"):
+            surface = fruit[field]
+            data = pygame.image.tostring(surface, "RGBA")
+            entry[field] = {"offset": offset, "size": list(surface.get_size())}
+            pixels.append(data)
+            offset += len(data)
+        entries.append(entry)
+
+    header = json.dumps({"version": BUNDLE_VERSION, "key": key or bundle_key(), "fruits": entries}).encode()
+    # Los píxeles empiezan alineados a 16 bytes
+    header += b' ' * (-(len(BUNDLE_MAGIC) + 4 + len(header)) % 16)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(struct.pack('<I', len(header)))
+        f.write(header)
+        for data in pixels:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+def load_bundle(path: str = BUNDLE_PATH, key: Optional[str] = None) -> Optional[List[Dict]]:
+    """Frutas del paquete, o None si no existe, está dañado o su clave no coincide"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+                return None
+            (header_len,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_len))
+    except (OSError, ValueError, struct.error):
+        return None
+    if header.get("version") != BUNDLE_VERSION or (key is not None and header.get("key") != key):
+        return None
+
+    # Un archivo truncado no alcanza para todos los píxeles: se reconstruye
+    pixels_offset = len(BUNDLE_MAGIC) + 4 + header_len
+    try:
+        pixels_end = max(entry[field]["offset"] + entry[field]["size"][0] * entry[field]["size"][1] * 4
+                         for entry in header["fruits"] for field in ("image", "glow_image"))
+        if os.path.getsize(path) < pixels_offset + pixels_end:
+            return None
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+    # Copy-on-write: frombuffer necesita un buffer escribible, el archivo no se toca
+    data = np.memmap(path, dtype=np.uint8, mode='c', offset=pixels_offset)
+    fruits = []
+    for entry in header["fruits"]:
+        fruit = {"name": entry["name"], "color": tuple(entry["color"])}
+        for field in ("image", "glow_image"):
+            w, h = entry[field]["size"]
+            start = entry[field]["offset"]
+            view = pygame.image.frombuffer(data[start:start + w * h * 4], (w, h), "RGBA")
+            # La conversión copia los píxeles y suelta la referencia al memmap
+            fruit[field] = _with_alpha(view)
+        fruits.append(fruit)
+    return fruits
+
+def load_fruits(path: str = BUNDLE_PATH) -> List[Dict]:
+    """Frutas desde el paquete; si falta o quedó viejo se generan y se guarda uno nuevo"""
+    key = bundle_key()
+    fruits = load_bundle(path, key)
+    if fruits is not None:
+        return fruits
+
+    fruits = load_fruit_images()
+    try:
+        save_bundle(fruits, path, key)
+    except OSError as e:
+        print(f"No se pudo guardar {path}: {e}")
+    return fruits
+
+if __name__ == "__main__":
+    fruits = load_fruit_images()
+    save_bundle(fruits)
+    size = os.path.getsize(BUNDLE_PATH)
+    print(f"{BUNDLE_PATH}: {len(fruits)} frutas, {size / 1024:.1f} KB")
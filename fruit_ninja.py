@@ -2,20 +2,24 @@ import cv2
 import mediapipe as mp
 import pygame
 import random
-import sys
 import numpy as np
 import math
 import time
+from collections import OrderedDict
 from typing import List, Dict, Tuple
 
-# --- Inicializar pygame ---
-pygame.init()
-pygame.mixer.init()
+from camera import open_camera
+from fruit_bundle import load_fruits
+from fruit_ninja_engine import FruitNinjaEngine
+from profiler import FrameProfiler
+from utils import InferenceScaler
 
 # --- CONFIGURACIÓN DE PANTALLA FIJA (Ventana) ---
+# La ventana y la cámara se abren en main(): importar el módulo solo carga el
+# detector, así el menú puede tenerlo listo antes de lanzar el juego
 WIDTH, HEIGHT = 800, 600
-window = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("🥷 RETRO FRUIT NINJA ⚔️✨")
+WINDOW_TITLE = "🥷 RETRO FRUIT NINJA ⚔️✨"
+window = None
 
 # === COLORES RETRO NEON ===
 BLACK = (0, 0, 0)
@@ -33,36 +37,31 @@ GOLD = (255, 215, 0)
 SILVER = (192, 192, 192)
 
 # === CONFIGURACIÓN DEL JUEGO ===
-GAME_DURATION = 3 * 60 * 1000
-LEVEL_UP_TIME = 30 * 1000
-BASE_SPEED_MIN = 5
-BASE_SPEED_MAX = 10
+# (Duración, niveles y velocidades están en fruit_ninja_engine)
 CALIBRATION_TIME_MS = 4000
+# Ángulos precalculados por fruta (la rotación se redondea al más cercano)
+ROTATION_STEPS = 64
+# Rango del pulso del brillo de las frutas, en píxeles
+GLOW_PULSE_MIN, GLOW_PULSE_MAX = 5, 15
+# Máximo de partículas vivas a la vez (las que no entran se descartan)
+PARTICLE_BUDGET = 1500
+# Resolución a la que corre el modelo de manos (4:3 como la cámara por defecto)
+INFERENCE_SIZE = (480, 360)
 
 # === VARIABLES DE ESTADO ===
 game_state = "MENU"
 num_players = 1
 calibration_start_time = 0
 
-player_states = {
-    1: {"score": 0, "alive": True, "death_time": 0, "combo": 0, "last_hit_time": 0},
-    2: {"score": 0, "alive": True, "death_time": 0, "combo": 0, "last_hit_time": 0}
-}
-
-objects = []
 splashes = []
-particles = []
 sword_trails = []
-background_particles = []
 screen_effects = []
 combo_texts = []
-start_time = pygame.time.get_ticks()
-current_level = 0
-frame_count = 0
 menu_time = 0
+last_step_time = 0
 
 # === CONFIGURACIÓN CÁMARA ===
-cap = cv2.VideoCapture(0)
+cap = None
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(
     static_image_mode=False,
@@ -71,61 +70,182 @@ hands = mp_hands.Hands(
     min_tracking_confidence=0.5
 )
 mp_draw = mp.solutions.drawing_utils
+inference_scaler = InferenceScaler(INFERENCE_SIZE)
 clock = pygame.time.Clock()
 
+# Tiempos por etapa (P: mostrar/ocultar HUD de rendimiento)
+profiler = FrameProfiler("fruit_ninja")
+
+# === FUENTES Y TEXTOS ===
+
+# Los tamaños que pulsan se redondean a este paso para reutilizar textos cacheados
+PULSE_SIZE_STEP = 2
+# Niveles de transparencia distintos que se cachean para textos que se desvanecen
+ALPHA_BUCKETS = 16
+
+class TextRenderer:
+    """
+    Registro de fuentes (una por nombre y tamaño) y caché LRU de textos
+    renderizados, para no llamar a SysFont ni a render() en cada frame.
+    """
+    def __init__(self, max_entries: int = 256):
+        self.fonts: Dict[Tuple, pygame.font.Font] = {}
+        self.max_entries = max_entries
+        self._texts = OrderedDict()
+
+    def font(self, size: int, name=None) -> pygame.font.Font:
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text: str, size: int, color: Tuple[int, int, int], alpha: int = 255, name=None) -> pygame.Surface:
+        # El alfa se cuantiza para que un texto que se desvanece use pocas entradas
+        if alpha < 255:
+            step = 256 // ALPHA_BUCKETS
+            alpha = max(0, alpha // step * step)
+        key = (text, size, tuple(color), alpha, name)
+        surf = self._texts.get(key)
+        if surf is not None:
+            self._texts.move_to_end(key)
+            return surf
+
+        surf = self.font(size, name).render(text, True, color)
+        if alpha < 255:
+            surf.set_alpha(alpha)
+        self._texts[key] = surf
+        if len(self._texts) > self.max_entries:
+            self._texts.popitem(last=False)
+        return surf
+
+text_renderer = TextRenderer()
+
+def pulse_size(base_size: int, pulse: float) -> int:
+    """Tamaño de fuente pulsante redondeado a PULSE_SIZE_STEP"""
+    return int(round((base_size + pulse) / PULSE_SIZE_STEP)) * PULSE_SIZE_STEP
+
 # === CLASES PARA EFECTOS ===
 
-class Particle:
-    def __init__(self, x: int, y: int, color: Tuple[int, int, int], size: int = 3):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-5, 5)
-        self.vy = random.uniform(-8, -2)
-        self.color = color
-        self.size = size
-        self.life = 255
+def circle_sprite(color: Tuple[int, int, int], radius: int, alpha: int) -> pygame.Surface:
+    """Círculo SRCALPHA prerenderizado y compartido por tamaño, color y alfa"""
+    key = (color, radius, alpha)
+    sprite = _circle_sprites.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+        _circle_sprites[key] = sprite
+    return sprite
+
+_circle_sprites: Dict[Tuple, pygame.Surface] = {}
+
+class ParticlePool:
+    """
+    Partículas de explosión en arrays de NumPy con capacidad fija:
+    al llegar al presupuesto las nuevas se descartan en vez de crecer sin límite.
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.fade_speed = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros(capacity, dtype=np.int16)  # índice en la paleta
         self.gravity = 0.3
-        self.fade_speed = random.uniform(3, 8)
+        self.palette: List[Tuple[int, int, int]] = []
+
+    def _color_index(self, color: Tuple[int, int, int]) -> int:
+        color = tuple(color)
+        if color not in self.palette:
+            self.palette.append(color)
+        return self.palette.index(color)
+
+    def spawn(self, x: int, y: int, color: Tuple[int, int, int], count: int = 1, size_range: Tuple[int, int] = (3, 8)):
+        n = min(count, self.capacity - self.count)
+        self.dropped += count - n
+        if n <= 0:
+            return
+        s = slice(self.count, self.count + n)
+        self.x[s] = x
+        self.y[s] = y
+        self.vx[s] = np.random.uniform(-5, 5, n)
+        self.vy[s] = np.random.uniform(-8, -2, n)
+        self.size[s] = np.random.randint(size_range[0], size_range[1] + 1, n)
+        self.life[s] = 255
+        self.fade_speed[s] = np.random.uniform(3, 8, n)
+        self.color[s] = self._color_index(color)
+        self.count += n
 
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += self.gravity
-        self.life -= self.fade_speed
-        self.size = max(1, self.size - 0.05)
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += self.gravity
+        self.life[:n] -= self.fade_speed[:n]
+        np.maximum(self.size[:n] - 0.05, 1, out=self.size[:n])
+
+        # Compactar las vivas al principio de los arrays (sin list.remove)
+        alive = self.life[:n] > 0
+        m = int(np.count_nonzero(alive))
+        if m < n:
+            for arr in (self.x, self.y, self.vx, self.vy, self.size, self.life, self.fade_speed, self.color):
+                arr[:m] = arr[:n][alive]
+            self.count = m
 
     def draw(self, surface):
-        if self.life > 0:
-            alpha = max(0, int(self.life))
-            color_with_alpha = (*self.color, alpha)
-            temp_surf = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(temp_surf, color_with_alpha, (self.size, self.size), int(self.size))
-            surface.blit(temp_surf, (int(self.x - self.size), int(self.y - self.size)))
-
-class BackgroundParticle:
-    def __init__(self):
-        self.x = random.randint(0, WIDTH)
-        self.y = random.randint(0, HEIGHT)
-        self.speed = random.uniform(0.5, 2)
-        self.size = random.randint(1, 3)
-        self.color = random.choice([NEON_CYAN, NEON_PINK, NEON_GREEN, NEON_PURPLE])
-        self.alpha = random.randint(50, 150)
-        self.direction = random.uniform(0, 360)
+        n = self.count
+        if n == 0:
+            return
+        step = 256 // ALPHA_BUCKETS
+        radius = self.size[:n].astype(np.int32)
+        alpha = (np.clip(self.life[:n], 0, 255).astype(np.int32) // step) * step
+        visible = alpha > 0
+        radius = radius[visible]
+        xs = (self.x[:n][visible] - radius).astype(np.int32).tolist()
+        ys = (self.y[:n][visible] - radius).astype(np.int32).tolist()
+        palette = self.palette
+        surface.blits([(circle_sprite(palette[c], r, a), (x, y))
+                       for x, y, r, a, c in zip(xs, ys, radius.tolist(), alpha[visible].tolist(),
+                                                self.color[:n][visible].tolist())],
+                      doreturn=False)
+
+    def clear(self):
+        self.count = 0
+
+class BackgroundField:
+    """Partículas de fondo que flotan en línea recta y reaparecen por el borde opuesto"""
+    def __init__(self, count: int):
+        colors = [NEON_CYAN, NEON_PINK, NEON_GREEN, NEON_PURPLE]
+        self.x = np.random.randint(0, WIDTH + 1, count).astype(np.float32)
+        self.y = np.random.randint(0, HEIGHT + 1, count).astype(np.float32)
+        direction = np.radians(np.random.uniform(0, 360, count))
+        speed = np.random.uniform(0.5, 2, count)
+        self.vx = (np.cos(direction) * speed).astype(np.float32)
+        self.vy = (np.sin(direction) * speed).astype(np.float32)
+        self.size = np.random.randint(1, 4, count)
+        self.sprites = [circle_sprite(random.choice(colors), int(size), random.randint(50, 150))
+                        for size in self.size]
 
     def update(self):
-        self.x += math.cos(math.radians(self.direction)) * self.speed
-        self.y += math.sin(math.radians(self.direction)) * self.speed
-        
-        if self.x < 0: self.x = WIDTH
-        if self.x > WIDTH: self.x = 0
-        if self.y < 0: self.y = HEIGHT
-        if self.y > HEIGHT: self.y = 0
+        self.x += self.vx
+        self.y += self.vy
+        self.x[self.x < 0] = WIDTH
+        self.x[self.x > WIDTH] = 0
+        self.y[self.y < 0] = HEIGHT
+        self.y[self.y > HEIGHT] = 0
 
     def draw(self, surface):
-        temp_surf = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-        color_with_alpha = (*self.color, self.alpha)
-        pygame.draw.circle(temp_surf, color_with_alpha, (self.size, self.size), self.size)
-        surface.blit(temp_surf, (int(self.x - self.size), int(self.y - self.size)))
+        xs = (self.x - self.size).astype(np.int32).tolist()
+        ys = (self.y - self.size).astype(np.int32).tolist()
+        surface.blits(list(zip(self.sprites, zip(xs, ys))), doreturn=False)
 
 class SwordTrail:
     def __init__(self, points: List[Tuple[int, int]], color: Tuple[int, int, int]):
@@ -138,16 +258,41 @@ class SwordTrail:
         self.alpha -= 15
         self.width = max(1, self.width - 0.3)
 
-    def draw(self, surface):
+    def draw(self, layer):
         if len(self.points) > 1 and self.alpha > 0:
+            color_with_alpha = (*self.color, max(0, int(self.alpha)))
             for i in range(len(self.points) - 1):
-                start_pos = self.points[i]
-                end_pos = self.points[i + 1]
-                
-                temp_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                color_with_alpha = (*self.color, max(0, int(self.alpha)))
-                pygame.draw.line(temp_surf, color_with_alpha, start_pos, end_pos, int(self.width))
-                surface.blit(temp_surf, (0, 0))
+                layer.line(color_with_alpha, self.points[i], self.points[i + 1], int(self.width))
+
+class EffectLayer:
+    """
+    Capa SRCALPHA persistente compartida por trails, brillos y espadas.
+    Solo se limpia lo que se dibujó el frame anterior y se compone con un único blit.
+    """
+    def __init__(self, size: Tuple[int, int]):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.dirty: List[pygame.Rect] = []
+
+    def clear(self):
+        for rect in self.dirty:
+            self.surface.fill((0, 0, 0, 0), rect)
+        self.dirty = []
+
+    def line(self, color, start_pos, end_pos, width: int = 1):
+        self.dirty.append(pygame.draw.line(self.surface, color, start_pos, end_pos, width))
+
+    def polygon(self, color, points, width: int = 0):
+        self.dirty.append(pygame.draw.polygon(self.surface, color, points, width))
+
+    def circle(self, color, center, radius: int, width: int = 0):
+        self.dirty.append(pygame.draw.circle(self.surface, color, center, radius, width))
+
+    def present(self, surface):
+        """Mezclar sobre surface solo el área dibujada (sin solapar blits)"""
+        if not self.dirty:
+            return
+        area = self.dirty[0].unionall(self.dirty[1:])
+        surface.blit(self.surface, area.topleft, area)
 
 class ScreenShake:
     def __init__(self, intensity: int, duration: int):
@@ -183,7 +328,6 @@ class ComboText:
 
     def draw(self, surface):
         alpha = int(255 * (1 - self.timer / self.max_time))
-        font = pygame.font.SysFont(None, int(self.size))
         
         if self.combo >= 5:
             color = NEON_PINK
@@ -195,127 +339,66 @@ class ComboText:
             color = NEON_YELLOW
             text = f"x{self.combo}"
         
-        temp_surf = pygame.Surface((300, 60), pygame.SRCALPHA)
-        text_surf = font.render(text, True, (*color, alpha))
-        temp_surf.blit(text_surf, (0, 0))
-        surface.blit(temp_surf, (self.x - 150, self.y - 30))
-
-# === INICIALIZACIÓN DE PARTÍCULAS DE FONDO ===
-for _ in range(50):
-    background_particles.append(BackgroundParticle())
-
-# === FUNCIONES DE CARGA ===
-
-def load_fruit_images():
-    fruit_data = [
-        ("cereza", "frutas/cereza.png", NEON_PINK),
-        ("manzana", "frutas/manzana.png", NEON_GREEN),
-        ("sandia", "frutas/sandia.png", HOT_PINK),
-        ("mora", "frutas/mora.png", NEON_PURPLE),
-        ("naranja", "frutas/naranja.png", NEON_ORANGE)
-    ]
-    
-    loaded_fruits = []
-    for name, path, neon_color in fruit_data:
-        try:
-            image = pygame.image.load(path).convert_alpha()
-            # 🥝 CAMBIO CLAVE: Escalar la imagen a un tamaño razonable
-            image = pygame.transform.scale(image, (40, 40)) 
-            # Aplicar efecto de brillo
-            glow_image = create_glow_effect(image, neon_color)
-            loaded_fruits.append({
-                "name": name, 
-                "image": image,
-                "glow_image": glow_image,
-                "color": neon_color
-            })
-        except pygame.error:
-            # Crear frutas sintéticas si no existen las imágenes
-            synthetic_image = create_synthetic_fruit(name, neon_color)
-            glow_image = create_glow_effect(synthetic_image, neon_color)
-            loaded_fruits.append({
-                "name": name,
-                "image": synthetic_image,
-                "glow_image": glow_image,
-                "color": neon_color
-            })
-    return loaded_fruits
-
-def create_synthetic_fruit(name: str, color: Tuple[int, int, int]) -> pygame.Surface:
-    """Crea una fruta sintética si no existe la imagen"""
-    # 🥝 CAMBIO CLAVE: Reducir el tamaño de la superficie base a 20x20
-    surf = pygame.Surface((20, 20), pygame.SRCALPHA)
-    center = (10, 10) # <-- Ajustar el centro
-    
-    # Gradiente circular más pequeño
-    for r in range(9, 0, -1): # <-- Ajustar el radio máximo
-        alpha = int(255 * (r / 15))
-        temp_color = (*color, alpha)
-        pygame.draw.circle(surf, temp_color, center, r)
-    
-    # Brillo central más pequeño
-    pygame.draw.circle(surf, (255, 255, 255, 180), (8, 8), 3) # <-- Ajustar posición y radio
-    
-    # 🥝 CAMBIO CLAVE: Escalar la imagen sintética a 40x40 para que coincida con las cargadas
-    final_surf = pygame.transform.scale(surf, (40, 40))
-    return final_surf
-
-def create_glow_effect(image: pygame.Surface, glow_color: Tuple[int, int, int]) -> pygame.Surface:
-    """Crea un efecto de brillo alrededor de la imagen"""
-    size = image.get_size()
-    glow_surf = pygame.Surface((size[0] + 20, size[1] + 20), pygame.SRCALPHA)
-    
-    # Múltiples capas de brillo
-    for i in range(5):
-        temp_surf = pygame.Surface((size[0] + i*4, size[1] + i*4), pygame.SRCALPHA)
-        # Usar la imagen de entrada que ya está escalada
-        scaled_img = pygame.transform.scale(image, (size[0] + i*4, size[1] + i*4))
-        temp_surf.blit(scaled_img, (0, 0))
-        
-        # Aplicar color de brillo
-        temp_surf.fill((*glow_color, 50 - i*8), special_flags=pygame.BLEND_RGBA_MULT)
-        glow_surf.blit(temp_surf, (10 - i*2, 10 - i*2))
-    
-    # Imagen original encima
-    glow_surf.blit(image, (10, 10))
-    return glow_surf
-
-try:
-    fruit_images = load_fruit_images()
-except:
-    # Crear frutas sintéticas como respaldo
-    fruit_images = []
-    colors = [NEON_PINK, NEON_GREEN, HOT_PINK, NEON_PURPLE, NEON_ORANGE]
-    names = ["cereza", "manzana", "sandia", "mora", "naranja"]
-    
-    for name, color in zip(names, colors):
-        synthetic_image = create_synthetic_fruit(name, color)
-        glow_image = create_glow_effect(synthetic_image, color)
-        fruit_images.append({
-            "name": name,
-            "image": synthetic_image,
-            "glow_image": glow_image,
-            "color": color
-        })
+        text_surf = text_renderer.render(text, int(self.size), color, alpha)
+        surface.blit(text_surf, (self.x - 150, self.y - 30), pygame.Rect(0, 0, 300, 60))
+
+# === INICIALIZACIÓN DE PARTÍCULAS ===
+particles = ParticlePool(PARTICLE_BUDGET)
+background_particles = BackgroundField(50)
+
+def build_fruit_atlas(fruits: List[Dict]):
+    """
+    Prerrotar cada fruta (imagen con glow) en ROTATION_STEPS ángulos y
+    prerenderizar las elipses del brillo pulsante para cada tamaño posible.
+    """
+    for fruit in fruits:
+        rotations = [pygame.transform.rotate(fruit["glow_image"], i * 360 / ROTATION_STEPS)
+                     for i in range(ROTATION_STEPS)]
+        glow_frames = {}
+        for w, h in {frame.get_size() for frame in rotations}:
+            for pulse in range(GLOW_PULSE_MIN, GLOW_PULSE_MAX + 1):
+                size = (w + pulse, h + pulse)
+                glow_surf = pygame.Surface(size, pygame.SRCALPHA)
+                pygame.draw.ellipse(glow_surf, (*fruit["color"], 100), glow_surf.get_rect())
+                glow_frames[size] = glow_surf
+        fruit["rotations"] = rotations
+        fruit["glow_frames"] = glow_frames
+
+def fruit_frame(obj) -> pygame.Surface:
+    """Imagen prerrotada más cercana a la rotación actual del objeto"""
+    index = int(round(obj["rotation"] * ROTATION_STEPS / 360)) % ROTATION_STEPS
+    return fruit_images[obj["fruit"]]["rotations"][index]
+
+fruit_images: List[Dict] = []
+engine = None
+
+def load_assets():
+    """Cargar las frutas y crear el motor (la primera vez que se abre la ventana)"""
+    global fruit_images, engine
+    # Imagen y glow de cada fruta desde el paquete precalculado (fruit_bundle.py)
+    fruit_images = load_fruits()
+
+    build_fruit_atlas(fruit_images)
+
+    # Lógica de la partida (spawn, movimiento, colisiones, combos y puntaje)
+    engine = FruitNinjaEngine([fruit["color"] for fruit in fruit_images], WIDTH, HEIGHT)
 
 # === FUNCIONES DE EFECTOS VISUALES ===
 
-def draw_glitch_text(surface, text: str, pos: Tuple[int, int], font, color: Tuple[int, int, int]):
+def draw_glitch_text(surface, text: str, pos: Tuple[int, int], size: int, color: Tuple[int, int, int]):
     """Efecto de texto glitcheado"""
     offsets = [(0, 0), (2, 0), (-2, 0), (0, 2), (0, -2)]
     colors = [color, NEON_CYAN, NEON_PINK, NEON_GREEN, NEON_PURPLE]
     
     for offset, glitch_color in zip(offsets, colors):
         glitch_pos = (pos[0] + offset[0], pos[1] + offset[1])
-        text_surf = font.render(text, True, glitch_color)
+        text_surf = text_renderer.render(text, size, glitch_color)
         surface.blit(text_surf, text_surf.get_rect(center=glitch_pos))
 
 def draw_pulsing_text(surface, text: str, pos: Tuple[int, int], base_size: int, color: Tuple[int, int, int], time_factor: float):
     """Texto que pulsa"""
     pulse = math.sin(time_factor / 200) * 10
-    font_size = int(base_size + pulse)
-    font = pygame.font.SysFont(None, font_size)
-    text_surf = font.render(text, True, color)
+    text_surf = text_renderer.render(text, pulse_size(base_size, pulse), color)
     surface.blit(text_surf, text_surf.get_rect(center=pos))
 
 def draw_retro_border(surface, rect: pygame.Rect, color: Tuple[int, int, int], width: int = 3):
@@ -338,57 +421,12 @@ def draw_retro_border(surface, rect: pygame.Rect, color: Tuple[int, int, int], w
 
 def create_explosion_particles(x: int, y: int, color: Tuple[int, int, int], count: int = 15):
     """Crea partículas de explosión"""
-    global particles
-    for _ in range(count):
-        particles.append(Particle(x, y, color, random.randint(3, 8)))
+    particles.spawn(x, y, color, count, size_range=(3, 8))
 
 # === FUNCIONES DE JUEGO ===
 
-def spawn_object(level: int, player_zone: int = 0):
-    """Genera objetos con efectos visuales mejorados"""
-    speed_min = BASE_SPEED_MIN + level * 1.5
-    speed_max = BASE_SPEED_MAX + level * 2.5
-    bomb_prob = min(0.5, 0.2 + level * 0.1)
-    
-    speed = random.randint(int(speed_min), int(speed_max))
-    y = -50
-    
-    if player_zone == 1:
-        x_min, x_max = 50, WIDTH // 2 - 50
-    elif player_zone == 2:
-        x_min, x_max = WIDTH // 2 + 50, WIDTH - 50
-    else:
-        x_min, x_max = 50, WIDTH - 50
-        
-    x = random.randint(x_min, x_max)
-
-    # El tamaño del rectángulo de colisión debe ser similar al de la imagen escalada (40x40)
-    rect_size = 40 
-
-    if random.random() < bomb_prob:
-        return {
-            "rect": pygame.Rect(x, y, rect_size, rect_size),
-            "speed": speed,
-            "kind": "bomb",
-            "zone": player_zone,
-            "rotation": 0,
-            "pulse_time": 0
-        }
-    else:
-        fruit_item = random.choice(fruit_images)
-        return {
-            "rect": pygame.Rect(x, y, rect_size, rect_size),
-            "speed": speed,
-            "image": fruit_item["glow_image"],
-            "kind": "fruit",
-            "zone": player_zone,
-            "color": fruit_item["color"],
-            "rotation": 0,
-            "spin_speed": random.uniform(-10, 10)
-        }
-
-def draw_neon_sword(surface, center_pos: Tuple[int, int], angle: float = 0, color: Tuple[int, int, int] = SILVER, player_id: int = 1):
-    """Dibuja espada con efectos neón"""
+def draw_neon_sword(layer, center_pos: Tuple[int, int], angle: float = 0, color: Tuple[int, int, int] = SILVER, player_id: int = 1):
+    """Dibuja espada con efectos neón sobre la capa de efectos"""
     cx, cy = center_pos
 
     cos_a = math.cos(math.radians(angle))
@@ -402,8 +440,8 @@ def draw_neon_sword(surface, center_pos: Tuple[int, int], angle: float = 0, colo
     blade_length = 90
     blade_width = 10
     
-    # Efecto de brillo de la hoja
-    for i in range(5):
+    # Efecto de brillo de la hoja (de la capa más grande a la más intensa)
+    for i in range(4, -1, -1):
         glow_color = (*color, 100 - i * 15)
         blade_points = [
             rotate_point(-blade_width // 2 - i, 0),
@@ -411,10 +449,7 @@ def draw_neon_sword(surface, center_pos: Tuple[int, int], angle: float = 0, colo
             rotate_point(blade_width // 2 + i, blade_length + i * 2),
             rotate_point(-blade_width // 2 - i, blade_length + i * 2)
         ]
-        
-        temp_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        pygame.draw.polygon(temp_surf, glow_color, blade_points)
-        surface.blit(temp_surf, (0, 0))
+        layer.polygon(glow_color, blade_points)
     
     # Hoja principal
     blade_points = [
@@ -423,7 +458,7 @@ def draw_neon_sword(surface, center_pos: Tuple[int, int], angle: float = 0, colo
         rotate_point(blade_width // 2, blade_length),
         rotate_point(-blade_width // 2, blade_length)
     ]
-    pygame.draw.polygon(surface, color, blade_points)
+    layer.polygon((*color, 255), blade_points)
     
     # Empuñadura con brillo
     handle_color = NEON_CYAN if player_id == 1 else NEON_PINK
@@ -431,30 +466,67 @@ def draw_neon_sword(surface, center_pos: Tuple[int, int], angle: float = 0, colo
         rotate_point(-15, -3), rotate_point(15, -3),
         rotate_point(15, 3), rotate_point(-15, 3)
     ]
-    pygame.draw.polygon(surface, handle_color, guard_points)
+    layer.polygon((*handle_color, 255), guard_points)
     
     # Cristal en la empuñadura
     crystal_pos = rotate_point(0, -15)
-    pygame.draw.circle(surface, (255, 255, 255), crystal_pos, 5)
-    pygame.draw.circle(surface, handle_color, crystal_pos, 3)
-
-def cv2_to_pygame(cv_img):
-    """Convierte imagen de OpenCV a Pygame con efectos"""
-    cv_img = cv2.resize(cv_img, (WIDTH, HEIGHT))
-    cv_img = cv2.flip(cv_img, 1)
-    cv_img = cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB)
-    cv_img = np.rot90(cv_img)
-    cv_img = np.flipud(cv_img)
-    return pygame.surfarray.make_surface(cv_img)
+    layer.circle((255, 255, 255, 255), crystal_pos, 5)
+    layer.circle((*handle_color, 255), crystal_pos, 3)
+
+def draw_profiler_overlay(surface):
+    """HUD de rendimiento con percentiles por etapa"""
+    if not profiler.show_overlay:
+        return
+    lines = profiler.overlay_lines()
+    panel = pygame.Surface((300, len(lines) * 16 + 10), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 170))
+    for i, line in enumerate(lines):
+        panel.blit(text_renderer.render(line, 14, NEON_GREEN, name="monospace"), (8, 5 + i * 16))
+    surface.blit(panel, (10, HEIGHT - panel.get_height() - 10))
+
+def stop():
+    """Cerrar cámara y ventana y exportar tiempos; el detector y las imágenes siguen cargados"""
+    global cap
+    if cap is None:
+        return
+    profiler.export_csv()
+    cap.release()
+    cap = None
+    pygame.display.quit()
+
+def close():
+    """Liberar el detector de manos (al cerrar el programa)"""
+    hands.close()
+
+class CameraSurface:
+    """
+    Surface de pygame persistente que comparte memoria con un buffer RGB
+    preasignado: cada frame se escribe directo en el buffer (espejo + RGB)
+    sin transponer ni crear superficies nuevas.
+    """
+    def __init__(self, size: Tuple[int, int]):
+        self.size = size
+        w, h = size
+        self.rgb = np.empty((h, w, 3), dtype=np.uint8)
+        self.surface = pygame.image.frombuffer(self.rgb, size, 'RGB')
+        self._resized = np.empty((h, w, 3), dtype=np.uint8)
+        self._converted = np.empty((h, w, 3), dtype=np.uint8)
+
+    def update(self, frame):
+        """Copiar un frame BGR de la cámara; devuelve el array RGB espejado (compartido)"""
+        if frame.shape[1] != self.size[0] or frame.shape[0] != self.size[1]:
+            frame = cv2.resize(frame, self.size, dst=self._resized)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._converted)
+        cv2.flip(self._converted, 1, dst=self.rgb)
+        return self.rgb
 
 def reset_game(players: int):
     """Reinicia el juego"""
-    global objects, game_state, start_time, current_level, num_players, player_states
-    global frame_count, splashes, calibration_start_time, particles, sword_trails
+    global game_state, num_players, splashes, calibration_start_time, particles, sword_trails
     global combo_texts, screen_effects
     
     num_players = players
-    objects.clear()
+    engine.reset(players)
     splashes.clear()
     particles.clear()
     sword_trails.clear()
@@ -463,14 +535,6 @@ def reset_game(players: int):
     
     game_state = "STARTING"
     calibration_start_time = pygame.time.get_ticks()
-    start_time = 0
-    current_level = 0
-    frame_count = 0
-    
-    player_states = {
-        1: {"score": 0, "alive": True, "death_time": 0, "combo": 0, "last_hit_time": 0},
-        2: {"score": 0, "alive": True, "death_time": 0, "combo": 0, "last_hit_time": 0}
-    }
 
 def draw_retro_menu():
     """Menú principal con estilo retro"""
@@ -481,9 +545,8 @@ def draw_retro_menu():
     window.fill(BLACK)
     
     # Actualizar y dibujar partículas de fondo
-    for particle in background_particles:
-        particle.update()
-        particle.draw(window)
+    background_particles.update()
+    background_particles.draw(window)
     
     # Grid retro de fondo
     grid_size = 50
@@ -495,16 +558,12 @@ def draw_retro_menu():
         pygame.draw.line(window, (*NEON_CYAN, alpha), (0, y), (WIDTH, y), 1)
     
     # Título principal con efecto glitch
-    font_title = pygame.font.SysFont(None, 80)
-    draw_glitch_text(window, "RETRO FRUIT NINJA", (WIDTH // 2, HEIGHT // 4), font_title, NEON_PINK)
+    draw_glitch_text(window, "RETRO FRUIT NINJA", (WIDTH // 2, HEIGHT // 4), 80, NEON_PINK)
     
     # Subtítulo pulsante
-    font_sub = pygame.font.SysFont(None, 30)
     draw_pulsing_text(window, "⚡ NEON EDITION ⚡", (WIDTH // 2, HEIGHT // 4 + 60), 30, NEON_YELLOW, menu_time)
     
     # Opciones del menú
-    font_option = pygame.font.SysFont(None, 50)
-    
     # Opción 1 jugador
     option1_rect = pygame.Rect(WIDTH // 2 - 200, HEIGHT // 2 - 50, 400, 60)
     draw_retro_border(window, option1_rect, NEON_GREEN)
@@ -517,539 +576,492 @@ def draw_retro_menu():
     
     # Efectos de partículas alrededor del menú
     if random.random() < 0.1:
-        particles.append(Particle(
+        particles.spawn(
             random.randint(0, WIDTH),
             random.randint(0, HEIGHT),
             random.choice([NEON_CYAN, NEON_PINK, NEON_GREEN, NEON_PURPLE]),
-            random.randint(2, 5)
-        ))
+            size_range=(2, 5)
+        )
 
 # === BUCLE PRINCIPAL ===
 
-sword_positions = {1: [], 2: []}  # Para el trail de la espada
 screen_shake = None
+trail_layer = EffectLayer((WIDTH, HEIGHT))  # Trails de los cortes (debajo de combos y máscaras)
+effect_layer = EffectLayer((WIDTH, HEIGHT))  # Brillos, espadas y su trail en vivo
+camera_view = CameraSurface((WIDTH, HEIGHT))
+
+camera_tint = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+camera_tint.fill((0, 0, 50, 150))  # Azul oscuro semi-transparente
+
+def run_loop():
+    global game_state, menu_time, screen_shake, last_step_time
 
-while True:
-    current_time = pygame.time.get_ticks()
+    while True:
+        profiler.begin_frame()
+        current_time = pygame.time.get_ticks()
     
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            cap.release()
-            cv2.destroyAllWindows()
-            pygame.quit()
-            sys.exit()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                profiler.toggle_overlay()
+
+            if game_state == "MENU":
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_1:
+                        reset_game(1)
+                    elif event.key == pygame.K_2:
+                        reset_game(2)
+        
+            elif game_state == "GAME_OVER":
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        game_state = "MENU"
+                        menu_time = 0
+                    if event.key == pygame.K_ESCAPE:
+                        return
 
         if game_state == "MENU":
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_1:
-                    reset_game(1)
-                elif event.key == pygame.K_2:
-                    reset_game(2)
+            draw_retro_menu()
         
-        elif game_state == "GAME_OVER":
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    game_state = "MENU"
-                    menu_time = 0
-                if event.key == pygame.K_ESCAPE:
-                    cap.release()
-                    cv2.destroyAllWindows()
-                    pygame.quit()
-                    sys.exit()
-
-    if game_state == "MENU":
-        draw_retro_menu()
+            # Actualizar partículas del menú
+            particles.update()
+            particles.draw(window)
         
-        # Actualizar partículas del menú
-        for particle in particles[:]:
-            particle.update()
-            if particle.life <= 0:
-                particles.remove(particle)
+            draw_profiler_overlay(window)
+            profiler.lap('ui')
+            pygame.display.flip()
+            clock.tick(60)
+            profiler.lap('present')
+            profiler.end_frame()
+            continue
+
+        # === LÓGICA DE CÁMARA Y DETECCIÓN ===
+        ret, frame = cap.read()
+        if not ret:
+            print("Error: No se pudo leer la cámara.")
+            break
+        profiler.lap('capture')
+
+        # Una sola conversión (espejo + RGB) para mostrar; el modelo usa una copia reducida
+        frame_rgb = camera_view.update(frame)
+        rgb = inference_scaler.prepare(frame_rgb)
+        profiler.lap('convert')
+        results = hands.process(rgb)
+        profiler.lap('inference')
+
+        # Aplicar shake de pantalla si existe
+        shake_offset = (0, 0)
+        if screen_shake:
+            if not screen_shake.update():
+                screen_shake = None
             else:
-                particle.draw(window)
-        
-        pygame.display.flip()
-        clock.tick(60)
-        continue
-
-    # === LÓGICA DE CÁMARA Y DETECCIÓN ===
-    ret, frame = cap.read()
-    if not ret:
-        print("Error: No se pudo leer la cámara.")
-        break
-
-    frame_flipped = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame_flipped, cv2.COLOR_BGR2RGB)
-    results = hands.process(rgb)
-
-    # Aplicar shake de pantalla si existe
-    shake_offset = (0, 0)
-    if screen_shake:
-        if not screen_shake.update():
-            screen_shake = None
-        else:
-            shake_offset = screen_shake.get_offset()
+                shake_offset = screen_shake.get_offset()
 
-    camera_surface = cv2_to_pygame(frame)
-    window.blit(camera_surface, shake_offset)
+        window.blit(camera_view.surface, shake_offset)
 
-    # Overlay oscuro con estilo retro
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 50, 150))  # Azul oscuro semi-transparente
-    window.blit(overlay, (0, 0))
+        # Overlay oscuro con estilo retro
+        window.blit(camera_tint, (0, 0))
+        profiler.lap('convert')
     
-    # Actualizar partículas de fondo
-    for particle in background_particles:
-        particle.update()
-        particle.draw(window)
-
-    # Línea divisoria neón en modo 2 jugadores
-    if num_players == 2:
-        for i in range(5):
-            alpha = int(255 - i * 40)
-            color = (*NEON_CYAN, alpha)
-            temp_surf = pygame.Surface((5, HEIGHT), pygame.SRCALPHA)
-            temp_surf.fill(color)
-            window.blit(temp_surf, (WIDTH // 2 - 2 + i, 0))
-
-    sword_data = {}
+        # Actualizar partículas de fondo
+        background_particles.update()
+        background_particles.draw(window)
+
+        # Línea divisoria neón en modo 2 jugadores
+        if num_players == 2:
+            for i in range(5):
+                alpha = int(255 - i * 40)
+                color = (*NEON_CYAN, alpha)
+                temp_surf = pygame.Surface((5, HEIGHT), pygame.SRCALPHA)
+                temp_surf.fill(color)
+                window.blit(temp_surf, (WIDTH // 2 - 2 + i, 0))
+        profiler.lap('effects')
+
+        sword_data = {}
+        hand_inputs = {}  # Palma de cada jugador para la lógica del juego
     
-    # === DETECCIÓN DE MANOS ===
-    if results.multi_hand_landmarks:
-        for i, handLms in enumerate(results.multi_hand_landmarks):
-            palm_center = handLms.landmark[9]
-            norm_x = palm_center.x
-            player_id = 0
+        # === DETECCIÓN DE MANOS ===
+        if results.multi_hand_landmarks:
+            for i, handLms in enumerate(results.multi_hand_landmarks):
+                palm_center = handLms.landmark[9]
+                norm_x = palm_center.x
+                player_id = 0
             
-            if num_players == 1:
-                player_id = 1
-            elif num_players == 2:
-                if norm_x < 0.5:
+                if num_players == 1:
                     player_id = 1
-                elif norm_x >= 0.5:
-                    player_id = 2
-
-            if player_id in player_states and player_states[player_id]["alive"]:
-                wrist = handLms.landmark[0]
-                cx = int(palm_center.x * WIDTH)
-                cy = int(palm_center.y * HEIGHT)
-                dx = palm_center.x - wrist.x
-                dy = palm_center.y - wrist.y
-
-                sword_angle = math.degrees(math.atan2(dy, dx)) - 90
-                
-                sword_data[player_id] = {
-                    "pos": (cx, cy),
-                    "angle": sword_angle
-                }
+                elif num_players == 2:
+                    if norm_x < 0.5:
+                        player_id = 1
+                    elif norm_x >= 0.5:
+                        player_id = 2
+
+                if player_id in engine.player_states and engine.player_states[player_id]["alive"]:
+                    wrist = handLms.landmark[0]
+                    cx = int(palm_center.x * WIDTH)
+                    cy = int(palm_center.y * HEIGHT)
+                    dx = palm_center.x - wrist.x
+                    dy = palm_center.y - wrist.y
+
+                    sword_angle = math.degrees(math.atan2(dy, dx)) - 90
                 
-                # Agregar posición al trail
-                sword_positions[player_id].append((cx, cy))
-                if len(sword_positions[player_id]) > 10:
-                    sword_positions[player_id].pop(0)
-
-    # === ESTADO STARTING ===
-    if game_state == "STARTING":
-        elapsed_calib_time = current_time - calibration_start_time
-        remaining_calib_seconds = math.ceil((CALIBRATION_TIME_MS - elapsed_calib_time) / 1000)
-
-        if elapsed_calib_time >= CALIBRATION_TIME_MS:
-            game_state = "PLAYING"
-            start_time = pygame.time.get_ticks()
+                    sword_data[player_id] = {
+                        "pos": (cx, cy),
+                        "angle": sword_angle
+                    }
+                    hand_inputs[player_id] = (cx, cy)
+
+        # === ESTADO STARTING ===
+        if game_state == "STARTING":
+            elapsed_calib_time = current_time - calibration_start_time
+            remaining_calib_seconds = math.ceil((CALIBRATION_TIME_MS - elapsed_calib_time) / 1000)
+
+            # Agregar posiciones al trail de la espada
+            engine.track_hands(hand_inputs)
+
+            if elapsed_calib_time >= CALIBRATION_TIME_MS:
+                game_state = "PLAYING"
+                engine.start()
+                last_step_time = pygame.time.get_ticks()
         
-        # Mensaje de calibración con efectos
-        font_calib = pygame.font.SysFont(None, 60)
+            # Mensaje de calibración con efectos
+            draw_pulsing_text(window, "PREPARANDO CÁMARA...", (WIDTH // 2, HEIGHT // 2 - 50), 60, NEON_YELLOW, current_time)
+            draw_pulsing_text(window, f"INICIANDO EN {max(0, remaining_calib_seconds)}", (WIDTH // 2, HEIGHT // 2 + 50), 60, NEON_CYAN, current_time)
         
-        draw_pulsing_text(window, "PREPARANDO CÁMARA...", (WIDTH // 2, HEIGHT // 2 - 50), 60, NEON_YELLOW, current_time)
-        draw_pulsing_text(window, f"INICIANDO EN {max(0, remaining_calib_seconds)}", (WIDTH // 2, HEIGHT // 2 + 50), 60, NEON_CYAN, current_time)
-        
-        # Dibujar espadas durante calibración
-        for player_id in sword_data.keys():
-            sword = sword_data[player_id]
-            color = NEON_CYAN if player_id == 1 else NEON_PINK
-            draw_neon_sword(window, sword["pos"], sword["angle"], color=color, player_id=player_id)
-
-    # === ESTADO PLAYING ===
-    elif game_state == "PLAYING":
-        elapsed_time_ms = pygame.time.get_ticks() - start_time
-        remaining_time_ms = max(0, GAME_DURATION - elapsed_time_ms)
-        
-        # Lógica de fin de partida
-        if remaining_time_ms == 0:
-            game_state = "GAME_OVER"
-        
-        if num_players == 2:
-            all_dead = all(not state["alive"] for state in player_states.values())
-            if all_dead:
-                game_state = "GAME_OVER"
-        else:
-            if not player_states[1]["alive"]:
+            # Dibujar espadas durante calibración
+            effect_layer.clear()
+            for player_id in sword_data.keys():
+                sword = sword_data[player_id]
+                color = NEON_CYAN if player_id == 1 else NEON_PINK
+                draw_neon_sword(effect_layer, sword["pos"], sword["angle"], color=color, player_id=player_id)
+            effect_layer.present(window)
+
+        # === ESTADO PLAYING ===
+        elif game_state == "PLAYING":
+            # === LÓGICA DE LA PARTIDA ===
+            events = engine.step((current_time - last_step_time) / 1000, hand_inputs)
+            last_step_time = current_time
+            if engine.game_over:
                 game_state = "GAME_OVER"
-        
-        # === SPAWN DE OBJETOS ===
-        current_level = elapsed_time_ms // LEVEL_UP_TIME
-        spawn_frame_interval = 12
-        
-        frame_count += 1
-        if frame_count >= spawn_frame_interval:
-            if num_players == 1:
-                if player_states[1]["alive"]:
-                    objects.append(spawn_object(current_level))
-            else:
-                zone_to_spawn = random.choice([1, 2])
-                if player_states[zone_to_spawn]["alive"]:
-                    objects.append(spawn_object(current_level, player_zone=zone_to_spawn))
-            frame_count = 0
-
-        # === ANIMACIÓN DE OBJETOS ===
-        for obj in objects:
-            obj["rect"].y += obj["speed"]
-            obj["rotation"] += obj.get("spin_speed", 0)
-            
-            if obj["kind"] == "bomb":
-                obj["pulse_time"] += 1
-
-        # === DETECCIÓN DE COLISIONES ===
-        for obj in objects[:]:
-            # Si el objeto sale de la pantalla, se elimina
-            if obj["rect"].y > HEIGHT:
-                # Pérdida de vida si es fruta y se va
-                if obj["kind"] == "fruit" and num_players == 1 and player_states[1]["alive"]:
-                    # En este modo, no hay vidas explícitas, el juego solo termina por bomba o tiempo.
-                    # Podrías implementar un sistema de 'fallos' si lo deseas.
-                    pass
-                objects.remove(obj)
-                continue
-
-            collided = False
-            for player_id, sword in sword_data.items():
-                if player_states[player_id]["alive"]:
-                    sword_pos = sword["pos"]
-                    # Ajustar el hitbox de la espada para que coincida con el dedo/mano
-                    sword_hitbox = pygame.Rect(sword_pos[0] - 25, sword_pos[1] - 25, 50, 50)
-                    
-                    if obj["rect"].colliderect(sword_hitbox):
-                        if obj["kind"] == "fruit":
-                            # Sistema de combos
-                            time_diff = current_time - player_states[player_id]["last_hit_time"]
-                            if time_diff < 1500:  # 1.5 segundos para mantener combo
-                                player_states[player_id]["combo"] += 1
-                            else:
-                                player_states[player_id]["combo"] = 1
-                            
-                            player_states[player_id]["last_hit_time"] = current_time
-                            
-                            # Puntuación con multiplicador de combo
-                            combo_multiplier = min(player_states[player_id]["combo"], 10)
-                            score_gain = combo_multiplier
-                            player_states[player_id]["score"] += score_gain
-                            
-                            # Efectos visuales
-                            create_explosion_particles(obj["rect"].centerx, obj["rect"].centery, obj["color"], 20)
-                            screen_shake = ScreenShake(5, 10)
-                            
-                            # Texto de combo
-                            if player_states[player_id]["combo"] > 1:
-                                combo_texts.append(ComboText(obj["rect"].centerx, obj["rect"].centery, player_states[player_id]["combo"]))
-                            
-                            # Trail de espada más intenso
-                            if len(sword_positions[player_id]) > 1:
-                                trail_color = NEON_CYAN if player_id == 1 else NEON_PINK
-                                sword_trails.append(SwordTrail(sword_positions[player_id], trail_color))
-                        else:
-                            # Explosión de bomba
-                            create_explosion_particles(obj["rect"].centerx, obj["rect"].centery, (255, 0, 0), 30)
-                            player_states[player_id]["alive"] = False
-                            player_states[player_id]["death_time"] = current_time
-                            player_states[player_id]["combo"] = 0
-                            screen_shake = ScreenShake(15, 30)
-                            
-                        objects.remove(obj)
-                        collided = True
-                        break
-            
-            if collided:
-                continue
 
-        # === ACTUALIZAR EFECTOS ===
+            for event in events:
+                x, y = event["pos"]
+                player_id = event["player"]
+                if event["type"] == "fruit":
+                    # Efectos visuales
+                    create_explosion_particles(x, y, event["color"], 20)
+                    screen_shake = ScreenShake(5, 10)
+                
+                    # Texto de combo
+                    if event["combo"] > 1:
+                        combo_texts.append(ComboText(x, y, event["combo"]))
+                
+                    # Trail de espada más intenso
+                    if len(engine.sword_positions[player_id]) > 1:
+                        trail_color = NEON_CYAN if player_id == 1 else NEON_PINK
+                        sword_trails.append(SwordTrail(engine.sword_positions[player_id], trail_color))
+                else:
+                    # Explosión de bomba
+                    create_explosion_particles(x, y, (255, 0, 0), 30)
+                    screen_shake = ScreenShake(15, 30)
+
+            # === ACTUALIZAR EFECTOS ===
         
-        # Actualizar partículas
-        for particle in particles[:]:
-            particle.update()
-            if particle.life <= 0:
-                particles.remove(particle)
+            # Actualizar partículas
+            particles.update()
         
-        # Actualizar trails de espada
-        for trail in sword_trails[:]:
-            trail.update()
-            if trail.alpha <= 0:
-                sword_trails.remove(trail)
+            # Actualizar trails de espada
+            for trail in sword_trails[:]:
+                trail.update()
+                if trail.alpha <= 0:
+                    sword_trails.remove(trail)
         
-        # Actualizar textos de combo
-        for combo_text in combo_texts[:]:
-            if not combo_text.update():
-                combo_texts.remove(combo_text)
+            # Actualizar textos de combo
+            for combo_text in combo_texts[:]:
+                if not combo_text.update():
+                    combo_texts.remove(combo_text)
+            profiler.lap('logic')
         
-        # === DIBUJAR OBJETOS ===
-        blink_on = (current_time // 200) % 2 == 0
+            # === DIBUJAR OBJETOS ===
+            blink_on = (current_time // 200) % 2 == 0
         
-        for obj in objects:
-            if obj["kind"] == "fruit":
-                # Rotar fruta (imagen que ya incluye el glow)
-                rotated_image = pygame.transform.rotate(obj["image"], obj["rotation"])
-                new_rect = rotated_image.get_rect(center=obj["rect"].center)
+            for obj in engine.objects:
+                if obj["kind"] == "fruit":
+                    # Rotar fruta (imagen que ya incluye el glow)
+                    # Imagen prerrotada (ya incluye el glow)
+                    rotated_image = fruit_frame(obj)
+                    new_rect = rotated_image.get_rect(center=obj["rect"].center)
                 
-                # Efecto de brillo pulsante
-                # El tamaño del glow es ahora relativo al tamaño escalado de la imagen (40x40 + 20 de glow = 60x60)
-                pulse = math.sin(current_time / 300) * 5 + 10 # Ajustar el pulso para el nuevo tamaño
-                glow_surf = pygame.Surface((new_rect.width + pulse, new_rect.height + pulse), pygame.SRCALPHA)
-                glow_color = (*obj["color"], 100)
+                    # Efecto de brillo pulsante
+                    # El tamaño del glow es ahora relativo al tamaño escalado de la imagen (40x40 + 20 de glow = 60x60)
+                    pulse = int(math.sin(current_time / 300) * 5 + 10) # Ajustar el pulso para el nuevo tamaño
                 
-                # Dibujar el glow como una elipse ligeramente más grande que la fruta
-                pygame.draw.ellipse(glow_surf, glow_color, glow_surf.get_rect())
+                    # Elipse prerenderizada ligeramente más grande que la fruta
+                    glow_surf = fruit_images[obj["fruit"]]["glow_frames"][(new_rect.width + pulse, new_rect.height + pulse)]
                 
-                glow_rect = glow_surf.get_rect(center=obj["rect"].center)
-                window.blit(glow_surf, glow_rect)
-                window.blit(rotated_image, new_rect)
-            else:
-                # Bomba con efecto de pulso
-                pulse_intensity = math.sin(obj["pulse_time"] / 10) * 5 + 20 # Ajustar el pulso
-                bomb_rect_base = pygame.Rect(obj["rect"].centerx - 10, obj["rect"].centery - 10, 20, 20)
-                bomb_rect = bomb_rect_base.inflate(pulse_intensity, pulse_intensity)
-                bomb_rect.center = obj["rect"].center # Asegurar que esté centrado en la posición del objeto
+                    glow_rect = glow_surf.get_rect(center=obj["rect"].center)
+                    window.blit(glow_surf, glow_rect)
+                    window.blit(rotated_image, new_rect)
+                else:
+                    # Bomba con efecto de pulso
+                    pulse_intensity = math.sin(obj["pulse_time"] / 10) * 5 + 20 # Ajustar el pulso
+                    bomb_rect_base = pygame.Rect(obj["rect"].centerx - 10, obj["rect"].centery - 10, 20, 20)
+                    bomb_rect = bomb_rect_base.inflate(pulse_intensity, pulse_intensity)
+                    bomb_rect.center = obj["rect"].center # Asegurar que esté centrado en la posición del objeto
                 
-                if blink_on:
-                    # Núcleo de la bomba
-                    pygame.draw.ellipse(window, (50, 0, 0), bomb_rect)
-                    pygame.draw.ellipse(window, (255, 0, 0), bomb_rect, 5)
+                    if blink_on:
+                        # Núcleo de la bomba
+                        pygame.draw.ellipse(window, (50, 0, 0), bomb_rect)
+                        pygame.draw.ellipse(window, (255, 0, 0), bomb_rect, 5)
                     
-                    # Efecto de brillo
-                    glow_surf = pygame.Surface((bomb_rect.width + 10, bomb_rect.height + 10), pygame.SRCALPHA)
-                    pygame.draw.ellipse(glow_surf, (255, 0, 0, 100), glow_surf.get_rect())
-                    glow_rect = glow_surf.get_rect(center=bomb_rect.center)
-                    window.blit(glow_surf, glow_rect)
+                        # Efecto de brillo
+                        glow_surf = pygame.Surface((bomb_rect.width + 10, bomb_rect.height + 10), pygame.SRCALPHA)
+                        pygame.draw.ellipse(glow_surf, (255, 0, 0, 100), glow_surf.get_rect())
+                        glow_rect = glow_surf.get_rect(center=bomb_rect.center)
+                        window.blit(glow_surf, glow_rect)
                     
-                    # Chispas alrededor de la bomba
-                    for i in range(5):
-                        spark_angle = (current_time / 50 + i * 72) % 360
-                        # Usar el ancho/alto del rectángulo de la bomba para la posición de las chispas
-                        spark_x = bomb_rect.centerx + math.cos(math.radians(spark_angle)) * (bomb_rect.width // 2 + 5)
-                        spark_y = bomb_rect.centery + math.sin(math.radians(spark_angle)) * (bomb_rect.height // 2 + 5)
-                        pygame.draw.circle(window, NEON_YELLOW, (int(spark_x), int(spark_y)), 3)
-
-        # === DIBUJAR EFECTOS ===
+                        # Chispas alrededor de la bomba
+                        for i in range(5):
+                            spark_angle = (current_time / 50 + i * 72) % 360
+                            # Usar el ancho/alto del rectángulo de la bomba para la posición de las chispas
+                            spark_x = bomb_rect.centerx + math.cos(math.radians(spark_angle)) * (bomb_rect.width // 2 + 5)
+                            spark_y = bomb_rect.centery + math.sin(math.radians(spark_angle)) * (bomb_rect.height // 2 + 5)
+                            pygame.draw.circle(window, NEON_YELLOW, (int(spark_x), int(spark_y)), 3)
+
+            # === DIBUJAR EFECTOS ===
         
-        # Dibujar partículas
-        for particle in particles:
-            particle.draw(window)
+            # Dibujar partículas
+            particles.draw(window)
         
-        # Dibujar trails de espada
-        for trail in sword_trails:
-            trail.draw(window)
+            # Trails de los cortes: su propia capa, debajo de combos y máscaras de muerte
+            trail_layer.clear()
+            for trail in sword_trails:
+                trail.draw(trail_layer)
+            trail_layer.present(window)
+
+            # Espadas y su trail van a la capa de efectos (un solo blit al final)
+            effect_layer.clear()
         
-        # Dibujar textos de combo
-        for combo_text in combo_texts:
-            combo_text.draw(window)
+            # Dibujar textos de combo
+            for combo_text in combo_texts:
+                combo_text.draw(window)
 
-        # === DIBUJAR ESPADAS Y MÁSCARAS ===
-        for player_id in range(1, num_players + 1):
+            # === DIBUJAR ESPADAS Y MÁSCARAS ===
+            for player_id in range(1, num_players + 1):
             
-            # Máscara de muerte con efectos
-            if not player_states[player_id]["alive"]:
-                mask = pygame.Surface((WIDTH // num_players, HEIGHT), pygame.SRCALPHA)
+                # Máscara de muerte con efectos
+                if not engine.player_states[player_id]["alive"]:
+                    mask = pygame.Surface((WIDTH // num_players, HEIGHT), pygame.SRCALPHA)
                 
-                # Efecto de interferencia
-                interference_alpha = int(150 + 50 * math.sin(current_time / 100))
-                mask.fill((*BLACK, interference_alpha))
+                    # Efecto de interferencia
+                    interference_alpha = int(150 + 50 * math.sin(current_time / 100))
+                    mask.fill((*BLACK, interference_alpha))
                 
-                x_offset = (player_id - 1) * (WIDTH // num_players)
-                window.blit(mask, (x_offset, 0))
+                    x_offset = (player_id - 1) * (WIDTH // num_players)
+                    window.blit(mask, (x_offset, 0))
                 
-                # Texto de muerte glitcheado
-                death_pulse = int(abs(math.sin(current_time / 200) * 20))
-                font_death = pygame.font.SysFont(None, 60 + death_pulse)
+                    # Texto de muerte glitcheado
+                    death_size = pulse_size(60, abs(math.sin(current_time / 200) * 20))
                 
-                death_center_x = x_offset + (WIDTH // (2 * num_players))
-                draw_glitch_text(window, "ELIMINADO", (death_center_x, HEIGHT // 2), font_death, (255, 0, 0))
+                    death_center_x = x_offset + (WIDTH // (2 * num_players))
+                    draw_glitch_text(window, "ELIMINADO", (death_center_x, HEIGHT // 2), death_size, (255, 0, 0))
                 
-                # Efectos de chispas de muerte
-                if random.random() < 0.3:
-                    spark_x = random.randint(x_offset, x_offset + WIDTH // num_players)
-                    spark_y = random.randint(0, HEIGHT)
-                    particles.append(Particle(spark_x, spark_y, (255, 0, 0), 2))
-
-            # Dibujar espada
-            if player_id in sword_data and player_states[player_id]["alive"]:
-                sword = sword_data[player_id]
-                color = NEON_CYAN if player_id == 1 else NEON_PINK
-                draw_neon_sword(window, sword["pos"], sword["angle"], color=color, player_id=player_id)
+                    # Efectos de chispas de muerte
+                    if random.random() < 0.3:
+                        spark_x = random.randint(x_offset, x_offset + WIDTH // num_players)
+                        spark_y = random.randint(0, HEIGHT)
+                        particles.spawn(spark_x, spark_y, (255, 0, 0), size_range=(2, 2))
+
+                # Dibujar espada
+                if player_id in sword_data and engine.player_states[player_id]["alive"]:
+                    sword = sword_data[player_id]
+                    color = NEON_CYAN if player_id == 1 else NEON_PINK
                 
-                # Trail de la espada
-                if len(sword_positions[player_id]) > 2:
-                    trail_points = sword_positions[player_id]
-                    for i in range(len(trail_points) - 1):
-                        start_alpha = int(255 * (i / len(trail_points)))
-                        trail_color = (*color, start_alpha)
-                        
-                        temp_surf = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-                        pygame.draw.line(temp_surf, trail_color, trail_points[i], trail_points[i + 1], 3)
-                        window.blit(temp_surf, (0, 0))
-
-        # === HUD CON ESTILO RETRO ===
-        
-        # Panel de información superior
-        hud_font = pygame.font.SysFont(None, 35)
-        small_font = pygame.font.SysFont(None, 25)
+                    # Trail de la espada antes que la hoja: en la capa los píxeles se
+                    # reemplazan, así los tramos casi transparentes no agujerean la espada
+                    if len(engine.sword_positions[player_id]) > 2:
+                        trail_points = engine.sword_positions[player_id]
+                        for i in range(len(trail_points) - 1):
+                            start_alpha = int(255 * (i / len(trail_points)))
+                            effect_layer.line((*color, start_alpha), trail_points[i], trail_points[i + 1], 3)
+                
+                    draw_neon_sword(effect_layer, sword["pos"], sword["angle"], color=color, player_id=player_id)
+
+            effect_layer.present(window)
+            profiler.lap('effects')
+
+            # === HUD CON ESTILO RETRO ===
         
-        # Fondo del HUD
-        hud_bg = pygame.Surface((WIDTH, 100), pygame.SRCALPHA)
-        hud_bg.fill((0, 0, 0, 180))
-        window.blit(hud_bg, (0, 0))
+            # Panel de información superior
+            # Fondo del HUD
+            hud_bg = pygame.Surface((WIDTH, 100), pygame.SRCALPHA)
+            hud_bg.fill((0, 0, 0, 180))
+            window.blit(hud_bg, (0, 0))
         
-        # Líneas decorativas del HUD
-        for i in range(3):
-            alpha = 255 - i * 60
-            pygame.draw.line(window, (*NEON_CYAN, alpha), (0, 95 - i), (WIDTH, 95 - i), 1)
+            # Líneas decorativas del HUD
+            for i in range(3):
+                alpha = 255 - i * 60
+                pygame.draw.line(window, (*NEON_CYAN, alpha), (0, 95 - i), (WIDTH, 95 - i), 1)
         
-        if num_players == 1:
-            # Puntuación con efecto brillante
-            score_text = f"PUNTOS: {player_states[1]['score']}"
-            draw_pulsing_text(window, score_text, (120, 25), 35, NEON_YELLOW, current_time)
+            if num_players == 1:
+                # Puntuación con efecto brillante
+                score_text = f"PUNTOS: {engine.player_states[1]['score']}"
+                draw_pulsing_text(window, score_text, (120, 25), 35, NEON_YELLOW, current_time)
             
-            # Combo actual
-            if player_states[1]["combo"] > 1:
-                combo_color = NEON_PINK if player_states[1]["combo"] >= 5 else NEON_ORANGE
-                combo_text = f"COMBO x{player_states[1]['combo']}"
-                draw_pulsing_text(window, combo_text, (120, 60), 25, combo_color, current_time)
-        else:
-            # Puntuaciones duales
-            p1_score = hud_font.render(f"P1: {player_states[1]['score']}", True, NEON_CYAN)
-            p2_score = hud_font.render(f"P2: {player_states[2]['score']}", True, NEON_PINK)
-            window.blit(p1_score, (20, 20))
-            window.blit(p2_score, (WIDTH - p2_score.get_width() - 20, 20))
+                # Combo actual
+                if engine.player_states[1]["combo"] > 1:
+                    combo_color = NEON_PINK if engine.player_states[1]["combo"] >= 5 else NEON_ORANGE
+                    combo_text = f"COMBO x{engine.player_states[1]['combo']}"
+                    draw_pulsing_text(window, combo_text, (120, 60), 25, combo_color, current_time)
+            else:
+                # Puntuaciones duales
+                p1_score = text_renderer.render(f"P1: {engine.player_states[1]['score']}", 35, NEON_CYAN)
+                p2_score = text_renderer.render(f"P2: {engine.player_states[2]['score']}", 35, NEON_PINK)
+                window.blit(p1_score, (20, 20))
+                window.blit(p2_score, (WIDTH - p2_score.get_width() - 20, 20))
             
-            # Combos
-            if player_states[1]["combo"] > 1:
-                combo1 = small_font.render(f"Combo x{player_states[1]['combo']}", True, NEON_CYAN)
-                window.blit(combo1, (20, 50))
-            if player_states[2]["combo"] > 1:
-                combo2 = small_font.render(f"Combo x{player_states[2]['combo']}", True, NEON_PINK)
-                window.blit(combo2, (WIDTH - combo2.get_width() - 20, 50))
+                # Combos
+                if engine.player_states[1]["combo"] > 1:
+                    combo1 = text_renderer.render(f"Combo x{engine.player_states[1]['combo']}", 25, NEON_CYAN)
+                    window.blit(combo1, (20, 50))
+                if engine.player_states[2]["combo"] > 1:
+                    combo2 = text_renderer.render(f"Combo x{engine.player_states[2]['combo']}", 25, NEON_PINK)
+                    window.blit(combo2, (WIDTH - combo2.get_width() - 20, 50))
         
-        # Nivel con efecto de brillo
-        level_text = f"NIVEL {current_level + 1}"
-        draw_pulsing_text(window, level_text, (WIDTH // 2 - 100, 70), 30, NEON_GREEN, current_time)
+            # Nivel con efecto de brillo
+            level_text = f"NIVEL {engine.current_level + 1}"
+            draw_pulsing_text(window, level_text, (WIDTH // 2 - 100, 70), 30, NEON_GREEN, current_time)
         
-        # Timer con efectos dramáticos
-        remaining_seconds = remaining_time_ms // 1000
-        minutes = remaining_seconds // 60
-        seconds = remaining_seconds % 60
-        time_text = f"{minutes:02d}:{seconds:02d}"
+            # Timer con efectos dramáticos
+            remaining_seconds = engine.remaining_time_ms // 1000
+            minutes = remaining_seconds // 60
+            seconds = remaining_seconds % 60
+            time_text = f"{minutes:02d}:{seconds:02d}"
         
-        timer_color = (255, 0, 0) if remaining_seconds <= 10 else NEON_GREEN
+            timer_color = (255, 0, 0) if remaining_seconds <= 10 else NEON_GREEN
         
-        if remaining_seconds <= 10:
-            # Efecto de urgencia
-            draw_glitch_text(window, time_text, (WIDTH // 2, 25), hud_font, timer_color)
+            if remaining_seconds <= 10:
+                # Efecto de urgencia
+                draw_glitch_text(window, time_text, (WIDTH // 2, 25), 35, timer_color)
             
-            # Partículas de alerta
-            if random.random() < 0.5:
-                particles.append(Particle(
-                    WIDTH // 2 + random.randint(-50, 50),
-                    25 + random.randint(-20, 20),
-                    (255, 0, 0),
-                    3
-                ))
-        else:
-            draw_pulsing_text(window, time_text, (WIDTH // 2, 25), 35, timer_color, current_time)
-
-    # === ESTADO GAME OVER ===
-    elif game_state == "GAME_OVER":
-        # Overlay con efectos
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        window.blit(overlay, (0, 0))
-        
-        # Efectos de fondo
-        for particle in background_particles:
-            particle.update()
-            particle.draw(window)
-
-        font = pygame.font.SysFont(None, 70)
-        font2 = pygame.font.SysFont(None, 35)
-        reason_font = pygame.font.SysFont(None, 40)
+                # Partículas de alerta
+                if random.random() < 0.5:
+                    particles.spawn(
+                        WIDTH // 2 + random.randint(-50, 50),
+                        25 + random.randint(-20, 20),
+                        (255, 0, 0),
+                        size_range=(3, 3)
+                    )
+            else:
+                draw_pulsing_text(window, time_text, (WIDTH // 2, 25), 35, timer_color, current_time)
+
+        # === ESTADO GAME OVER ===
+        elif game_state == "GAME_OVER":
+            # Overlay con efectos
+            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 200))
+            window.blit(overlay, (0, 0))
         
-        p1_score = player_states[1]["score"]
-        p2_score = player_states[2]["score"]
+            # Efectos de fondo
+            background_particles.update()
+            background_particles.draw(window)
+
+            p1_score = engine.player_states[1]["score"]
+            p2_score = engine.player_states[2]["score"]
         
-        if num_players == 1:
-            # Game Over para 1 jugador
-            draw_glitch_text(window, "💥 GAME OVER 💥", (WIDTH // 2, HEIGHT // 2 - 70), font, (255, 0, 0))
+            if num_players == 1:
+                # Game Over para 1 jugador
+                draw_glitch_text(window, "💥 GAME OVER 💥", (WIDTH // 2, HEIGHT // 2 - 70), 70, (255, 0, 0))
             
-            score_text = f"PUNTUACIÓN FINAL: {p1_score}"
-            draw_pulsing_text(window, score_text, (WIDTH // 2, HEIGHT // 2 + 30), 35, NEON_YELLOW, current_time)
+                score_text = f"PUNTUACIÓN FINAL: {p1_score}"
+                draw_pulsing_text(window, score_text, (WIDTH // 2, HEIGHT // 2 + 30), 35, NEON_YELLOW, current_time)
             
-            if not player_states[1]["alive"]:
-                reason_text = "¡BOMBA CORTADA!"
-                reason_color = (255, 0, 0)
-            else:
-                reason_text = "¡TIEMPO AGOTADO!"
-                reason_color = NEON_YELLOW
+                if not engine.player_states[1]["alive"]:
+                    reason_text = "¡BOMBA CORTADA!"
+                    reason_color = (255, 0, 0)
+                else:
+                    reason_text = "¡TIEMPO AGOTADO!"
+                    reason_color = NEON_YELLOW
             
-            draw_pulsing_text(window, reason_text, (WIDTH // 2, HEIGHT // 2 - 20), 40, reason_color, current_time)
+                draw_pulsing_text(window, reason_text, (WIDTH // 2, HEIGHT // 2 - 20), 40, reason_color, current_time)
             
-        else:
-            # Game Over para 2 jugadores
-            if p1_score == p2_score:
-                winner_text = "¡EMPATE!"
-                winner_color = NEON_YELLOW
-                diff_text = f"P1: {p1_score} - P2: {p2_score}"
             else:
-                winner_id = 1 if p1_score > p2_score else 2
-                winner_color = NEON_CYAN if winner_id == 1 else NEON_PINK
-                winner_text = f"¡GANADOR: JUGADOR {winner_id}!"
-                difference = abs(p1_score - p2_score)
-                diff_text = f"Por {difference} puntos (P1: {p1_score} vs P2: {p2_score})"
+                # Game Over para 2 jugadores
+                if p1_score == p2_score:
+                    winner_text = "¡EMPATE!"
+                    winner_color = NEON_YELLOW
+                    diff_text = f"P1: {p1_score} - P2: {p2_score}"
+                else:
+                    winner_id = 1 if p1_score > p2_score else 2
+                    winner_color = NEON_CYAN if winner_id == 1 else NEON_PINK
+                    winner_text = f"¡GANADOR: JUGADOR {winner_id}!"
+                    difference = abs(p1_score - p2_score)
+                    diff_text = f"Por {difference} puntos (P1: {p1_score} vs P2: {p2_score})"
             
-            draw_glitch_text(window, winner_text, (WIDTH // 2, HEIGHT // 2 - 70), font, winner_color)
-            draw_pulsing_text(window, diff_text, (WIDTH // 2, HEIGHT // 2 + 30), 30, NEON_YELLOW, current_time)
+                draw_glitch_text(window, winner_text, (WIDTH // 2, HEIGHT // 2 - 70), 70, winner_color)
+                draw_pulsing_text(window, diff_text, (WIDTH // 2, HEIGHT // 2 + 30), 30, NEON_YELLOW, current_time)
             
-            if remaining_time_ms <= 0:
-                reason_text = "FIN POR TIEMPO AGOTADO"
-                reason_color = NEON_GREEN
-            else:
-                reason_text = "AMBOS JUGADORES ELIMINADOS"
-                reason_color = (255, 0, 0)
+                if engine.remaining_time_ms <= 0:
+                    reason_text = "FIN POR TIEMPO AGOTADO"
+                    reason_color = NEON_GREEN
+                else:
+                    reason_text = "AMBOS JUGADORES ELIMINADOS"
+                    reason_color = (255, 0, 0)
             
-            draw_pulsing_text(window, reason_text, (WIDTH // 2, HEIGHT // 2 - 20), 30, reason_color, current_time)
+                draw_pulsing_text(window, reason_text, (WIDTH // 2, HEIGHT // 2 - 20), 30, reason_color, current_time)
 
-        # Instrucciones con borde retro
-        restart_rect = pygame.Rect(WIDTH // 2 - 300, HEIGHT // 2 + 80, 600, 50)
-        draw_retro_border(window, restart_rect, NEON_CYAN)
-        draw_pulsing_text(window, "ESPACIO: Menú | ESC: Salir", (WIDTH // 2, HEIGHT // 2 + 105), 25, NEON_CYAN, current_time)
+            # Instrucciones con borde retro
+            restart_rect = pygame.Rect(WIDTH // 2 - 300, HEIGHT // 2 + 80, 600, 50)
+            draw_retro_border(window, restart_rect, NEON_CYAN)
+            draw_pulsing_text(window, "ESPACIO: Menú | ESC: Salir", (WIDTH // 2, HEIGHT // 2 + 105), 25, NEON_CYAN, current_time)
         
-        # Efectos de partículas finales
-        if random.random() < 0.2:
-            particles.append(Particle(
-                random.randint(0, WIDTH),
-                random.randint(0, HEIGHT),
-                random.choice([NEON_CYAN, NEON_PINK, NEON_GREEN, NEON_PURPLE]),
-                random.randint(1, 4)
-            ))
+            # Efectos de partículas finales
+            if random.random() < 0.2:
+                particles.spawn(
+                    random.randint(0, WIDTH),
+                    random.randint(0, HEIGHT),
+                    random.choice([NEON_CYAN, NEON_PINK, NEON_GREEN, NEON_PURPLE]),
+                    size_range=(1, 4)
+                )
     
-    # Actualizar y dibujar todas las partículas restantes
-    for particle in particles[:]:
-        particle.update()
-        if particle.life <= 0:
-            particles.remove(particle)
-        else:
-            particle.draw(window)
+        profiler.lap('ui')
 
-    pygame.display.flip()
-    clock.tick(60)
+        # Actualizar y dibujar todas las partículas restantes
+        particles.update()
+        particles.draw(window)
+        profiler.lap('effects')
 
-# Limpieza final
-cap.release()
-cv2.destroyAllWindows()
-pygame.quit()
-sys.exit()
\ No newline at end of file
+        draw_profiler_overlay(window)
+        profiler.lap('ui')
+        pygame.display.flip()
+        clock.tick(60)
+        profiler.lap('present')
+        profiler.end_frame()
+
+def main():
+    """Jugar una sesión: vuelve al cerrar la ventana o con ESC en la pantalla final"""
+    global window, cap, game_state, menu_time, screen_shake
+    pygame.init()
+    window = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(WINDOW_TITLE)
+    if engine is None:
+        load_assets()
+    cap = open_camera(0)
+
+    game_state = "MENU"
+    menu_time = 0
+    particles.clear()
+    # Nada de una sesión abandonada a mitad de partida pasa a la siguiente
+    screen_shake = None
+    trail_layer.clear()
+    effect_layer.clear()
+    try:
+        run_loop()
+    finally:
+        stop()
+
+if __name__ == "__main__":
+    main()
+    close()
+    pygame.quit()
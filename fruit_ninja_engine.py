@@ -0,0 +1,238 @@
+# fruit_ninja_engine.py
+# Lógica de Fruit Ninja separada del dibujo, la cámara y MediaPipe:
+# aparición de objetos, movimiento, colisiones con la espada, combos y puntaje.
+# Se puede avanzar frame a frame con entradas de manos sintéticas para medir
+# o probar la lógica sin ventana (python fruit_ninja_engine.py).
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pygame  # Solo pygame.Rect; no abre ventana
+
+from collision import SweptCollider
+
+# === CONFIGURACIÓN DEL JUEGO ===
+GAME_DURATION = 3 * 60 * 1000
+LEVEL_UP_TIME = 30 * 1000
+BASE_SPEED_MIN = 5
+BASE_SPEED_MAX = 10
+SPAWN_FRAME_INTERVAL = 12
+COMBO_WINDOW_MS = 1500
+OBJECT_SIZE = 40  # Igual que las imágenes de fruta escaladas (40x40)
+MAX_SWORD_POSITIONS = 10
+
+
+def new_player_states() -> Dict[int, Dict]:
+    return {
+        1: {"score": 0, "alive": True, "death_time": 0, "combo": 0, "last_hit_time": 0},
+        2: {"score": 0, "alive": True, "death_time": 0, "combo": 0, "last_hit_time": 0}
+    }
+
+
+class FruitNinjaEngine:
+    def __init__(self, fruit_colors: List[Tuple[int, int, int]], width: int = 800, height: int = 600,
+                 seed: Optional[int] = None):
+        """
+        fruit_colors: color neón de cada tipo de fruta; los objetos guardan el
+        índice en "fruit" para que el dibujo elija su imagen.
+        seed: semilla del generador aleatorio (partidas reproducibles).
+        """
+        self.fruit_colors = list(fruit_colors)
+        self.width = width
+        self.height = height
+        self.rng = random.Random(seed)
+        self.collider = SweptCollider(hit_radius=25)
+        self.reset(1)
+
+    def reset(self, players: int):
+        """Reinicia el juego para 1 o 2 jugadores"""
+        self.num_players = players
+        self.objects: List[Dict] = []
+        self.player_states = new_player_states()
+        self.sword_positions: Dict[int, List[Tuple[int, int]]] = {1: [], 2: []}
+        self.current_level = 0
+        self.frame_count = 0
+        self.game_over = False
+        self.start()
+
+    def start(self):
+        """Poner el reloj de la partida en cero (al terminar la calibración)"""
+        self.time_ms = 0.0
+
+    @property
+    def elapsed_time_ms(self) -> int:
+        return int(self.time_ms)
+
+    @property
+    def remaining_time_ms(self) -> int:
+        return max(0, GAME_DURATION - self.elapsed_time_ms)
+
+    def track_hands(self, hand_inputs: Dict[int, Tuple[int, int]]):
+        """Registrar la posición de la palma de cada jugador vivo (trail y barrido)"""
+        for player_id, pos in hand_inputs.items():
+            if player_id in self.player_states and self.player_states[player_id]["alive"]:
+                positions = self.sword_positions[player_id]
+                positions.append(pos)
+                if len(positions) > MAX_SWORD_POSITIONS:
+                    positions.pop(0)
+
+    def spawn_object(self, level: int, player_zone: int = 0) -> Dict:
+        """Genera una fruta o bomba en la zona del jugador"""
+        speed_min = BASE_SPEED_MIN + level * 1.5
+        speed_max = BASE_SPEED_MAX + level * 2.5
+        bomb_prob = min(0.5, 0.2 + level * 0.1)
+
+        speed = self.rng.randint(int(speed_min), int(speed_max))
+        y = -50
+
+        if player_zone == 1:
+            x_min, x_max = 50, self.width // 2 - 50
+        elif player_zone == 2:
+            x_min, x_max = self.width // 2 + 50, self.width - 50
+        else:
+            x_min, x_max = 50, self.width - 50
+
+        x = self.rng.randint(x_min, x_max)
+
+        if self.rng.random() < bomb_prob:
+            return {
+                "rect": pygame.Rect(x, y, OBJECT_SIZE, OBJECT_SIZE),
+                "speed": speed,
+                "kind": "bomb",
+                "zone": player_zone,
+                "rotation": 0,
+                "pulse_time": 0
+            }
+
+        fruit = self.rng.randrange(len(self.fruit_colors))
+        return {
+            "rect": pygame.Rect(x, y, OBJECT_SIZE, OBJECT_SIZE),
+            "speed": speed,
+            "kind": "fruit",
+            "fruit": fruit,
+            "zone": player_zone,
+            "color": self.fruit_colors[fruit],
+            "rotation": 0,
+            "spin_speed": self.rng.uniform(-10, 10)
+        }
+
+    def step(self, dt: float, hand_inputs: Optional[Dict[int, Tuple[int, int]]] = None) -> List[Dict]:
+        """
+        Avanza un frame de partida.
+        dt: segundos de reloj de juego transcurridos (tiempo límite, niveles y combos);
+        el movimiento y la aparición de objetos son por frame, como en el juego.
+        hand_inputs: {player_id: (x, y)} con la palma de cada jugador detectada este frame.
+        Devuelve los eventos del frame para los efectos visuales:
+        {"type": "fruit" | "bomb", "player", "pos", "color", "combo"}.
+        """
+        hand_inputs = hand_inputs or {}
+        self.track_hands(hand_inputs)
+        self.time_ms += dt * 1000.0
+        now = self.elapsed_time_ms
+        states = self.player_states
+
+        # Lógica de fin de partida
+        if self.remaining_time_ms == 0:
+            self.game_over = True
+        if self.num_players == 2:
+            if all(not state["alive"] for state in states.values()):
+                self.game_over = True
+        elif not states[1]["alive"]:
+            self.game_over = True
+
+        # === SPAWN DE OBJETOS ===
+        self.current_level = now // LEVEL_UP_TIME
+        self.frame_count += 1
+        if self.frame_count >= SPAWN_FRAME_INTERVAL:
+            if self.num_players == 1:
+                if states[1]["alive"]:
+                    self.objects.append(self.spawn_object(self.current_level))
+            else:
+                zone_to_spawn = self.rng.choice([1, 2])
+                if states[zone_to_spawn]["alive"]:
+                    self.objects.append(self.spawn_object(self.current_level, player_zone=zone_to_spawn))
+            self.frame_count = 0
+
+        # === ANIMACIÓN DE OBJETOS ===
+        for obj in self.objects:
+            obj["rect"].y += obj["speed"]
+            obj["rotation"] += obj.get("spin_speed", 0)
+            if obj["kind"] == "bomb":
+                obj["pulse_time"] += 1
+
+        # === DETECCIÓN DE COLISIONES ===
+        # Segmento barrido por cada espada desde el frame anterior, contra la grilla de objetos
+        swords = [player_id for player_id in hand_inputs
+                  if player_id in states and states[player_id]["alive"]]
+        self.collider.prepare([obj["rect"] for obj in self.objects])
+        sword_hits = {player_id: self.collider.hits(self.collider.sweep_segment(self.sword_positions[player_id]))
+                      for player_id in swords}
+
+        events = []
+        remaining = []
+        for index, obj in enumerate(self.objects):
+            # Si el objeto sale de la pantalla, se elimina
+            if obj["rect"].y > self.height:
+                continue
+
+            for player_id in swords:
+                state = states[player_id]
+                if not state["alive"] or index not in sword_hits[player_id]:
+                    continue
+
+                if obj["kind"] == "fruit":
+                    # Sistema de combos
+                    if now - state["last_hit_time"] < COMBO_WINDOW_MS:
+                        state["combo"] += 1
+                    else:
+                        state["combo"] = 1
+                    state["last_hit_time"] = now
+
+                    # Puntuación con multiplicador de combo
+                    state["score"] += min(state["combo"], 10)
+                    events.append({"type": "fruit", "player": player_id, "pos": obj["rect"].center,
+                                   "color": obj["color"], "combo": state["combo"]})
+                else:
+                    state["alive"] = False
+                    state["death_time"] = now
+                    state["combo"] = 0
+                    events.append({"type": "bomb", "player": player_id, "pos": obj["rect"].center,
+                                   "color": (255, 0, 0), "combo": 0})
+                break
+            else:
+                remaining.append(obj)
+
+        self.objects = remaining
+        return events
+
+
+def run_benchmark(frames: int = 20000, players: int = 2, seed: int = 0):
+    """Simular una partida con manos sintéticas que cortan en zigzag"""
+    engine = FruitNinjaEngine([(255, 20, 147), (57, 255, 20), (255, 105, 180), (138, 43, 226), (255, 165, 0)],
+                              seed=seed)
+    engine.reset(players)
+    dt = 1 / 60
+    hits = bombs = 0
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        phase = frame % 40
+        sweep = phase if phase < 20 else 40 - phase
+        hand_inputs = {1: (100 + sweep * 10, 300 + (frame % 7) * 20)}
+        if players == 2:
+            hand_inputs[2] = (500 + sweep * 10, 300 - (frame % 5) * 20)
+        for event in engine.step(dt, hand_inputs):
+            if event["type"] == "fruit":
+                hits += 1
+            else:
+                bombs += 1
+        if engine.game_over:
+            engine.reset(players)
+    elapsed = time.perf_counter() - start
+
+    print(f"{frames} frames en {elapsed:.3f}s ({frames / elapsed:,.0f} frames/s), "
+          f"{hits} frutas cortadas, {bombs} bombas")
+
+
+if __name__ == "__main__":
+    run_benchmark()
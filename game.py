@@ -6,16 +6,19 @@ import math
 from collections import deque
 
 from assets import AssetsManager
-from detector import HandTracker
+from camera import open_camera
+from detector import HandResult, HandTracker, PipelinedHandTracker, RoiHandTracker
 from effects import EffectsManager
+from profiler import FrameProfiler
 from ui import UIManager
 from utils import Utils
 
 class BasketballGamePro:
-    def __init__(self):
-        # Configuración cvzone HandDetector
-        self.hand_tracker = HandTracker(maxHands=2, detectionCon=0.7)
-        
+    def __init__(self, hand_tracker=None, assets=None):
+        """
+        hand_tracker / assets: detector y sprites ya cargados para reutilizar
+        entre partidas (el menú los mantiene en memoria); si no, se crean.
+        """
         # Timer del juego - 3 minutos
         self.game_duration = 180
         self.start_time = time.time()
@@ -27,9 +30,22 @@ class BasketballGamePro:
         self.screen_height = 720
         self.split_line_x = self.screen_width // 2
         
+        # Configuración cvzone HandDetector
+        # Con roi_tracking cada jugador se sigue con un recorte alrededor de su mano
+        self.roi_tracking = True
+        if hand_tracker is None:
+            hand_tracker = self.create_hand_tracker(self.screen_width, self.roi_tracking)
+        self.hand_tracker = hand_tracker
+        
+        # Inferencia en paralelo al dibujado (frame N se dibuja mientras se infiere N+1)
+        self.pipelined_inference = True
+        self.max_landmark_age = 0.25
+        self.hand_pipeline = PipelinedHandTracker(self.hand_tracker) if self.pipelined_inference else None
+        self.last_hand_frame_id = 0
+        
         # Managers
         self.assets_manager = AssetsManager()
-        self.assets = self.assets_manager.load_assets()
+        self.assets = assets if assets is not None else self.assets_manager.load_assets()
         
         self.effects_manager = EffectsManager(self.assets_manager.colors)
         
@@ -68,10 +84,20 @@ class BasketballGamePro:
             'right': {'min_x': 690, 'max_x': 1230, 'min_y': 60, 'max_y': 350}
         }
         
-        # Cámara
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        # Cámara (captura en segundo plano, siempre el frame más reciente)
+        self.cap = open_camera(0, self.screen_width, self.screen_height)
+        
+        # Tiempos por etapa (P: mostrar/ocultar HUD de rendimiento)
+        self.profiler = FrameProfiler("basketball")
+
+    @staticmethod
+    def create_hand_tracker(screen_width=1280, roi_tracking=True):
+        split_line_x = screen_width // 2
+        if roi_tracking:
+            return RoiHandTracker(
+                detectionCon=0.7, inference_size=(640, 360),
+                regions=[(0, split_line_x), (split_line_x, screen_width)])
+        return HandTracker(maxHands=2, detectionCon=0.7, inference_size=(640, 360))
 
     def get_remaining_time(self):
         elapsed = time.time() - self.start_time
@@ -198,10 +224,11 @@ class BasketballGamePro:
                 return thumb_extended and fingers_folded
         return False
 
-    def detect_basket(self, hand_pos, left_basket_pos, right_basket_pos, split_line_x):
+    def detect_basket(self, hand_pos, left_basket_pos, right_basket_pos, split_line_x, timestamp=None):
         """Detectar si la mano está cerca de una canasta"""
         x, y = hand_pos
-        current_time = time.time()
+        # Usar el instante de captura de los landmarks, no el de dibujado
+        current_time = timestamp if timestamp is not None else time.time()
         
         # Determinar en qué lado está la mano
         if x < split_line_x:
@@ -259,6 +286,7 @@ class BasketballGamePro:
         print("CONTROLES:")
         print("   Pulgar arriba 2 segundos: Salir")
         print("   R: Reiniciar puntajes")
+        print("   P: Mostrar/ocultar rendimiento")
         print("   ESC: Salida de emergencia")
         print("DURACION DEL JUEGO: 3 MINUTOS")
         print("REGLAS:")
@@ -272,11 +300,19 @@ class BasketballGamePro:
         print("=" * 60)
         
         while True:
-            success, img = self.cap.read()
+            self.profiler.begin_frame()
+            success, img, frame_id, frame_time = self.cap.read_latest()
             if not success:
                 break
+            self.profiler.lap('capture')
                 
             img = cv2.flip(img, 1)
+            
+            if self.pipelined_inference:
+                # Enviar el frame limpio a inferencia antes de dibujar encima
+                self.hand_pipeline.submit(img.copy(), frame_id, frame_time)
+            self.profiler.lap('convert')
+            
             remaining_time = self.get_remaining_time()
             
             # Verificar fin de juego por tiempo
@@ -292,15 +328,29 @@ class BasketballGamePro:
                 self.update_moving_baskets()
             
             # Superponer assets
-            img = Utils.overlay_with_mask(img, self.assets['hoop_left'], 
-                                        self.assets['hoop_left_mask'], 
-                                        self.left_basket_pos[0], self.left_basket_pos[1])
-            img = Utils.overlay_with_mask(img, self.assets['hoop_right'], 
-                                        self.assets['hoop_right_mask'], 
-                                        self.right_basket_pos[0], self.right_basket_pos[1])
+            Utils.blit_sprites(img, [
+                (self.assets['hoop_left_sprite'], self.left_basket_pos[0], self.left_basket_pos[1]),
+                (self.assets['hoop_right_sprite'], self.right_basket_pos[0], self.right_basket_pos[1])
+            ])
+            self.profiler.lap('sprites')
             
             # Procesar detección de manos con cvzone
-            img, hands = self.hand_tracker.findHands(img)
+            if self.pipelined_inference:
+                hand_result = self.hand_pipeline.latest()
+                if hand_result.age() > self.max_landmark_age:
+                    hand_result = HandResult([], hand_result.frame_id, hand_result.timestamp)
+                self.hand_tracker.draw_hands(img, hand_result.hands)
+            else:
+                img, hands = self.hand_tracker.findHands(img)
+                hand_result = HandResult(hands, frame_id, frame_time)
+            
+            # En modo pipeline el modelo corre en el hilo de inferencia: aquí solo se dibuja
+            self.profiler.lap('hands_draw' if self.pipelined_inference else 'inference')
+            
+            hands = hand_result.hands
+            # La lógica de gestos solo avanza con landmarks nuevos, no al redibujar los mismos
+            fresh_landmarks = hand_result.frame_id != self.last_hand_frame_id
+            self.last_hand_frame_id = hand_result.frame_id
             
             thumbs_detected = False
             
@@ -322,8 +372,11 @@ class BasketballGamePro:
                         cx = int(hand['lmList'][9][0])  # Usar punto central de la mano
                         cy = int(hand['lmList'][9][1])
                         
-                        basket_made, player_id = self.detect_basket(
-                            (cx, cy), self.left_basket_pos, self.right_basket_pos, self.split_line_x)
+                        basket_made, player_id = False, 0
+                        if fresh_landmarks:
+                            basket_made, player_id = self.detect_basket(
+                                (cx, cy), self.left_basket_pos, self.right_basket_pos,
+                                self.split_line_x, hand_result.timestamp)
                         
                         if basket_made:
                             points, color = self.handle_basket_score(player_id)
@@ -346,14 +399,14 @@ class BasketballGamePro:
                         # Dibujar pelota en la posición de la mano
                         ball_x, ball_y = cx - 27, cy - 27
                         if (0 <= ball_x < img.shape[1]-55 and 0 <= ball_y < img.shape[0]-55):
-                            img = Utils.overlay_with_mask(img, self.assets['ball'], 
-                                                        self.assets['ball_mask'], ball_x, ball_y)
+                            self.assets['ball_sprite'].blit(img, ball_x, ball_y)
             
             # Manejo del sistema de salida
-            if thumbs_detected:
-                self.thumbs_up_count += 1
-            else:
-                self.thumbs_up_count = max(0, self.thumbs_up_count - 2)
+            if fresh_landmarks:
+                if thumbs_detected:
+                    self.thumbs_up_count += 1
+                else:
+                    self.thumbs_up_count = max(0, self.thumbs_up_count - 2)
             
             if self.thumbs_up_count >= self.thumbs_up_threshold and not self.exiting:
                 if self.show_final_modal:
@@ -363,6 +416,7 @@ class BasketballGamePro:
                 elif not self.game_over:
                     self.exiting = True
                     print("Iniciando secuencia de despedida...")
+            self.profiler.lap('logic')
             
             # Actualizar efectos
             self.effects_manager.update_particles()
@@ -371,6 +425,7 @@ class BasketballGamePro:
             if self.game_over or self.show_final_modal:
                 self.effects_manager.update_confetti()
                 self.effects_manager.draw_confetti(img)
+            self.profiler.lap('effects')
             
             # Dibujar UI
             if self.exiting:
@@ -391,19 +446,30 @@ class BasketballGamePro:
                     self.super_speed_activated, self.moving_baskets, self.split_line_x,
                     self.left_basket_pos, self.right_basket_pos)
             
+            self.profiler.draw_overlay(img)
+            self.profiler.lap('ui')
+            
             cv2.imshow("Basketball Pro Championship", img)
             
             # Manejo de teclas
             key = cv2.waitKey(1) & 0xFF
+            self.profiler.lap('present')
+            self.profiler.end_frame()
             if key == 27:  # ESC
                 break
             elif key == ord('r') or key == ord('R'):
                 if not self.exiting:
                     self.reset_game()
+            elif key == ord('p') or key == ord('P'):
+                self.profiler.toggle_overlay()
         
         self.cleanup()
 
     def cleanup(self):
+        capture_stats = self.cap.get_stats()
+        self.profiler.export_csv()
+        if self.hand_pipeline is not None:
+            self.hand_pipeline.stop()
         self.cap.release()
         cv2.destroyAllWindows()
         
@@ -432,4 +498,6 @@ class BasketballGamePro:
             print("   GRAN PARTIDA! Excelente competencia")
             
         print("   Gracias por jugar Basketball Pro Championship!")
+        print(f"   Camara: {capture_stats['captured']} frames capturados, "
+              f"{capture_stats['dropped']} descartados")
         print("="*60)
\ No newline at end of file
@@ -0,0 +1,115 @@
+# game_host.py
+# Ejecuta los juegos dentro del proceso del menú.
+# Con subprocess cada juego arrancaba un intérprete nuevo: volver a importar
+# cv2, mediapipe, cvzone y pygame, recargar los modelos y reabrir la cámara
+# (varios segundos de pantalla negra). El host importa cada juego una sola vez,
+# en segundo plano mientras se muestra el menú, y mantiene sus detectores
+# cargados entre partidas.
+#
+# Cada juego es un módulo con:
+#   main()     -> una sesión (abre cámara y ventana, vuelve cuando el jugador sale)
+#   warm_up()  -> opcional, carga detectores/sprites antes de la primera partida
+#   stop()     -> opcional, cierra cámara y ventana si la sesión quedó abierta
+#   close()    -> opcional, libera los detectores al cerrar el menú
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+
+class GamePlugin:
+    def __init__(self, archivo):
+        """archivo: script del juego (main.py, fruit_ninja.py...); el módulo lleva su nombre"""
+        self.archivo = archivo
+        self.module_name = os.path.splitext(os.path.basename(archivo))[0]
+        self.module = None
+        self.error = None
+        self.load_time = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Importar el juego y precalentarlo (solo la primera vez); None si falló"""
+        with self._lock:
+            if self.module is None and self.error is None:
+                start = time.perf_counter()
+                try:
+                    module = importlib.import_module(self.module_name)
+                    warm_up = getattr(module, 'warm_up', None)
+                    if warm_up is not None:
+                        warm_up()
+                    self.module = module
+                except Exception as e:
+                    self.error = e
+                    traceback.print_exc()
+                self.load_time = time.perf_counter() - start
+            return self.module
+
+    def start(self):
+        """Jugar una sesión; vuelve cuando el jugador sale del juego"""
+        module = self.load()
+        if module is None:
+            raise RuntimeError(f"No se pudo cargar {self.archivo}: {self.error}")
+        try:
+            module.main()
+        except SystemExit:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Cerrar lo que haya dejado abierto la sesión; los detectores siguen cargados"""
+        stop = getattr(self.module, 'stop', None)
+        if stop is not None:
+            stop()
+
+    def close(self):
+        """Liberar los detectores del juego"""
+        close = getattr(self.module, 'close', None)
+        if close is not None:
+            close()
+
+
+class GameHost:
+    def __init__(self, archivos, in_process=None):
+        """
+        archivos: scripts de los juegos que se pueden lanzar.
+        in_process: correr los juegos en este proceso; por defecto activado
+        salvo que ARCADE_GAME_HOST=0 (vuelve a un subprocess por juego).
+        """
+        if in_process is None:
+            in_process = os.environ.get('ARCADE_GAME_HOST', '1') != '0'
+        self.in_process = in_process
+        self.plugins = {archivo: GamePlugin(archivo) for archivo in archivos}
+        self._preload_thread = None
+
+    def preload(self):
+        """Importar y precalentar todos los juegos en un hilo de fondo"""
+        if not self.in_process or self._preload_thread is not None:
+            return
+        self._preload_thread = threading.Thread(target=self._preload_all, name="GamePreload", daemon=True)
+        self._preload_thread.start()
+
+    def _preload_all(self):
+        for plugin in self.plugins.values():
+            if not os.path.exists(plugin.archivo):
+                continue
+            plugin.load()
+            if plugin.module is not None:
+                print(f"Juego listo: {plugin.archivo} ({plugin.load_time:.1f}s)")
+
+    def run(self, archivo):
+        """Lanzar un juego y esperar a que termine; devuelve el código de salida"""
+        plugin = self.plugins.get(archivo)
+        if not self.in_process or plugin is None or plugin.load() is None:
+            return subprocess.run([sys.executable, archivo]).returncode
+        plugin.start()
+        return 0
+
+    def close(self):
+        """Liberar los detectores de los juegos cargados (al salir del menú)"""
+        for plugin in self.plugins.values():
+            if plugin.module is not None:
+                plugin.close()
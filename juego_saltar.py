@@ -5,9 +5,17 @@ import time
 import math
 import numpy as np
 
+from camera import open_camera
+from pose_workers import PoseWorkers
+from profiler import FrameProfiler
+from text_cache import TextSpriteCache
+from utils import InferenceScaler
+
 # ---------------- Config ----------------
 WIDTH, HEIGHT = 1280, 720
 CAP_INDEX = 0
+# Resolución a la que corre el modelo de pose (el dibujado sigue a WIDTH x HEIGHT)
+INFERENCE_SIZE = (640, 360)
 
 # Block types probabilities: 'normal' (70%), 'gold' (15%), 'blue' (15%)
 BLOCK_TYPES = (['normal'] * 70 + ['gold'] * 15 + ['blue'] * 15)
@@ -23,19 +31,22 @@ ROUND_DURATION = 180  # 3 minutos por ronda
 GOLD_DURATION = 5.0
 
 # ---------------- Setup ----------------
-cap = cv2.VideoCapture(CAP_INDEX)
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, WIDTH)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, HEIGHT)
+# La cámara y la ventana se abren en main(); los detectores quedan cargados
+# entre partidas cuando el juego corre dentro del menú
+cap = None
 
 mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
 
-# Two pose detectors for 2-player mode
-pose_left = mp_pose.Pose()
-pose_right = mp_pose.Pose()
+# Two pose detectors for 2-player mode (one tracker per side, run in parallel)
+pose_workers = PoseWorkers(2)
+inference_scaler = InferenceScaler(INFERENCE_SIZE)
+
+# Tiempos por etapa (P: mostrar/ocultar HUD de rendimiento)
+profiler = FrameProfiler("juego_saltar")
 
-# CAMBIADO: Ventana normal en lugar de WINDOW_NORMAL que causa problemas
-cv2.namedWindow("Esquivar Bloques", cv2.WINDOW_AUTOSIZE)
+# Textos rasterizados reutilizados entre frames
+text_cache = TextSpriteCache()
 
 # Colores mejorados
 COLORS = {
@@ -171,14 +182,9 @@ class Block:
 
 # ---------------- Utilities draw ----------------
 def draw_fancy_text(frame, text, pos, scale=1.0, color=(255,255,255), thickness=2, font_type=0):
+    # Sombra, borde y texto se rasterizan una vez y se reutilizan como sprite
     x, y = pos
-    # Sombra
-    cv2.putText(frame, text, (x+3, y+3), font_type, scale, (0,0,0), thickness+2, cv2.LINE_AA)
-    # Borde
-    cv2.putText(frame, text, (x-1, y-1), font_type, scale, (255,255,255), thickness+1, cv2.LINE_AA)
-    cv2.putText(frame, text, (x+1, y+1), font_type, scale, (255,255,255), thickness+1, cv2.LINE_AA)
-    # Texto principal
-    cv2.putText(frame, text, (x, y), font_type, scale, color, thickness, cv2.LINE_AA)
+    text_cache.draw(frame, text, x, y, font_type, scale, color, thickness, style='fancy')
 
 def draw_background(frame):
     # Fondo de otoño inspirado
@@ -262,7 +268,8 @@ def countdown():
             
             # Efecto de zoom para el número
             progress = (time.time() - start_time)
-            scale = 6.0 - 4.0 * progress
+            # Escala en pasos de 0.1 para reutilizar los textos cacheados
+            scale = round((6.0 - 4.0 * progress) * 10) / 10
             alpha = 1.0 - progress
             
             # Número grande en el centro con fondo semi-transparente
@@ -348,10 +355,13 @@ def game_loop(mode):
     round_start = time.time()
     
     while True:
+        profiler.begin_frame()
         ret, frame = cap.read()
         if not ret:
             break
+        profiler.lap('capture')
         frame = cv2.flip(frame, 1)
+        profiler.lap('convert')
         
         # NO usar draw_background() aquí - queremos ver la cámara real
         # Solo agregamos una overlay sutil para el HUD si es necesario
@@ -372,13 +382,12 @@ def game_loop(mode):
         
         # Detección de pose (sin divisor visual)
         if mode == 2:
-            left_crop = frame[:, :WIDTH//2].copy()
-            right_crop = frame[:, WIDTH//2:].copy()
-            rgb_left = cv2.cvtColor(left_crop, cv2.COLOR_BGR2RGB)
-            rgb_right = cv2.cvtColor(right_crop, cv2.COLOR_BGR2RGB)
+            # Una sola reducción + conversión; cada jugador recibe una vista de su mitad
+            rgb_small = cv2.cvtColor(inference_scaler.prepare(frame), cv2.COLOR_BGR2RGB)
+            half = rgb_small.shape[1] // 2
+            profiler.lap('convert')
 
-            res_left = pose_left.process(rgb_left)
-            res_right = pose_right.process(rgb_right)
+            res_left, res_right = pose_workers.process([rgb_small[:, :half], rgb_small[:, half:]])
 
             lm_p1 = get_landmarks_in_full_coords(res_left, 0, WIDTH//2, WIDTH, HEIGHT)
             lm_p2 = get_landmarks_in_full_coords(res_right, WIDTH//2, WIDTH//2, WIDTH, HEIGHT)
@@ -413,14 +422,16 @@ def game_loop(mode):
                     
         else:
             # Un jugador - usar frame completo
-            rgb_full = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            res_full = pose_left.process(rgb_full)
+            rgb_full = cv2.cvtColor(inference_scaler.prepare(frame), cv2.COLOR_BGR2RGB)
+            profiler.lap('convert')
+            res_full = pose_workers.poses[0].process(rgb_full)
             lm_p1 = get_landmarks_in_full_coords(res_full, 0, WIDTH, WIDTH, HEIGHT)
             lm_p2 = []
             
             # Dibujar landmarks
             if res_full.pose_landmarks:
                 mp_drawing.draw_landmarks(frame, res_full.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+        profiler.lap('inference')
 
         # Spawn de bloques con dificultad progresiva
         if not game_over and (time.time() - last_spawn) > spawn_interval:
@@ -495,6 +506,7 @@ def game_loop(mode):
                         add *= 2
                     score_p2 += add
                 blocks.remove(b)
+        profiler.lap('logic')
 
         # Draw HUD SOBRE LA CÁMARA
         draw_score_panel(frame, score_p1, score_p2, mode, gold_end_p1, gold_end_p2, time_left)
@@ -520,10 +532,17 @@ def game_loop(mode):
             
             draw_fancy_text(frame, "SPACE - REINICIAR    ESC - MENU", (WIDTH//2 - 250, HEIGHT//2 + 100), 1.0, COLORS['text_primary'], 2, cv2.FONT_HERSHEY_DUPLEX)
 
+        profiler.draw_overlay(frame)
+        profiler.lap('ui')
+
         cv2.imshow("Esquivar Bloques", frame)
         cv2.setWindowProperty("Esquivar Bloques", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
         
         k = cv2.waitKey(20) & 0xFF
+        profiler.lap('present')
+        profiler.end_frame()
+        if k == ord('p'):
+            profiler.toggle_overlay()
         if k == 27:
             return False
         if game_over and k == 32:
@@ -532,14 +551,39 @@ def game_loop(mode):
     return False
 
 # ---------------- Main ----------------
-if __name__ == "__main__":
-    while True:
-        mode = menu()
-        if mode == 0:
-            break
-        restart = game_loop(mode)
-        if not restart:
-            break
-
+def main():
+    """Jugar hasta que el jugador sale con ESC; no libera los detectores"""
+    global cap
+    cap = open_camera(CAP_INDEX, WIDTH, HEIGHT)
+
+    # CAMBIADO: Ventana normal en lugar de WINDOW_NORMAL que causa problemas
+    cv2.namedWindow("Esquivar Bloques", cv2.WINDOW_AUTOSIZE)
+
+    try:
+        while True:
+            mode = menu()
+            if mode == 0:
+                break
+            restart = game_loop(mode)
+            if not restart:
+                break
+    finally:
+        stop()
+
+def stop():
+    """Cerrar cámara y ventana y exportar tiempos"""
+    global cap
+    if cap is None:
+        return
+    profiler.export_csv()
     cap.release()
-    cv2.destroyAllWindows()
\ No newline at end of file
+    cap = None
+    cv2.destroyWindow("Esquivar Bloques")
+
+def close():
+    """Liberar los detectores de pose (al cerrar el programa)"""
+    pose_workers.close()
+
+if __name__ == "__main__":
+    main()
+    close()
@@ -1,13 +1,37 @@
 # Punto de entrada
+from assets import AssetsManager
 from game import BasketballGamePro
 
-if __name__ == "__main__":
+# Detector y sprites que se conservan entre partidas cuando el juego corre dentro del menú
+hand_tracker = None
+assets = None
+
+def warm_up():
+    """Cargar el detector de manos y los sprites antes de la primera partida"""
+    global hand_tracker, assets
+    if hand_tracker is None:
+        hand_tracker = BasketballGamePro.create_hand_tracker()
+        assets = AssetsManager().load_assets()
+
+def main():
+    warm_up()
+    if hasattr(hand_tracker, 'reset'):
+        hand_tracker.reset()
+    game = None
     try:
-        game = BasketballGamePro()
+        game = BasketballGamePro(hand_tracker, assets)
         game.run()
     except KeyboardInterrupt:
         print("\nJuego interrumpido! Hasta la proxima!")
     except Exception as e:
         print(f"Error en el juego: {e}")
         print("Verifica tu camara y las librerias instaladas")
+    finally:
+        # Si la partida se cortó por un error, no dejar la cámara tomada (release es idempotente)
+        if game is not None:
+            if game.hand_pipeline is not None:
+                game.hand_pipeline.stop()
+            game.cap.release()
 
+if __name__ == "__main__":
+    main()
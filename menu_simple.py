@@ -7,12 +7,13 @@ Diseño moderno con cards estilo Bootstrap
 
 import cv2
 import numpy as np
-import subprocess
-import sys
 import os
 import random
 import math
 
+from camera_service import start_camera_service
+from game_host import GameHost
+
 # Los 4 juegos
 JUEGOS = [
     {
@@ -45,17 +46,54 @@ JUEGOS = [
     }
 ]
 
-class Estrella:
-    def __init__(self, w, h):
-        self.x = random.randint(0, w)
-        self.y = random.randint(0, h)
-        self.size = random.randint(1, 3)
-        self.brillo = random.randint(150, 255)
-        self.velocidad = random.uniform(0.1, 0.5)
-        
+# Los juegos corren dentro de este proceso (módulos y detectores ya cargados)
+game_host = GameHost([juego['archivo'] for juego in JUEGOS])
+
+# Cuadros prerenderizados por galaxia: el dibujo se repite cada 45° de rotación
+GALAXIA_PASOS = 45
+
+class CampoEstrellas:
+    def __init__(self, w, h, cantidad=200):
+        """
+        Estrellas como arrays: el brillo titila con un paso aleatorio y todas
+        se dibujan con una sola asignación sobre los píxeles precalculados.
+        """
+        self.x = np.random.randint(0, w + 1, cantidad)
+        self.y = np.random.randint(0, h + 1, cantidad)
+        self.size = np.random.randint(1, 4, cantidad)
+        self.brillo = np.random.randint(150, 256, cantidad)
+
+        # Píxeles de cada disco y del anillo de las que brillan más (mismos que cv2.circle)
+        self.disco_y, self.disco_x, self.disco_estrella = self._pixeles(w, h, self.size, -1)
+        self.anillo_y, self.anillo_x, self.anillo_estrella = self._pixeles(w, h, self.size + 2, 1)
+        self.pueden_brillar = self.size >= 2
+
+    def _pixeles(self, w, h, radios, grosor):
+        ys, xs, duenos = [], [], []
+        for radio in np.unique(radios):
+            lienzo = np.zeros((2 * radio + 3, 2 * radio + 3), dtype=np.uint8)
+            cv2.circle(lienzo, (radio + 1, radio + 1), int(radio), 255, grosor)
+            dy, dx = np.nonzero(lienzo)
+            indices = np.nonzero(radios == radio)[0]
+            ys.append((self.y[indices, None] + dy - radio - 1).ravel())
+            xs.append((self.x[indices, None] + dx - radio - 1).ravel())
+            duenos.append(np.repeat(indices, len(dy)))
+        ys, xs, duenos = np.concatenate(ys), np.concatenate(xs), np.concatenate(duenos)
+        dentro = (ys >= 0) & (ys < h) & (xs >= 0) & (xs < w)
+        return ys[dentro], xs[dentro], duenos[dentro]
+
+    def dibujar(self, frame):
+        brillo = self.brillo.astype(np.uint8)
+        frame[self.disco_y, self.disco_x] = brillo[self.disco_estrella, None]
+
+        # Algunas estrellas brillan más
+        brillan = self.pueden_brillar & (np.random.random(len(self.brillo)) > 0.95)
+        if brillan.any():
+            sel = brillan[self.anillo_estrella]
+            frame[self.anillo_y[sel], self.anillo_x[sel]] = brillo[self.anillo_estrella[sel], None]
+
     def actualizar(self):
-        self.brillo += random.randint(-10, 10)
-        self.brillo = max(100, min(255, self.brillo))
+        self.brillo = np.clip(self.brillo + np.random.randint(-10, 11, len(self.brillo)), 100, 255)
 
 class Galaxia:
     def __init__(self, w, h):
@@ -69,11 +107,76 @@ class Galaxia:
             (255, 100, 200),  # Rosa
             (100, 150, 255)   # Azul
         ])
+        
+        # Caja que cubre las elipses; los cuadros se renderizan al necesitarse
+        r = self.radio + 2
+        self.caja = (self.x - r, self.y - r, self.x + r + 1, self.y + r + 1)
+        self._cuadros = {}
     
     def actualizar(self):
         self.rotacion += self.velocidad_rot
         if self.rotacion >= 360:
             self.rotacion = 0
+    
+    def cuadro(self):
+        """Sprite aditivo (15% del color dentro de las elipses) para la rotación actual"""
+        paso = int(self.rotacion % 45 * GALAXIA_PASOS / 45)
+        sprite = self._cuadros.get(paso)
+        if sprite is None:
+            sprite = self._renderizar(paso * 45 / GALAXIA_PASOS)
+            self._cuadros[paso] = sprite
+        return sprite
+    
+    def _renderizar(self, rotacion):
+        x0, y0, x1, y1 = self.caja
+        mascara = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        centro = (self.x - x0, self.y - y0)
+        
+        # Efecto de galaxia espiral
+        for i in range(3):
+            radio = self.radio - i * 15
+            angulo = rotacion + i * 45
+            for j in range(8):
+                cv2.ellipse(mascara, centro, (radio, radio//2), angulo + j * 45,
+                          0, 180, 255, -1)
+        
+        sprite = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+        sprite[mascara > 0] = [round(c * 0.15) for c in self.color]
+        return sprite
+
+class FondoGalaxia:
+    def __init__(self, w, h, estrellas=200, galaxias=5):
+        """
+        Fondo espacial del menú: el gradiente se calcula una sola vez, cada
+        galaxia suma su sprite solo dentro de su caja y las estrellas se
+        dibujan vectorizadas sobre un frame reutilizado.
+        """
+        self.estrellas = CampoEstrellas(w, h, estrellas)
+        self.galaxias = [Galaxia(w, h) for _ in range(galaxias)]
+        
+        # Fondo negro con ligero gradiente
+        val = (5 + np.arange(h) / h * 15).astype(np.uint8)
+        fondo = np.repeat(val[:, None, None], w, axis=1).repeat(3, axis=2)
+        # Cada galaxia mezclaba una copia del frame completo al 15%: ese aclarado es fijo
+        for _ in self.galaxias:
+            cv2.addWeighted(fondo, 1, fondo, 0.15, 0, fondo)
+        self.fondo = fondo
+        self.frame = np.empty_like(fondo)
+    
+    def dibujar(self):
+        """Frame del fondo (el mismo buffer en cada llamada)"""
+        frame = self.frame
+        np.copyto(frame, self.fondo)
+        
+        for galaxia in self.galaxias:
+            x0, y0, x1, y1 = galaxia.caja
+            roi = frame[y0:y1, x0:x1]
+            cv2.add(roi, galaxia.cuadro(), dst=roi)
+            galaxia.actualizar()
+        
+        self.estrellas.dibujar(frame)
+        self.estrellas.actualizar()
+        return frame
 
 def verificar_juegos():
     """Verificar qué juegos existen"""
@@ -92,52 +195,6 @@ def verificar_juegos():
     print("="*50 + "\n")
     return disponibles
 
-def crear_fondo_galaxia(w, h, estrellas, galaxias):
-    """Crear fondo espacial con estrellas y galaxias"""
-    frame = np.zeros((h, w, 3), dtype=np.uint8)
-    
-    # Fondo negro con ligero gradiente
-    for y in range(h):
-        ratio = y / h
-        val = int(5 + ratio * 15)
-        frame[y, :] = [val, val, val]
-    
-    # Dibujar galaxias
-    for galaxia in galaxias:
-        # Efecto de galaxia espiral
-        overlay = frame.copy()
-        for i in range(3):
-            radio = galaxia.radio - i * 15
-            angulo = galaxia.rotacion + i * 45
-            alpha = 0.3 - i * 0.1
-            
-            for j in range(8):
-                ang_rad = math.radians(angulo + j * 45)
-                x_end = int(galaxia.x + math.cos(ang_rad) * radio)
-                y_end = int(galaxia.y + math.sin(ang_rad) * radio)
-                
-                cv2.ellipse(overlay, (galaxia.x, galaxia.y), 
-                          (radio, radio//2), angulo + j * 45, 
-                          0, 180, galaxia.color, -1)
-        
-        cv2.addWeighted(frame, 1, overlay, 0.15, 0, frame)
-        
-        galaxia.actualizar()
-    
-    # Dibujar estrellas
-    for estrella in estrellas:
-        color = (estrella.brillo, estrella.brillo, estrella.brillo)
-        cv2.circle(frame, (estrella.x, estrella.y), estrella.size, color, -1)
-        
-        # Algunas estrellas brillan más
-        if estrella.size >= 2 and random.random() > 0.95:
-            cv2.circle(frame, (estrella.x, estrella.y), 
-                      estrella.size + 2, color, 1)
-        
-        estrella.actualizar()
-    
-    return frame
-
 def cargar_logo(nombre_archivo, h_deseada=None):
     """Intentar cargar logo PNG con transparencia"""
     if os.path.exists(nombre_archivo):
@@ -284,10 +341,10 @@ def dibujar_card(frame, juego, x, y, w, h, hover=False, pulse=0):
     cv2.putText(frame, "JUGAR", (btn_x+25, btn_y+24), 
                cv2.FONT_HERSHEY_DUPLEX, 0.7, texto_color, 2)
 
-def dibujar_menu(seleccionado, juegos_disponibles, estrellas, galaxias, pulse, logo_text, logo_soft):
+def dibujar_menu(seleccionado, juegos_disponibles, fondo, pulse, logo_text, logo_soft):
     """Dibujar menú completo con cards"""
     w, h = 1400, 900
-    frame = crear_fondo_galaxia(w, h, estrellas, galaxias)
+    frame = fondo.dibujar()
     
     # Logo superior (text-soft.png)
     if logo_text is not None:
@@ -350,17 +407,17 @@ def dibujar_menu(seleccionado, juegos_disponibles, estrellas, galaxias, pulse, l
     return frame
 
 def abrir_juego(juego):
-    """Abrir juego en nueva ventana"""
+    """Abrir juego en nueva ventana (dentro del proceso si ya está cargado)"""
     print(f"\n{'='*50}")
     print(f"ABRIENDO: {juego['nombre']}")
     print(f"Archivo: {juego['archivo']}")
     print(f"{'='*50}")
     
     try:
-        resultado = subprocess.run([sys.executable, juego['archivo']])
+        codigo = game_host.run(juego['archivo'])
         
         print(f"\n{'='*50}")
-        print(f"Juego cerrado - Código: {resultado.returncode}")
+        print(f"Juego cerrado - Código: {codigo}")
         print(f"{'='*50}\n")
         
     except Exception as e:
@@ -386,10 +443,15 @@ def menu_principal():
     
     print("Iniciando menú...\n")
     
+    # La cámara se abre una sola vez y los juegos leen sus frames de memoria compartida
+    camera_service = start_camera_service(0, 1280, 720)
+    
+    # Importar los juegos y cargar sus modelos mientras se muestra el menú
+    game_host.preload()
+    
     # Crear estrellas y galaxias
     w, h = 1400, 900
-    estrellas = [Estrella(w, h) for _ in range(200)]
-    galaxias = [Galaxia(w, h) for _ in range(5)]
+    fondo = FondoGalaxia(w, h, estrellas=200, galaxias=5)
     
     cv2.namedWindow("Oseasoft Arcade", cv2.WINDOW_NORMAL)
     cv2.resizeWindow("Oseasoft Arcade", w, h)
@@ -400,8 +462,8 @@ def menu_principal():
     while True:
         pulse += 0.1
         
-        frame = dibujar_menu(seleccionado, juegos_disponibles, estrellas, 
-                            galaxias, pulse, logo_text, logo_soft)
+        frame = dibujar_menu(seleccionado, juegos_disponibles, fondo, 
+                            pulse, logo_text, logo_soft)
         cv2.imshow("Oseasoft Arcade", frame)
         
         key = cv2.waitKey(30) & 0xFF
@@ -440,6 +502,9 @@ def menu_principal():
                 cv2.resizeWindow("Oseasoft Arcade", w, h)
     
     cv2.destroyAllWindows()
+    game_host.close()
+    if camera_service is not None:
+        camera_service.stop()
     print("\n¡Hasta luego!\n")
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+# pose_workers.py
+# Un detector de pose de MediaPipe por jugador en pantalla dividida.
+# Cada Pose conserva su propio estado de seguimiento (si se comparte uno entre
+# dos personas, MediaPipe vuelve a detectar a la persona en casi cada frame) y
+# opcionalmente cada jugador se procesa en su propio hilo.
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import mediapipe as mp
+
+
+class PoseWorkers:
+    def __init__(self, players=2, parallel=None, **pose_options):
+        """
+        players: cantidad de jugadores (un mp Pose para cada uno).
+        parallel: procesar los jugadores en hilos separados; por defecto
+        activado salvo que ARCADE_POSE_PARALLEL=0.
+        pose_options: argumentos de mp.solutions.pose.Pose
+        (min_detection_confidence, min_tracking_confidence, ...).
+        """
+        if parallel is None:
+            parallel = os.environ.get('ARCADE_POSE_PARALLEL', '1') != '0'
+        self.poses = [mp.solutions.pose.Pose(**pose_options) for _ in range(players)]
+        self.parallel = parallel and players > 1
+        self._executor = None
+        if self.parallel:
+            self._executor = ThreadPoolExecutor(max_workers=players, thread_name_prefix="PoseWorker")
+
+    def __len__(self):
+        return len(self.poses)
+
+    def process(self, images):
+        """
+        images: una imagen RGB por jugador (None para saltar a ese jugador).
+        Devuelve los resultados de MediaPipe en el mismo orden.
+        """
+        if not self.parallel:
+            return [pose.process(img) if img is not None else None
+                    for pose, img in zip(self.poses, images)]
+
+        # MediaPipe libera el GIL mientras corre el grafo, así que los hilos sí se solapan
+        futures = [self._executor.submit(pose.process, img) if img is not None else None
+                   for pose, img in zip(self.poses, images)]
+        return [future.result() if future is not None else None for future in futures]
+
+    def close(self):
+        """Detener los hilos y liberar los grafos de MediaPipe"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for pose in self.poses:
+            pose.close()
@@ -0,0 +1,156 @@
+# profiler.py
+# Medición del tiempo de cada etapa del frame (captura, conversión, inferencia,
+# lógica, efectos, UI, presentación) con percentiles móviles, un HUD opcional
+# sobre el video y exportación a CSV al terminar la sesión.
+import csv
+import os
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class FrameProfiler:
+    def __init__(self, name, window=300, csv_dir=None, show_overlay=None):
+        """
+        name: nombre del juego (se usa en el archivo CSV).
+        window: cantidad de frames para los percentiles móviles.
+        csv_dir: carpeta donde exportar los tiempos (por defecto ARCADE_PROFILE_DIR).
+        show_overlay: mostrar el HUD al iniciar (por defecto ARCADE_PROFILE_HUD=1).
+        """
+        self.name = name
+        self.window = window
+        self.csv_dir = csv_dir if csv_dir is not None else os.environ.get('ARCADE_PROFILE_DIR')
+        if show_overlay is None:
+            show_overlay = os.environ.get('ARCADE_PROFILE_HUD', '0') == '1'
+        self.show_overlay = show_overlay
+
+        self.stage_names = []
+        self.samples = {}
+        self.frame_times = deque(maxlen=window)
+        self.rows = []
+        self.max_rows = 100000
+
+        self._current = {}
+        self._frame_start = None
+        self._last_mark = None
+        self._summary = {}
+        self._summary_frame = -1
+        self.frame_index = 0
+
+    def begin_frame(self):
+        """Marcar el inicio de un frame"""
+        now = time.perf_counter()
+        self._frame_start = now
+        self._last_mark = now
+        self._current = {}
+
+    def lap(self, stage):
+        """Asignar a 'stage' el tiempo transcurrido desde la marca anterior"""
+        if self._last_mark is None:
+            return
+        now = time.perf_counter()
+        self._current[stage] = self._current.get(stage, 0.0) + (now - self._last_mark)
+        self._last_mark = now
+
+    def skip(self):
+        """Descartar el tiempo desde la marca anterior (p. ej. esperas fuera del frame)"""
+        self._last_mark = time.perf_counter()
+
+    def end_frame(self):
+        """Cerrar el frame y guardar sus tiempos"""
+        if self._frame_start is None:
+            return
+        total = time.perf_counter() - self._frame_start
+        self.frame_times.append(total)
+
+        for stage, elapsed in self._current.items():
+            if stage not in self.samples:
+                self.stage_names.append(stage)
+                self.samples[stage] = deque(maxlen=self.window)
+            self.samples[stage].append(elapsed)
+
+        if self.csv_dir and len(self.rows) < self.max_rows:
+            self.rows.append((self.frame_index, total, dict(self._current)))
+
+        self.frame_index += 1
+        self._frame_start = None
+        self._last_mark = None
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+
+    def fps(self):
+        if not self.frame_times:
+            return 0.0
+        return len(self.frame_times) / max(sum(self.frame_times), 1e-9)
+
+    def summary(self):
+        """{etapa: (p50, p95, p99)} en milisegundos, recalculado cada 15 frames"""
+        if self.frame_index - self._summary_frame >= 15:
+            self._summary = {}
+            for stage in self.stage_names:
+                values = np.fromiter(self.samples[stage], dtype=np.float64) * 1000.0
+                self._summary[stage] = tuple(np.percentile(values, [50, 95, 99]))
+            if self.frame_times:
+                values = np.fromiter(self.frame_times, dtype=np.float64) * 1000.0
+                self._summary['frame'] = tuple(np.percentile(values, [50, 95, 99]))
+            self._summary_frame = self.frame_index
+        return self._summary
+
+    def overlay_lines(self):
+        """Líneas de texto del HUD (para dibujar con OpenCV o pygame)"""
+        summary = self.summary()
+        lines = [f"FPS {self.fps():5.1f}   p50 / p95 / p99 ms"]
+        for stage in self.stage_names + ['frame']:
+            if stage in summary:
+                p50, p95, p99 = summary[stage]
+                lines.append(f"{stage:<10}{p50:6.1f}{p95:7.1f}{p99:7.1f}")
+        return lines
+
+    def draw_overlay(self, img, x=10, y=None):
+        """Dibujar el HUD de rendimiento sobre un frame de OpenCV"""
+        if not self.show_overlay:
+            return img
+        lines = self.overlay_lines()
+        line_h = 18
+        box_w, box_h = 300, line_h * len(lines) + 10
+        if y is None:
+            y = img.shape[0] - box_h - 10
+
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(img.shape[1], x + box_w), min(img.shape[0], y + box_h)
+        if x1 > x0 and y1 > y0:
+            roi = img[y0:y1, x0:x1]
+            roi //= 3  # Fondo oscurecido solo en el recuadro
+
+        for i, line in enumerate(lines):
+            cv2.putText(img, line, (x + 8, y + 18 + i * line_h),
+                        cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 0), 1)
+        return img
+
+    def export_csv(self, path=None):
+        """Guardar los tiempos por frame (ms) en CSV; devuelve la ruta o None"""
+        if not self.rows:
+            return None
+        if path is None:
+            if not self.csv_dir:
+                return None
+            os.makedirs(self.csv_dir, exist_ok=True)
+            stamp = time.strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(self.csv_dir, f"{self.name}_{stamp}.csv")
+
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + self.stage_names + ['total'])
+            for frame_index, total, stages in self.rows:
+                writer.writerow([frame_index] +
+                                [f"{stages.get(s, 0.0) * 1000.0:.3f}" for s in self.stage_names] +
+                                [f"{total * 1000.0:.3f}"])
+        print(f"Tiempos por etapa exportados a {path}")
+        # El host reutiliza el profiler: la próxima sesión empieza su propio CSV
+        self.rows = []
+        self.frame_index = 0
+        self._summary_frame = -1
+        return path
@@ -0,0 +1,100 @@
+# text_cache.py
+# Caché de textos rasterizados para OpenCV.
+# Cada texto (con su sombra o borde) se dibuja una sola vez en un sprite con
+# alfa y se reutiliza en los frames siguientes; los menos usados se descartan (LRU).
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from utils import Sprite
+
+def draw_styled_text(img, text, origin, font, scale, color, thickness, style='shadow'):
+    """Dibujar el texto directamente (sin caché) con el estilo indicado"""
+    x, y = origin
+    if style == 'shadow':
+        # Igual que UIManager.draw_text_with_shadow
+        cv2.putText(img, text, (x + 3, y + 3), font, scale, (0, 0, 0), thickness + 1)
+        cv2.putText(img, text, (x, y), font, scale, color, thickness)
+    elif style == 'fancy':
+        # Igual que draw_fancy_text de juego_saltar: sombra, borde blanco y texto suavizado
+        cv2.putText(img, text, (x + 3, y + 3), font, scale, (0, 0, 0), thickness + 2, cv2.LINE_AA)
+        cv2.putText(img, text, (x - 1, y - 1), font, scale, (255, 255, 255), thickness + 1, cv2.LINE_AA)
+        cv2.putText(img, text, (x + 1, y + 1), font, scale, (255, 255, 255), thickness + 1, cv2.LINE_AA)
+        cv2.putText(img, text, (x, y), font, scale, color, thickness, cv2.LINE_AA)
+    else:
+        cv2.putText(img, text, (x, y), font, scale, color, thickness, cv2.LINE_AA)
+
+
+class TextSpriteCache:
+    def __init__(self, max_entries=256):
+        """
+        max_entries: cantidad de textos distintos que se mantienen rasterizados.
+        Clave: (texto, fuente, escala, color, grosor, estilo).
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text, font, scale, color, thickness, style='shadow'):
+        """Devuelve (Sprite, dx, dy, ancho_texto); dx/dy son relativos al origen del texto"""
+        color = tuple(int(c) for c in color)
+        key = (text, font, scale, color, thickness, style)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = self._rasterize(text, font, scale, color, thickness, style)
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def draw(self, img, text, x, y, font, scale, color, thickness, style='shadow', center=False):
+        """Mezclar el texto sobre img; (x, y) es el origen de cv2.putText"""
+        sprite, dx, dy, text_w = self.get(text, font, scale, color, thickness, style)
+        if sprite is None:
+            return img
+        if center:
+            x = x - text_w // 2
+        sprite.blit(img, x + dx, y + dy)
+        return img
+
+    def clear(self):
+        self._entries.clear()
+
+    def _rasterize(self, text, font, scale, color, thickness, style):
+        (text_w, text_h), baseline = cv2.getTextSize(text, font, scale, thickness + 2)
+        pad = thickness + 6
+        width = text_w + 3 + 2 * pad
+        height = text_h + baseline + 3 + 2 * pad
+        origin = (pad, pad + text_h)
+
+        # Se dibuja sobre negro y sobre blanco: la diferencia da el alfa exacto,
+        # incluidos los bordes suavizados de LINE_AA
+        on_black = np.zeros((height, width, 3), dtype=np.uint8)
+        on_white = np.full((height, width, 3), 255, dtype=np.uint8)
+        draw_styled_text(on_black, text, origin, font, scale, color, thickness, style)
+        draw_styled_text(on_white, text, origin, font, scale, color, thickness, style)
+
+        diff = on_white.astype(np.int16) - on_black.astype(np.int16)
+        alpha = np.clip(255 - diff.max(axis=2), 0, 255).astype(np.uint8)
+
+        center_w = cv2.getTextSize(text, font, scale, thickness)[0][0]
+        ys, xs = np.nonzero(alpha)
+        if len(xs) == 0:
+            return None, 0, 0, center_w
+        x0, x1 = xs.min(), xs.max() + 1
+        y0, y1 = ys.min(), ys.max() + 1
+        alpha = alpha[y0:y1, x0:x1]
+        premultiplied = on_black[y0:y1, x0:x1].astype(np.uint16)
+
+        # Color sin premultiplicar (Sprite vuelve a multiplicar por el alfa)
+        safe_alpha = np.maximum(alpha, 1).astype(np.uint16)[:, :, None]
+        image = np.minimum((premultiplied * 255 + safe_alpha // 2) // safe_alpha, 255).astype(np.uint8)
+
+        return Sprite(image, alpha), int(x0 - origin[0]), int(y0 - origin[1]), center_w
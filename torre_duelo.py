@@ -1,18 +1,70 @@
 import cv2
 import mediapipe as mp
+import numpy as np
 import time
 
+from camera import open_camera
+from pose_workers import PoseWorkers
+from profiler import FrameProfiler
+from utils import InferenceScaler
+
 # --- Configuración cámara ---
 WIDTH, HEIGHT = 1280, 720
+# Resolución a la que corre el modelo de pose (el dibujado sigue a WIDTH x HEIGHT)
+INFERENCE_SIZE = (640, 360)
 
 # --- Mediapipe Pose ---
 mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
-pose = mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
+# Un Pose por jugador (cada uno con su propio seguimiento), en paralelo
+pose_workers = PoseWorkers(2, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+inference_scaler = InferenceScaler(INFERENCE_SIZE)
+
+# Tiempos por etapa (P: mostrar/ocultar HUD de rendimiento)
+profiler = FrameProfiler("torre_duelo")
 
 jump_threshold = 60
 GAME_TIME = 180  # 3 minutos
 
+# Cámara de la sesión (la cierra stop())
+cap = None
+
+class TowerLayer:
+    """
+    Capa de la torre de un jugador: cada bloque se pinta una sola vez al
+    apilarse y la torre completa se compone con una copia con máscara
+    limitada a la franja que ocupa.
+    """
+    def __init__(self, side, height, color=(0, 255, 0)):
+        self.x0 = side[0]
+        width = side[1] - side[0]
+        self.image = np.zeros((height, width, 3), dtype=np.uint8)
+        self.mask = np.zeros((height, width, 1), dtype=bool)
+        self.color = color
+        self.top = height      # Primera fila ocupada
+        self.bottom = 0        # Última fila ocupada + 1
+
+    def add_block(self, x, y, w, h):
+        x0, y0 = int(x) - self.x0, int(y)
+        x1, y1 = int(x + w) - self.x0, int(y + h)
+        cv2.rectangle(self.image, (x0, y0), (x1, y1), self.color, -1)
+        # Misma área que cv2.rectangle (extremos incluidos), recortada a la capa
+        H, W = self.mask.shape[:2]
+        r0, r1 = max(y0, 0), min(y1 + 1, H)
+        c0, c1 = max(x0, 0), min(x1 + 1, W)
+        if r1 > r0 and c1 > c0:
+            self.mask[r0:r1, c0:c1] = True
+            self.top = min(self.top, r0)
+            self.bottom = max(self.bottom, r1)
+
+    def draw(self, frame):
+        if self.bottom <= self.top:
+            return frame
+        rows = slice(self.top, self.bottom)
+        roi = frame[rows, self.x0:self.x0 + self.image.shape[1]]
+        np.copyto(roi, self.image[rows], where=self.mask[rows])
+        return frame
+
 def detect_jump(y, player):
     jump = False
     if player["last_y"] is not None and player["cooldown"] == 0:
@@ -40,11 +92,13 @@ def process_jump(player):
             bw = overlap
             by = last_y - bh
             player["tower"].append((bx, by, bw, bh))
+            player["tower_layer"].add_block(bx, by, bw, bh)
             player["score"] += 1
         else:
             player["alive"] = False
     else:
         player["tower"].append((bx, by, bw, bh))
+        player["tower_layer"].add_block(bx, by, bw, bh)
         player["score"] += 1
 
     player["block"] = {
@@ -69,142 +123,180 @@ def show_countdown(cap):
     cv2.waitKey(500)
 
 def run_game():
-    cap = cv2.VideoCapture(0)
-    cap.set(3, WIDTH)
-    cap.set(4, HEIGHT)
+    global cap
+    cap = open_camera(0, WIDTH, HEIGHT)
 
     cv2.namedWindow("Stack Jump 2P", cv2.WND_PROP_FULLSCREEN)
     cv2.setWindowProperty("Stack Jump 2P", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
 
-    players = [
-        {"tower": [], "block": {"x": 0, "y": HEIGHT-100, "w": 200, "h": 40, "dir": 1},
-         "speed": 10, "score": 0, "last_y": None, "cooldown": 0, "alive": True, "side": (0, WIDTH//2)},
-        {"tower": [], "block": {"x": WIDTH//2, "y": HEIGHT-100, "w": 200, "h": 40, "dir": 1},
-         "speed": 10, "score": 0, "last_y": None, "cooldown": 0, "alive": True, "side": (WIDTH//2, WIDTH)}
-    ]
-
-    # --- Mostrar contador antes de iniciar ---
-    show_countdown(cap)
-
-    start_time = time.time()
-    winner_text = ""
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame = cv2.flip(frame, 1)
-
-        # --- Dividir frame ---
-        left_frame = frame[:, :WIDTH//2]
-        right_frame = frame[:, WIDTH//2:]
-
-        rgb_left = cv2.cvtColor(left_frame, cv2.COLOR_BGR2RGB)
-        rgb_right = cv2.cvtColor(right_frame, cv2.COLOR_BGR2RGB)
-
-        res_left = pose.process(rgb_left)
-        res_right = pose.process(rgb_right)
-
-        # --- Dibujar línea central ---
-        cv2.line(frame, (WIDTH//2, 0), (WIDTH//2, HEIGHT), (255, 255, 255), 2)
-
-        # --- Temporizador ---
-        elapsed = time.time() - start_time
-        remaining = max(0, GAME_TIME - int(elapsed))
-        minutes, seconds = divmod(remaining, 60)
-
-        # --- Subir dificultad cada 30s ---
+    try:
+        players = [
+            {"tower": [], "block": {"x": 0, "y": HEIGHT-100, "w": 200, "h": 40, "dir": 1},
+             "speed": 10, "score": 0, "last_y": None, "cooldown": 0, "alive": True, "side": (0, WIDTH//2)},
+            {"tower": [], "block": {"x": WIDTH//2, "y": HEIGHT-100, "w": 200, "h": 40, "dir": 1},
+             "speed": 10, "score": 0, "last_y": None, "cooldown": 0, "alive": True, "side": (WIDTH//2, WIDTH)}
+        ]
         for p in players:
-            p["speed"] = 10 + int(elapsed // 30) * 2
-
-        # --- Jugador 1 ---
-        if res_left.pose_landmarks and players[0]["alive"]:
-            mp_drawing.draw_landmarks(left_frame, res_left.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-            hips = res_left.pose_landmarks.landmark
-            y_hip = int((hips[mp_pose.PoseLandmark.LEFT_HIP].y + hips[mp_pose.PoseLandmark.RIGHT_HIP].y)/2 * HEIGHT)
-            if detect_jump(y_hip, players[0]):
-                process_jump(players[0])
-
-        # --- Jugador 2 ---
-        if res_right.pose_landmarks and players[1]["alive"]:
-            mp_drawing.draw_landmarks(right_frame, res_right.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-            hips = res_right.pose_landmarks.landmark
-            y_hip = int((hips[mp_pose.PoseLandmark.LEFT_HIP].y + hips[mp_pose.PoseLandmark.RIGHT_HIP].y)/2 * HEIGHT)
-            if detect_jump(y_hip, players[1]):
-                process_jump(players[1])
-
-        alive_count = sum(1 for p in players if p["alive"])
-
-        # --- Dibujar jugadores ---
-        for idx, p in enumerate(players):
-            if not p["alive"]:
-                x_text = (p["side"][0] + p["side"][1]) // 2 - 150
-                cv2.putText(frame, "GAME OVER", (x_text, HEIGHT//2),
-                            cv2.FONT_HERSHEY_SIMPLEX, 2, (0,0,255), 5)
-                continue
-
-            # Mover bloque
-            p["block"]["x"] = int(p["block"]["x"] + p["speed"] * p["block"]["dir"])
-            if p["block"]["x"] <= p["side"][0] or p["block"]["x"]+p["block"]["w"] >= p["side"][1]:
-                p["block"]["dir"] *= -1
-
-            # Dibujar torre
-            for (x, y, w, h) in p["tower"]:
-                cv2.rectangle(frame, (int(x), int(y)), (int(x+w), int(y+h)), (0, 255, 0), -1)
-
-            # Dibujar bloque actual
-            bx, by, bw, bh = p["block"]["x"], p["block"]["y"], p["block"]["w"], p["block"]["h"]
-            cv2.rectangle(frame, (int(bx), int(by)), (int(bx+bw), int(by+bh)), (255, 0, 0), -1)
-
-            # Puntaje
-            if idx == 0:
-                cv2.putText(frame, f"P1: {p['score']}", (30, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,255), 3)
-            else:
-                cv2.putText(frame, f"P2: {p['score']}", (WIDTH-200, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,255), 3)
-
-        # --- Temporizador ---
-        cv2.putText(frame, f"{minutes}:{seconds:02}", (WIDTH//2-60, 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255,255,255), 4)
-
-        # --- Fin del juego ---
-        if remaining == 0 or alive_count == 0:
-            p1, p2 = players[0]["score"], players[1]["score"]
-            if p1 > p2: winner_text = "Ganador: Jugador 1 🏆"
-            elif p2 > p1: winner_text = "Ganador: Jugador 2 🏆"
-            else: winner_text = "Empate 🎉"
-
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (200, 200), (WIDTH-200, HEIGHT-200), (0,0,0), -1)
-            alpha = 0.6
-            frame = cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
-
-            cv2.putText(frame, "GAME OVER", (WIDTH//2-250, HEIGHT//2-50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 2, (0,0,255), 6)
-            cv2.putText(frame, winner_text, (WIDTH//2-300, HEIGHT//2+50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0,255,0), 4)
-            cv2.putText(frame, "Presiona R para Repetir | Q para Salir",
-                        (WIDTH//2-350, HEIGHT//2+150),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255,255,255), 3)
+            p["tower_layer"] = TowerLayer(p["side"], HEIGHT)
+
+        # --- Mostrar contador antes de iniciar ---
+        show_countdown(cap)
+
+        start_time = time.time()
+        winner_text = ""
+
+        while True:
+            profiler.begin_frame()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            profiler.lap('capture')
+            frame = cv2.flip(frame, 1)
+
+            # --- Dividir frame ---
+            left_frame = frame[:, :WIDTH//2]
+            right_frame = frame[:, WIDTH//2:]
+
+            rgb_left = cv2.cvtColor(inference_scaler.prepare(left_frame, (WIDTH, HEIGHT)), cv2.COLOR_BGR2RGB)
+            rgb_right = cv2.cvtColor(inference_scaler.prepare(right_frame, (WIDTH, HEIGHT)), cv2.COLOR_BGR2RGB)
+            profiler.lap('convert')
+
+            res_left, res_right = pose_workers.process([rgb_left, rgb_right])
+            profiler.lap('inference')
+
+            # --- Dibujar línea central ---
+            cv2.line(frame, (WIDTH//2, 0), (WIDTH//2, HEIGHT), (255, 255, 255), 2)
+
+            # --- Temporizador ---
+            elapsed = time.time() - start_time
+            remaining = max(0, GAME_TIME - int(elapsed))
+            minutes, seconds = divmod(remaining, 60)
+
+            # --- Subir dificultad cada 30s ---
+            for p in players:
+                p["speed"] = 10 + int(elapsed // 30) * 2
+
+            # --- Jugador 1 ---
+            if res_left.pose_landmarks and players[0]["alive"]:
+                mp_drawing.draw_landmarks(left_frame, res_left.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+                hips = res_left.pose_landmarks.landmark
+                y_hip = int((hips[mp_pose.PoseLandmark.LEFT_HIP].y + hips[mp_pose.PoseLandmark.RIGHT_HIP].y)/2 * HEIGHT)
+                if detect_jump(y_hip, players[0]):
+                    process_jump(players[0])
+
+            # --- Jugador 2 ---
+            if res_right.pose_landmarks and players[1]["alive"]:
+                mp_drawing.draw_landmarks(right_frame, res_right.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+                hips = res_right.pose_landmarks.landmark
+                y_hip = int((hips[mp_pose.PoseLandmark.LEFT_HIP].y + hips[mp_pose.PoseLandmark.RIGHT_HIP].y)/2 * HEIGHT)
+                if detect_jump(y_hip, players[1]):
+                    process_jump(players[1])
+            profiler.lap('logic')
+
+            alive_count = sum(1 for p in players if p["alive"])
+
+            # --- Dibujar jugadores ---
+            for idx, p in enumerate(players):
+                if not p["alive"]:
+                    x_text = (p["side"][0] + p["side"][1]) // 2 - 150
+                    cv2.putText(frame, "GAME OVER", (x_text, HEIGHT//2),
+                                cv2.FONT_HERSHEY_SIMPLEX, 2, (0,0,255), 5)
+                    continue
+
+                # Mover bloque
+                p["block"]["x"] = int(p["block"]["x"] + p["speed"] * p["block"]["dir"])
+                if p["block"]["x"] <= p["side"][0] or p["block"]["x"]+p["block"]["w"] >= p["side"][1]:
+                    p["block"]["dir"] *= -1
+
+                # Dibujar torre (capa con los bloques ya pintados)
+                p["tower_layer"].draw(frame)
+
+                # Dibujar bloque actual
+                bx, by, bw, bh = p["block"]["x"], p["block"]["y"], p["block"]["w"], p["block"]["h"]
+                cv2.rectangle(frame, (int(bx), int(by)), (int(bx+bw), int(by+bh)), (255, 0, 0), -1)
+
+                # Puntaje
+                if idx == 0:
+                    cv2.putText(frame, f"P1: {p['score']}", (30, 50),
+                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,255), 3)
+                else:
+                    cv2.putText(frame, f"P2: {p['score']}", (WIDTH-200, 50),
+                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,255), 3)
+
+            # --- Temporizador ---
+            cv2.putText(frame, f"{minutes}:{seconds:02}", (WIDTH//2-60, 50),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255,255,255), 4)
+
+            # --- Fin del juego ---
+            if remaining == 0 or alive_count == 0:
+                p1, p2 = players[0]["score"], players[1]["score"]
+                if p1 > p2: winner_text = "Ganador: Jugador 1 🏆"
+                elif p2 > p1: winner_text = "Ganador: Jugador 2 🏆"
+                else: winner_text = "Empate 🎉"
+
+                # Oscurecer solo el recuadro central (rectángulo negro al 60%)
+                alpha = 0.6
+                panel = frame[200:HEIGHT-200+1, 200:WIDTH-200+1]
+                panel[:] = cv2.addWeighted(panel, 1 - alpha, panel, 0, 0)
+
+                cv2.putText(frame, "GAME OVER", (WIDTH//2-250, HEIGHT//2-50),
+                            cv2.FONT_HERSHEY_SIMPLEX, 2, (0,0,255), 6)
+                cv2.putText(frame, winner_text, (WIDTH//2-300, HEIGHT//2+50),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0,255,0), 4)
+                cv2.putText(frame, "Presiona R para Repetir | Q para Salir",
+                            (WIDTH//2-350, HEIGHT//2+150),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255,255,255), 3)
+
+                cv2.imshow("Stack Jump 2P", frame)
+                profiler.lap('present')
+                profiler.end_frame()
+                key = cv2.waitKey(0) & 0xFF
+                if key == ord("r"):
+                    return True
+                else:
+                    return False
+
+            profiler.draw_overlay(frame)
+            profiler.lap('ui')
 
             cv2.imshow("Stack Jump 2P", frame)
-            key = cv2.waitKey(0) & 0xFF
-            if key == ord("r"):
-                return True
-            else:
-                return False
-
-        cv2.imshow("Stack Jump 2P", frame)
-        if cv2.waitKey(20) & 0xFF == 27:
-            break
-
-    cap.release()
-    cv2.destroyAllWindows()
+            key = cv2.waitKey(20) & 0xFF
+            profiler.lap('present')
+            profiler.end_frame()
+            if key == ord('p'):
+                profiler.toggle_overlay()
+            if key == 27:
+                break
+    finally:
+        # La ventana y el CSV quedan para stop(); la cámara se reabre en cada ronda
+        cap.release()
     return False
 
 # --- Loop principal ---
-while True:
-    repetir = run_game()
-    if not repetir:
-        break
+def main():
+    """Jugar hasta salir; los detectores quedan cargados para la próxima vez"""
+    try:
+        while True:
+            repetir = run_game()
+            if not repetir:
+                break
+    finally:
+        stop()
+
+def stop():
+    """Cerrar cámara y ventana y exportar tiempos"""
+    global cap
+    if cap is None:
+        return
+    profiler.export_csv()
+    cap.release()
+    cap = None
+    cv2.destroyWindow("Stack Jump 2P")
+
+def close():
+    """Liberar los detectores de pose (al cerrar el programa)"""
+    pose_workers.close()
+
+if __name__ == "__main__":
+    main()
+    close()
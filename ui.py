@@ -4,17 +4,100 @@ import numpy as np
 import math
 import time
 
+from text_cache import TextSpriteCache
+from utils import Sprite
+
+# Color de fondo para rasterizar capas; todo lo que no tenga este color es opaco
+LAYER_KEY_COLOR = (1, 2, 3)
+# Niveles de brillo de los textos que pulsan (cada nivel es una entrada de la caché de textos)
+PULSE_LEVELS = 8
+
 class UIManager:
     def __init__(self, colors):
         self.colors = colors
+        
+        # Capas estáticas (gradiente del header, título, divisor, etiquetas)
+        self.header_height = 140
+        self._static_key = None
+        self._header_gradient = None
+        self._static_sprites = []
+        self._zone_sprites = []
+        
+        # Textos rasterizados una vez y reutilizados mientras no cambien
+        self.text_cache = TextSpriteCache()
+
+    @staticmethod
+    def quantize_pulse(pulse):
+        """Redondear un pulso 0-1 a PULSE_LEVELS pasos para que el color no cree un sprite por frame"""
+        return round(pulse * PULSE_LEVELS) / PULSE_LEVELS
 
     def draw_text_with_shadow(self, img, text, x, y, font, size, color, thickness, center=False):
-        if center:
-            text_size = cv2.getTextSize(text, font, size, thickness)[0]
-            x = x - text_size[0] // 2
-        
-        cv2.putText(img, text, (x + 3, y + 3), font, size, (0, 0, 0), thickness + 1)
-        cv2.putText(img, text, (x, y), font, size, color, thickness)
+        self.text_cache.draw(img, text, x, y, font, size, color, thickness,
+                             style='shadow', center=center)
+
+    def render_layer(self, width, height, draw_fn):
+        """
+        Rasterizar una capa una sola vez: draw_fn dibuja sobre un lienzo vacío
+        y se devuelve (Sprite, x, y) recortado al área realmente dibujada.
+        """
+        canvas = np.empty((height, width, 3), dtype=np.uint8)
+        canvas[:] = LAYER_KEY_COLOR
+        draw_fn(canvas)
+        
+        mask = np.any(canvas != LAYER_KEY_COLOR, axis=2).astype(np.uint8) * 255
+        ys, xs = np.nonzero(mask)
+        if len(xs) == 0:
+            return None
+        x0, x1 = xs.min(), xs.max() + 1
+        y0, y1 = ys.min(), ys.max() + 1
+        return Sprite(canvas[y0:y1, x0:x1].copy(), mask[y0:y1, x0:x1].copy()), int(x0), int(y0)
+
+    def _build_static_layers(self, width, height, split_line_x):
+        """Gradiente del header, título, marcos de puntaje, divisor y etiquetas de zona"""
+        header_height = self.header_height
+        
+        # Color del gradiente por fila; se mezcla al 75% solo sobre las filas del header
+        rows = np.arange(header_height, dtype=np.float32)
+        alpha = (header_height - rows) / header_height * 0.85
+        gradient = np.zeros((header_height, width, 3), dtype=np.uint8)
+        gradient[:] = (np.outer(alpha, [40, 40, 60]).astype(np.int32))[:, None, :].astype(np.uint8)
+        self._header_gradient = gradient
+        
+        def title(canvas):
+            self.draw_text_with_shadow(canvas, "BASKETBALL PRO CHAMPIONSHIP", width//2, 45,
+                                       cv2.FONT_HERSHEY_SIMPLEX, 1.4,
+                                       self.colors['accent'], 4, center=True)
+        
+        def score_frames(canvas):
+            p1_bg = (60, 85, 260, 140)
+            cv2.rectangle(canvas, p1_bg[:2], p1_bg[2:], self.colors['neon_blue'], 3)
+            cv2.rectangle(canvas, (p1_bg[0]+3, p1_bg[1]+3), (p1_bg[2]-3, p1_bg[3]-3), (20, 20, 40), -1)
+        
+        def score_frames_right(canvas):
+            p2_bg = (width-260, 85, width-60, 140)
+            cv2.rectangle(canvas, p2_bg[:2], p2_bg[2:], self.colors['neon_green'], 3)
+            cv2.rectangle(canvas, (p2_bg[0]+3, p2_bg[1]+3), (p2_bg[2]-3, p2_bg[3]-3), (20, 40, 20), -1)
+        
+        def split_line(canvas):
+            cv2.line(canvas, (split_line_x, 140), (split_line_x, height-50), self.colors['light'], 2)
+        
+        def label_p1(canvas):
+            self.draw_text_with_shadow(canvas, "JUGADOR 1", split_line_x//2, 170,
+                                       cv2.FONT_HERSHEY_SIMPLEX, 1.2,
+                                       self.colors['neon_blue'], 3, center=True)
+        
+        def label_p2(canvas):
+            self.draw_text_with_shadow(canvas, "JUGADOR 2", split_line_x + split_line_x//2, 170,
+                                       cv2.FONT_HERSHEY_SIMPLEX, 1.2,
+                                       self.colors['neon_green'], 3, center=True)
+        
+        self._static_sprites = [layer for layer in (self.render_layer(width, height, fn)
+                                                    for fn in (title, score_frames, score_frames_right))
+                                if layer is not None]
+        self._zone_sprites = [layer for layer in (self.render_layer(width, height, fn)
+                                                  for fn in (split_line, label_p1, label_p2))
+                              if layer is not None]
+        self._static_key = (width, height, split_line_x)
 
     def format_time(self, seconds):
         minutes = int(seconds // 60)
@@ -43,19 +126,13 @@ class UIManager:
         cv2.circle(img, (x + size*3//2, y + size//2), 3, self.colors['neon_green'], -1)
 
     def draw_detection_zones(self, img, split_line_x, left_basket_pos, right_basket_pos):
-        screen_height = img.shape[0]
-        
-        # Línea divisoria central
-        cv2.line(img, (split_line_x, 140), (split_line_x, screen_height-50), 
-                self.colors['light'], 2)
+        height, width = img.shape[:2]
+        if self._static_key != (width, height, split_line_x):
+            self._build_static_layers(width, height, split_line_x)
         
-        # Etiquetas de zonas de jugadores
-        self.draw_text_with_shadow(img, "JUGADOR 1", split_line_x//2, 170, 
-                                cv2.FONT_HERSHEY_SIMPLEX, 1.2, 
-                                self.colors['neon_blue'], 3, center=True)
-        self.draw_text_with_shadow(img, "JUGADOR 2", split_line_x + split_line_x//2, 170, 
-                                cv2.FONT_HERSHEY_SIMPLEX, 1.2, 
-                                self.colors['neon_green'], 3, center=True)
+        # Línea divisoria central y etiquetas de zonas (capas precalculadas)
+        for sprite, x, y in self._zone_sprites:
+            sprite.blit(img, x, y)
         
         # Círculo alrededor del aro izquierdo (Jugador 1)
         aro_left_x = left_basket_pos[0] + 110
@@ -77,23 +154,16 @@ class UIManager:
                            left_basket_pos, right_basket_pos):
         height, width = img.shape[:2]
         current_time = time.time()
+        if self._static_key != (width, height, split_line_x):
+            self._build_static_layers(width, height, split_line_x)
         
-        # Header con gradiente
-        header_height = 140
-        overlay = img.copy()
+        # Header con gradiente: se mezclan solo sus filas, en el mismo frame
+        header = img[:self.header_height]
+        cv2.addWeighted(header, 0.25, self._header_gradient, 0.75, 0, dst=header)
         
-        for y in range(header_height):
-            alpha = (header_height - y) / header_height * 0.85
-            color = tuple(int(c * alpha) for c in [40, 40, 60])
-            cv2.line(overlay, (0, y), (width, y), color, 1)
-        
-        img = cv2.addWeighted(img, 0.25, overlay, 0.75, 0)
-        
-        # Titulo
-        title = "BASKETBALL PRO CHAMPIONSHIP"
-        self.draw_text_with_shadow(img, title, width//2, 45, 
-                                 cv2.FONT_HERSHEY_SIMPLEX, 1.4, 
-                                 self.colors['accent'], 4, center=True)
+        # Titulo y marcos de puntaje (capas precalculadas)
+        for sprite, x, y in self._static_sprites:
+            sprite.blit(img, x, y)
         
         # Cronometro
         time_str = self.format_time(remaining_time)
@@ -105,38 +175,32 @@ class UIManager:
             time_color = self.colors['light']
             
         self.draw_text_with_shadow(img, f"TIEMPO: {time_str}", width//2, 80, 
-                                cv2.FONT_HERSHEY_SIMPLEX, 1.1, 
-                                 time_color, 3, center=True)
+                              cv2.FONT_HERSHEY_SIMPLEX, 1.1, 
+                              time_color, 3, center=True)
         
         # Marcadores
         score_y = 110
         
         # Jugador 1
         p1_text = f"JUGADOR 1: {player1_score}"
-        p1_bg = (60, 85, 260, 140)
-        cv2.rectangle(img, p1_bg[:2], p1_bg[2:], self.colors['neon_blue'], 3)
-        cv2.rectangle(img, (p1_bg[0]+3, p1_bg[1]+3), (p1_bg[2]-3, p1_bg[3]-3), (20, 20, 40), -1)
         self.draw_text_with_shadow(img, p1_text, 70, score_y, 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.9, 
-                                self.colors['neon_blue'], 3)
+                              cv2.FONT_HERSHEY_SIMPLEX, 0.9, 
+                              self.colors['neon_blue'], 3)
         
         # Jugador 2
         p2_text = f"JUGADOR 2: {player2_score}"
-        p2_bg = (width-260, 85, width-60, 140)
-        cv2.rectangle(img, p2_bg[:2], p2_bg[2:], self.colors['neon_green'], 3)
-        cv2.rectangle(img, (p2_bg[0]+3, p2_bg[1]+3), (p2_bg[2]-3, p2_bg[3]-3), (20, 40, 20), -1)
         self.draw_text_with_shadow(img, p2_text, width-250, score_y, 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.9, 
-                                self.colors['neon_green'], 3)
+                              cv2.FONT_HERSHEY_SIMPLEX, 0.9, 
+                              self.colors['neon_green'], 3)
         
         # Combo
         if combo_count > 0:
             combo_text = f"COMBO x{combo_count + 1}!"
-            pulse = abs(math.sin(current_time * 8)) * 0.4 + 0.6
+            pulse = self.quantize_pulse(abs(math.sin(current_time * 8)) * 0.4 + 0.6)
             combo_color = tuple(int(c * pulse) for c in self.colors['gold'])
             self.draw_text_with_shadow(img, combo_text, width//2, 125, 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, 
-                                    combo_color, 3, center=True)
+                                  cv2.FONT_HERSHEY_SIMPLEX, 1.0, 
+                                  combo_color, 3, center=True)
         
         # Zonas de deteccion
         self.draw_detection_zones(img, split_line_x, left_basket_pos, right_basket_pos)
@@ -149,7 +213,7 @@ class UIManager:
             status_text = "MODO SUPER VELOCIDAD! - CANASTAS A MAXIMA VELOCIDAD!"
             status_color = self.colors['danger']
             # Efecto de parpadeo para el modo súper velocidad
-            pulse = abs(math.sin(current_time * 10)) * 0.5 + 0.5
+            pulse = self.quantize_pulse(abs(math.sin(current_time * 10)) * 0.5 + 0.5)
             status_color = tuple(int(c * pulse) for c in status_color)
         elif moving_baskets:
             status_text = "MODO DIFICIL ACTIVADO - CANASTAS EN MOVIMIENTO!"
@@ -159,8 +223,8 @@ class UIManager:
             status_color = self.colors['light']
             
         self.draw_text_with_shadow(img, status_text, width//2, status_y, 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, 
-                                status_color, 2, center=True)
+                              cv2.FONT_HERSHEY_SIMPLEX, 0.7, 
+                              status_color, 2, center=True)
         
         # Controles
         if thumbs_up_count > 0:
@@ -187,8 +251,8 @@ class UIManager:
         else:
             controls_text = "Manten pulgar arriba 2s para salir | R: Reiniciar"
             self.draw_text_with_shadow(img, controls_text, width//2, height-25, 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, 
-                                    self.colors['light'], 1, center=True)
+                                  cv2.FONT_HERSHEY_SIMPLEX, 0.6, 
+                                  self.colors['light'], 1, center=True)
         
         return img
 
@@ -346,7 +410,8 @@ class UIManager:
         text = farewell_texts[text_index]
         
         scale = 0.8 + math.sin(progress * math.pi) * 0.7
-        font_size = 2.2 * scale
+        # Tamaño en pasos de 0.05 para que la animación reutilice los textos cacheados
+        font_size = round(2.2 * scale * 20) / 20
         
         color_progress = (progress * 2) % 1
         if color_progress < 0.5:
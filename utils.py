@@ -47,4 +47,90 @@ class Utils:
             print(f"Error en overlay: {e}")
             bg[y:y+h, x:x+w] = fg
             
-        return bg
\ No newline at end of file
+        return bg
+
+    @staticmethod
+    def blit_sprites(bg, sprites):
+        """Dibujar varios sprites en un solo paso: sprites = [(Sprite, x, y), ...]"""
+        for sprite, x, y in sprites:
+            sprite.blit(bg, x, y)
+        return bg
+
+class Sprite:
+    def __init__(self, image, mask):
+        """
+        Imagen BGR + máscara (0-255) preparada una sola vez para mezclar rápido:
+        se guardan el alfa de 3 canales y el color premultiplicado en uint16.
+        """
+        self.image = image
+        self.mask = mask
+        self.h, self.w = image.shape[:2]
+
+        alpha = mask.astype(np.uint16)[:, :, None]
+        self.premultiplied = image.astype(np.uint16) * alpha          # fg * a
+        self.inv_alpha = np.repeat(255 - alpha, 3, axis=2)            # 255 - a
+
+        # Buffers reutilizables para no asignar memoria en cada frame
+        self._scratch = np.empty((self.h, self.w, 3), dtype=np.uint16)
+        self._shifted = np.empty((self.h, self.w, 3), dtype=np.uint16)
+
+    def blit(self, bg, x, y):
+        """Mezclar el sprite sobre bg en (x, y), escribiendo directo en la ROI"""
+        H, W = bg.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + self.w, W), min(y + self.h, H)
+        if x1 <= x0 or y1 <= y0:
+            return bg
+
+        sx0, sy0 = x0 - x, y0 - y
+        sx1, sy1 = sx0 + (x1 - x0), sy0 + (y1 - y0)
+        roi = bg[y0:y1, x0:x1]
+        acc = self._scratch[sy0:sy1, sx0:sx1]
+        shifted = self._shifted[sy0:sy1, sx0:sx1]
+
+        # (fg*a + bg*(255-a) + 128) / 255 en aritmética entera
+        np.multiply(roi, self.inv_alpha[sy0:sy1, sx0:sx1], out=acc)
+        np.add(acc, self.premultiplied[sy0:sy1, sx0:sx1], out=acc)
+        np.add(acc, 128, out=acc)
+        np.right_shift(acc, 8, out=shifted)
+        np.add(acc, shifted, out=acc)
+        np.right_shift(acc, 8, out=acc)
+        np.copyto(roi, acc, casting='unsafe')
+        return bg
+
+
+class InferenceScaler:
+    def __init__(self, inference_size=None):
+        """
+        inference_size: (ancho, alto) con el que los detectores ven un frame
+        completo, por ejemplo (640, 360) o (480, 270). None = sin reescalar.
+        El dibujado sigue a resolución completa.
+        """
+        self.inference_size = inference_size
+        self.scale_x = 1.0
+        self.scale_y = 1.0
+
+    def prepare(self, img, full_size=None):
+        """
+        Devuelve una copia reducida de img para inferencia.
+        full_size: tamaño del frame completo cuando img es un recorte
+        (así cada mitad de pantalla se reduce con el mismo factor).
+        """
+        if self.inference_size is None:
+            self.scale_x = self.scale_y = 1.0
+            return img
+
+        h, w = img.shape[:2]
+        full_w, full_h = full_size if full_size is not None else (w, h)
+        self.scale_x = self.inference_size[0] / full_w
+        self.scale_y = self.inference_size[1] / full_h
+        if self.scale_x >= 1.0 and self.scale_y >= 1.0:
+            self.scale_x = self.scale_y = 1.0
+            return img
+
+        small_size = (max(1, int(round(w * self.scale_x))), max(1, int(round(h * self.scale_y))))
+        return cv2.resize(img, small_size, interpolation=cv2.INTER_AREA)
+
+    def to_display(self, x, y):
+        """Convertir coordenadas en píxeles de la imagen reducida al frame completo"""
+        return int(x / self.scale_x), int(y / self.scale_y)